@@ -12,15 +12,25 @@ import logging
 import os
 import joblib
 import datetime
+from tree_inference import CompiledTreePredictor
+from job_callbacks import CatBoostJobCallback, run_cancellable
 
 # Logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
+def _native_grid_search(grid: Dict, X_train: pd.DataFrame, y_train: pd.Series, loss_function: str,
+                        thread_count: int) -> Dict:
+    model = CatBoostRegressor(loss_function=loss_function, thread_count=thread_count)
+    return model.grid_search(grid, Pool(X_train, y_train))
+
+
 class CatBoostPredictor:
     def __init__(self, config_path: str = 'configs/catboostconfig.yaml'):
         self.model = None
+        self.compiled = None  # Low-latency predictor of model, built by compile_inference
+        self.n_jobs = None  # Training threads; None = CatBoost's default (all cores)
         self.config = self.load_config(config_path)
 
     @staticmethod
@@ -29,23 +39,36 @@ class CatBoostPredictor:
             return yaml.safe_load(file)
 
     def yfdown(self, ticker: str, start: str, end: str) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Series, pd.Series]:
-        df = yf.download(ticker, start=start, end=end)
+        return self.prepare_data(self.add_features(yf.download(ticker, start=start, end=end)))
+
+    @staticmethod
+    def add_features(df: pd.DataFrame) -> pd.DataFrame:
+        # Accepts yfinance (Close) and DataAcquisition (close) column names
+        df = df.rename(columns={'close': 'Close'})
         df = df[['Close']].dropna()
         df['Prev_Close'] = df['Close'].shift(1)
-        df = df.dropna()
+        return df.dropna()
+
+    def prepare_data(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Series, pd.Series]:
         x = df[['Prev_Close']]
         y = df['Close']
         X_train, X_test, y_train, y_test = train_test_split(x, y, test_size=self.config['test_size'], shuffle=False)
         logger.info(f"Train shape: {X_train.shape}, Test shape: {X_test.shape}")
         return X_train, X_test, y_train, y_test
 
-    def search_catboost(self, X_train: pd.DataFrame, y_train: pd.Series) -> Dict:
-        logger.info("Grid Search Starting.")
-        train_pool = Pool(X_train, y_train)
+    def prepare_prediction_data(self, df: pd.DataFrame) -> pd.DataFrame:
+        # The last row's features forecast the close of df's last row
+        return self.add_features(df)[['Prev_Close']]
 
+    def search_catboost(self, X_train: pd.DataFrame, y_train: pd.Series, job=None) -> Dict:
+        logger.info("Grid Search Starting.")
         # Perform grid search with config file.
-        model = CatBoostRegressor(loss_function=self.config['loss_function'])
-        grid_search_result = model.grid_search(self.config['grid_search_params'], train_pool)
+        args = (self.config['grid_search_params'], X_train, y_train, self.config['loss_function'], self.n_jobs or -1)
+        if job is None:
+            grid_search_result = _native_grid_search(*args)
+        else:
+            # grid_search runs the whole grid in native code with no callbacks, so run it where it can be stopped
+            grid_search_result = run_cancellable(job, _native_grid_search, *args, label="CatBoost search")
 
         # Extract the best parameters and the RMSE values for each fold
         best_params = grid_search_result['params']
@@ -56,14 +79,22 @@ class CatBoostPredictor:
         return best_params
 
     def train_model(self, X_train: pd.DataFrame, y_train: pd.Series, X_test: pd.DataFrame, y_test: pd.Series,
-                    best_params: Dict) -> np.ndarray:
+                    best_params: Dict, job=None) -> np.ndarray:
         logger.info("Model Training Starting.")
-        self.model = CatBoostRegressor(**best_params)
-        self.model.fit(X_train, y_train, eval_set=(X_test, y_test), use_best_model=True)
+        self.model = CatBoostRegressor(**best_params, thread_count=self.n_jobs or -1)
+        self.compiled = None  # A compiled predictor of the previous model must not outlive the retrain
+        callbacks = [CatBoostJobCallback(job, best_params.get('iterations', 1000))] if job is not None else None
+        self.model.fit(X_train, y_train, eval_set=(X_test, y_test), use_best_model=True, callbacks=callbacks)
+        if job is not None:
+            job.check()
         pred = self.model.predict(X_test)
         self._print_metrics(y_test, pred)
         return pred
 
+    @staticmethod
+    def evaluate_model(y_true: pd.Series, y_pred: np.ndarray) -> float:
+        return math.sqrt(mean_squared_error(y_true, y_pred))
+
     @staticmethod
     def _print_metrics(y_true: pd.Series, y_pred: np.ndarray) -> None:
         mse = mean_squared_error(y_true, y_pred)
@@ -101,6 +132,7 @@ class CatBoostPredictor:
             raise FileNotFoundError(f"Model file not found: {full_path}")
 
         self.model = joblib.load(full_path)
+        self.compiled = None
         logger.info(f"Model loaded from {full_path}")
 
     def predict(self, X: pd.DataFrame) -> np.ndarray:
@@ -108,6 +140,12 @@ class CatBoostPredictor:
             raise ValueError("Model hasn't been trained or loaded yet.")
         return self.model.predict(X)
 
+    def compile_inference(self, backend: str = 'auto') -> CompiledTreePredictor:
+        if self.model is None:
+            raise ValueError("Model hasn't been trained or loaded yet.")
+        self.compiled = CompiledTreePredictor(self.model, backend)
+        return self.compiled
+
     def catboost_prediction(ticker):
         predictor = CatBoostPredictor()
         print("Catboost Regressor selected.")
@@ -12,9 +12,10 @@ import ta
 from ta.momentum import RSIIndicator
 import pandas as pd
 import pickle
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, List, Optional
 import logging
 from configs.LstmConfig import Config
+from job_callbacks import keras_callback
 import os
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -25,6 +26,7 @@ class LSTMPredictor:
         self.model = None
         self.scaler_x = MinMaxScaler()
         self.scaler_y = MinMaxScaler()
+        self._inference_fn = None
 
     @staticmethod
     def yf_Down(ticker: str, start: str, end: str) -> pd.DataFrame:
@@ -32,6 +34,17 @@ class LSTMPredictor:
             df = yf.download(ticker, start=start, end=end)
             if df.empty:
                 raise ValueError(f"No data available for {ticker} between {start} and {end}")
+            return LSTMPredictor.add_features(df)
+        except Exception as e:
+            logging.error(f"Error downloading stock data: {str(e)}")
+            raise
+
+    @staticmethod
+    def add_features(df: pd.DataFrame) -> pd.DataFrame:
+        """Add Config.FEATURE_COLUMNS to an OHLCV frame (yfinance or DataAcquisition columns)"""
+        try:
+            df = df.rename(columns={c: c.capitalize() for c in ('open', 'high', 'low', 'close', 'volume')
+                                    if c in df.columns})
             df = df.dropna()
 
             # Technical Indicators
@@ -48,7 +61,7 @@ class LSTMPredictor:
 
             return df.dropna()
         except Exception as e:
-            logging.error(f"Error downloading stock data: {str(e)}")
+            logging.error(f"Error adding features: {str(e)}")
             raise
 
     def prepare_data(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
@@ -60,44 +73,89 @@ class LSTMPredictor:
             logging.error(f"Error preparing data: {str(e)}")
             raise
 
-    def build_model(self, input_shape: Tuple[int, int]) -> Model:
+    def prepare_prediction_data(self, df: pd.DataFrame) -> np.ndarray:
+        """Scaled Config.FEATURE_COLUMNS of every complete row of an OHLCV frame, for predict_fast windows"""
+        return self.scaler_x.transform(self.add_features(df)[Config.FEATURE_COLUMNS])
+
+    @staticmethod
+    def make_dataset(x: np.ndarray, y: Optional[np.ndarray] = None, lookback: Optional[int] = None,
+                     batch_size: Optional[int] = None, shuffle: bool = False) -> tf.data.Dataset:
+        """
+        Stream (lookback, n_features) windows and their targets from the raw arrays.
+
+        Windows are gathered per batch and prefetched, so memory stays close to the
+        size of x instead of lookback times it. The target of each window is the
+        y row aligned with its last timestep; without y only the windows are
+        streamed, for predict(). lookback and batch_size default to the Config
+        values at call time, so runtime overrides of Config take effect.
+
+        shuffle reorders whole windows, with Config.SHUFFLE_SEED, so training
+        batches mix periods while each window keeps its target. Validation and
+        prediction datasets stay in time order.
+        """
+        lookback = lookback or Config.LOOKBACK
+        batch_size = batch_size or Config.BATCH_SIZE
+        targets = y[lookback - 1:].astype(np.float32) if y is not None else None
+        return tf.keras.utils.timeseries_dataset_from_array(
+            x.astype(np.float32), targets,
+            sequence_length=lookback, batch_size=batch_size, shuffle=shuffle,
+            seed=Config.SHUFFLE_SEED if shuffle else None
+        ).prefetch(tf.data.AUTOTUNE)
+
+    def build_model(self, input_shape: Tuple[int, int], stateful: bool = False,
+                    bidirectional: Optional[bool] = None) -> Model:
+        """Build and compile the network; bidirectional defaults to Config.BIDIRECTIONAL."""
+        if bidirectional is None:
+            bidirectional = Config.BIDIRECTIONAL
         try:
-            inputs = Input(shape=input_shape)
+            if stateful:
+                inputs = Input(batch_shape=(1, None, input_shape[-1]))
+            else:
+                inputs = Input(shape=input_shape)
             x = inputs
             for units in Config.LSTM_UNITS:
-                x = Bidirectional(LSTM(units=units, return_sequences=True))(x)
+                layer = LSTM(units=units, return_sequences=True, stateful=stateful)
+                x = Bidirectional(layer)(x) if bidirectional else layer(x)
                 x = Dropout(Config.DROPOUT_RATE)(x)
-            x = LSTM(units=Config.LSTM_UNITS[-1])(x)
+            x = LSTM(units=Config.LSTM_UNITS[-1], stateful=stateful)(x)
             for units in Config.DENSE_UNITS:
                 x = Dense(units, activation='relu')(x)
             outputs = Dense(1)(x)
 
             model = Model(inputs=inputs, outputs=outputs)
-            model.compile(optimizer=Config.OPTIMIZER, loss='mse')
+            # A Keras optimizer is bound to the variables of the first model it trains, so each model gets a copy
+            optimizer = Config.OPTIMIZER.__class__.from_config(Config.OPTIMIZER.get_config())
+            model.compile(optimizer=optimizer, loss='mse')
             return model
         except Exception as e:
             logging.error(f"Error building model: {str(e)}")
             raise
 
-    def train_model(self, X_train: np.ndarray, y_train: np.ndarray, X_test: np.ndarray, y_test: np.ndarray) -> None:
+    def train_model(self, X_train: np.ndarray, y_train: np.ndarray, X_test: np.ndarray, y_test: np.ndarray,
+                    job=None) -> None:
         try:
-            self.model = self.build_model((X_train.shape[1], 1))
+            self.model = self.build_model((Config.LOOKBACK, X_train.shape[1]))
+            self._inference_fn = None
 
             early_stopping = EarlyStopping(monitor='val_loss', patience=10, restore_best_weights=True)
             reduce_lr = ReduceLROnPlateau(monitor='val_loss', factor=0.2, patience=5, min_lr=1e-5)
+            callbacks = [early_stopping, reduce_lr]
+            if job is not None:
+                callbacks.append(keras_callback(job, Config.EPOCHS))
 
             history = self.model.fit(
-                X_train, y_train,
-                batch_size=Config.BATCH_SIZE,
+                self.make_dataset(X_train, y_train, shuffle=True),
                 epochs=Config.EPOCHS,
-                validation_data=(X_test, y_test),
-                callbacks=[early_stopping, reduce_lr],
+                validation_data=self.make_dataset(X_test, y_test),
+                callbacks=callbacks,
                 verbose=2
             )
-            return history
         except Exception as e:
             logging.error(f"Error training model: {str(e)}")
             raise
+        if job is not None:
+            job.check()
+        return history
 
     def predict(self, X_test: np.ndarray) -> np.ndarray:
         try:
@@ -107,6 +165,46 @@ class LSTMPredictor:
             logging.error(f"Error making predictions: {str(e)}")
             raise
 
+    def compile_inference(self) -> None:
+        """Trace a tf.function over the trained model with the y-scaler inverse transform fused in."""
+        try:
+            if self.model is None:
+                raise ValueError("Model has not been trained or loaded yet.")
+
+            y_min = tf.constant(self.scaler_y.min_, dtype=tf.float32)
+            y_scale = tf.constant(self.scaler_y.scale_, dtype=tf.float32)
+            model = self.model
+
+            @tf.function(input_signature=[tf.TensorSpec((None,) + tuple(model.input_shape[1:]), tf.float32)],
+                         reduce_retracing=True, jit_compile=True)
+            def infer(x):
+                return (model(x, training=False) - y_min) / y_scale
+
+            self._inference_fn = infer
+            logging.info("Compiled LSTM inference function")
+        except Exception as e:
+            logging.error(f"Error compiling inference: {str(e)}")
+            raise
+
+    def predict_fast(self, X: np.ndarray) -> np.ndarray:
+        """
+        Low-overhead prediction for one window or a batch of windows.
+
+        Bypasses the Keras predict loop: a single window of shape model.input_shape[1:]
+        or a batch with a leading batch dimension is run through the compiled function
+        and returned in price units.
+        """
+        try:
+            x = np.asarray(X, dtype=np.float32)
+            if self._inference_fn is None:
+                self.compile_inference()
+            if x.ndim == len(self.model.input_shape) - 1:
+                x = x[np.newaxis]
+            return self._inference_fn(x).numpy()
+        except Exception as e:
+            logging.error(f"Error making fast predictions: {str(e)}")
+            raise
+
     @staticmethod
     def evaluate_model(y_true: np.ndarray, y_pred: np.ndarray) -> float:
         return np.sqrt(mean_squared_error(y_true, y_pred))
@@ -169,10 +267,8 @@ class LSTMPredictor:
                 Config.TICKER = ticker
                 df = predictor.yf_Down(Config.TICKER, Config.START_DATE, Config.END_DATE)
                 X_train, X_test, y_train, y_test = predictor.prepare_data(df)
-                X_train = np.reshape(X_train, (X_train.shape[0], X_train.shape[1], 1))
-                X_test = np.reshape(X_test, (X_test.shape[0], X_test.shape[1], 1))
-                y_pred = predictor.predict(X_test)
-                y_true = predictor.scaler_y.inverse_transform(y_test)
+                y_pred = predictor.predict(predictor.make_dataset(X_test))
+                y_true = predictor.scaler_y.inverse_transform(y_test[Config.LOOKBACK - 1:])
                 rmse = predictor.evaluate_model(y_true, y_pred)
                 logging.info(f'RMSE: {rmse}')
                 predictor.plot_results(y_true, y_pred, Config.TICKER)
@@ -186,16 +282,12 @@ class LSTMPredictor:
                 df = predictor.yf_Down(Config.TICKER, Config.START_DATE, Config.END_DATE)
                 X_train, X_test, y_train, y_test = predictor.prepare_data(df)
 
-                # Reshape data for LSTM input
-                X_train = np.reshape(X_train, (X_train.shape[0], X_train.shape[1], 1))
-                X_test = np.reshape(X_test, (X_test.shape[0], X_test.shape[1], 1))
-
-                # Train model
+                # Train model on (lookback, n_features) windows
                 history = predictor.train_model(X_train, y_train, X_test, y_test)
 
                 # Make predictions
-                y_pred = predictor.predict(X_test)
-                y_true = predictor.scaler_y.inverse_transform(y_test)
+                y_pred = predictor.predict(predictor.make_dataset(X_test))
+                y_true = predictor.scaler_y.inverse_transform(y_test[Config.LOOKBACK - 1:])
 
                 # Evaluate model
                 rmse = predictor.evaluate_model(y_true, y_pred)
@@ -217,6 +309,103 @@ class LSTMPredictor:
             print("An error occurred. Please check the logs for more information.")
 
 
+class StatefulLSTMPredictor(LSTMPredictor):
+    """
+    Streaming variant of LSTMPredictor for live mode.
+
+    Carries the LSTM hidden and cell states between calls, so each new candle costs
+    one timestep instead of a full lookback window. The backward half of a
+    bidirectional layer cannot be streamed, so the source model must be trained
+    with Config.BIDIRECTIONAL = False, the default. Models trained with it set
+    to True must be retrained before they can stream.
+
+    LivePredictionEngine uses it when PREDICTION["live_stateful_lstm"] is set in
+    src/utils/constants.py (or stateful_lstm=True is passed to the engine).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.stream_model = None
+        self._step_fn = None
+
+    @classmethod
+    def from_predictor(cls, predictor: LSTMPredictor) -> 'StatefulLSTMPredictor':
+        streaming = cls()
+        streaming.model = predictor.model
+        streaming.scaler_x = predictor.scaler_x
+        streaming.scaler_y = predictor.scaler_y
+        streaming.build_streaming_model()
+        return streaming
+
+    def build_streaming_model(self) -> None:
+        """Build a stateful batch-of-one copy of the trained model with both scalers fused in."""
+        try:
+            if self.model is None:
+                raise ValueError("Model has not been trained or loaded yet.")
+            if any(isinstance(layer, Bidirectional) for layer in self.model.layers):
+                raise ValueError("Bidirectional LSTM layers cannot be streamed; train with Config.BIDIRECTIONAL = False.")
+
+            n_features = self.model.input_shape[-1]
+            self.stream_model = self.build_model(self.model.input_shape[1:], stateful=True, bidirectional=False)
+            self.stream_model.set_weights(self.model.get_weights())
+
+            x_min = tf.constant(self.scaler_x.min_, dtype=tf.float32)
+            x_scale = tf.constant(self.scaler_x.scale_, dtype=tf.float32)
+            y_min = tf.constant(self.scaler_y.min_, dtype=tf.float32)
+            y_scale = tf.constant(self.scaler_y.scale_, dtype=tf.float32)
+            stream_model = self.stream_model
+
+            @tf.function(input_signature=[tf.TensorSpec((1, None, n_features), tf.float32)],
+                         reduce_retracing=True, jit_compile=True)
+            def step(x):
+                return (stream_model(x * x_scale + x_min, training=False) - y_min) / y_scale
+
+            self._step_fn = step
+            logging.info("Built stateful streaming LSTM")
+        except Exception as e:
+            logging.error(f"Error building streaming model: {str(e)}")
+            raise
+
+    def warm_up(self, rows: np.ndarray) -> float:
+        """Reset the state and replay unscaled feature rows (e.g. the last lookback minutes)."""
+        self.reset_state()
+        return self.step(rows)
+
+    def step(self, rows: np.ndarray) -> float:
+        """Advance the state by one or more unscaled feature rows and return the price prediction."""
+        try:
+            if self._step_fn is None:
+                self.build_streaming_model()
+            x = np.asarray(rows, dtype=np.float32).reshape(1, -1, self.model.input_shape[-1])
+            return float(self._step_fn(x).numpy()[0, 0])
+        except Exception as e:
+            logging.error(f"Error advancing streaming model: {str(e)}")
+            raise
+
+    def _require_stream_model(self) -> None:
+        if self.stream_model is None:
+            self.build_streaming_model()  # Raises if the model is untrained or bidirectional
+
+    def _state_variables(self) -> List[tf.Variable]:
+        self._require_stream_model()
+        return [state for layer in self.stream_model.layers if isinstance(layer, LSTM) for state in layer.states]
+
+    def snapshot_state(self) -> List[np.ndarray]:
+        """Copy the current hidden and cell states so a forecast can branch from them."""
+        return [state.numpy() for state in self._state_variables()]
+
+    def restore_state(self, snapshot: List[np.ndarray]) -> None:
+        """Restore states previously returned by snapshot_state()."""
+        for state, value in zip(self._state_variables(), snapshot):
+            state.assign(value)
+
+    def reset_state(self) -> None:
+        self._require_stream_model()
+        for layer in self.stream_model.layers:
+            if isinstance(layer, LSTM):
+                layer.reset_states()
+
+
 if __name__ == "__main__":
     try:
         predictor = LSTMPredictor()
@@ -229,8 +418,8 @@ if __name__ == "__main__":
         history = predictor.train_model(X_train, y_train, X_test, y_test)
 
         # Make predictions
-        y_pred = predictor.predict(X_test)
-        y_true = predictor.scaler_y.inverse_transform(y_test)
+        y_pred = predictor.predict(predictor.make_dataset(X_test))
+        y_true = predictor.scaler_y.inverse_transform(y_test[Config.LOOKBACK - 1:])
 
         # Evaluate and plot results
         rmse = predictor.evaluate_model(y_true, y_pred)
@@ -1,4 +1,7 @@
+import math
+import numpy as np
 import pandas as pd
+from pandas.tseries.frequencies import to_offset
 from prophet import Prophet
 from prophet.diagnostics import cross_validation, performance_metrics
 from prophet.serialize import model_to_json, model_from_json
@@ -8,9 +11,11 @@ from sklearn.model_selection import ParameterGrid
 import logging
 import os
 from typing import Dict, Any, Optional
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 import yaml
+import json
 import multiprocessing
+from threadpoolctl import threadpool_limits
 
 # Suppress warnings
 logging.getLogger('prophet').setLevel(logging.WARNING)
@@ -26,8 +31,13 @@ class MProphet:
         self.start_date = self.config['start_date']
         self.end_date = self.config['end_date']
         self.hyperparams = self.config['hyperparameters']
+        self.fit_resolution = self.config.get('fit_resolution')
 
         self.data: Optional[pd.DataFrame] = None
+        self.fit_data: Optional[pd.DataFrame] = None
+        self.aggregated = self._resolution_delta() is not None
+        self.warm_start = self.config.get('warm_start', False)
+        self.warm_start_init: Optional[Dict[str, Any]] = None
         self.model: Optional[Prophet] = None
         self.forecast: Optional[pd.DataFrame] = None
 
@@ -56,18 +66,109 @@ class MProphet:
             self.logger.error(f"Error downloading data: {str(e)}")
             raise
 
+    @staticmethod
+    def to_prophet_frame(df: pd.DataFrame) -> pd.DataFrame:
+        """Convert an OHLCV frame with a DatetimeIndex into Prophet's ds/y/volume layout."""
+        if {'ds', 'y'}.issubset(df.columns):
+            return df
+        columns = {c.lower(): c for c in df.columns}
+        frame = pd.DataFrame({
+            'ds': pd.DatetimeIndex(df.index).tz_localize(None),
+            'y': df[columns['close']].to_numpy(dtype=float),
+            'volume': df[columns['volume']].to_numpy(dtype=float),
+        })
+        return frame.dropna().reset_index(drop=True)
+
+    def _resolution_delta(self) -> Optional[pd.Timedelta]:
+        """Return the configured fit resolution as a Timedelta, or None when disabled."""
+        if not self.fit_resolution:
+            return None
+        return pd.Timedelta(to_offset(self.fit_resolution))
+
+    def aggregate(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Aggregate ds/y/volume rows onto the configured fit resolution.
+
+        The close of each bucket becomes y and volumes are summed. Data that is
+        already at or coarser than the resolution is returned unchanged.
+        """
+        resolution = self._resolution_delta()
+        if resolution is None or len(data) < 2:
+            return data
+
+        spacing = pd.Series(data['ds']).diff().median()
+        if spacing >= resolution:
+            return data
+
+        grouped = data.set_index('ds').resample(resolution, label='left', closed='left')
+        aggregated = pd.DataFrame({'y': grouped['y'].last(), 'volume': grouped['volume'].sum()})
+        aggregated = aggregated.dropna().reset_index()
+        self.logger.info(f"Aggregated {len(data)} rows to {len(aggregated)} rows at {self.fit_resolution} resolution")
+        return aggregated
+
     def fit_predict(self) -> None:
         """Fits the Prophet model and generates forecasts."""
         if self.data is None:
             raise ValueError("Data has not been downloaded. Call download_data() first.")
 
         self.logger.info("Fitting Prophet model and generating forecasts")
+        self.fit_data = self.aggregate(self.data)
         self.model = Prophet(interval_width=0.95, **self.hyperparams).add_regressor("volume")
-        self.model.fit(self.data)
-        future = self.model.make_future_dataframe(periods=self.config['forecast_periods'])
-        future["volume"] = self.data["volume"].mean()  # Fill future volume with average
+        self.aggregated = self.fit_data is not self.data
+        fit_kwargs = {}
+        if self.warm_start and self.warm_start_init is not None:
+            self.logger.info("Warm-starting Prophet from previous fit parameters")
+            fit_kwargs['init'] = self.warm_start_init
+        self.model.fit(self.fit_data, **fit_kwargs)
+        self.warm_start_init = self.warm_start_params(self.model)
+        # forecast_periods counts days; on aggregated data the future frame steps at the fit resolution
+        periods, freq = self.config['forecast_periods'], 'D'
+        if self.aggregated:
+            periods = math.ceil(pd.Timedelta(days=periods) / self._resolution_delta())
+            freq = self.fit_resolution
+        future = self.model.make_future_dataframe(periods=periods, freq=freq)
+        future["volume"] = self.fit_data["volume"].mean()  # Fill future volume with average
         self.forecast = self.model.predict(future)
 
+    @staticmethod
+    def warm_start_params(model: Prophet) -> Dict[str, Any]:
+        """Extract the fitted k, m, delta, beta and sigma_obs values to seed the next fit."""
+        params = {}
+        for name in ['k', 'm', 'sigma_obs']:
+            params[name] = float(model.params[name][0][0])
+        for name in ['delta', 'beta']:
+            params[name] = np.array(model.params[name][0])
+        return params
+
+    def forecast_minutes(self, total_minutes: int, last_timestamp: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """
+        Forecast the next total_minutes minutes after last_timestamp.
+
+        With a fit resolution configured, Prophet is only evaluated on the coarse
+        grid spanning the horizon and the result is time-interpolated back onto
+        the minute grid; otherwise every future minute is predicted directly.
+        """
+        if self.model is None:
+            raise ValueError("Model has not been fitted. Call fit_predict() first.")
+
+        if last_timestamp is None:
+            last_timestamp = self.model.history['ds'].iloc[-1]
+        last_timestamp = pd.Timestamp(last_timestamp).tz_localize(None)
+        minutes = pd.date_range(start=last_timestamp, periods=total_minutes + 1, freq='min')[1:]
+        volume = self.model.history['volume'].mean()
+
+        resolution = self._resolution_delta()
+        if resolution is None or not self.aggregated:
+            forecast = self.model.predict(pd.DataFrame({'ds': minutes, 'volume': volume}))
+            return pd.DataFrame({'Close': forecast['yhat'].to_numpy()}, index=minutes)
+
+        coarse = pd.date_range(start=last_timestamp.floor(resolution),
+                               end=minutes[-1].ceil(resolution), freq=resolution)
+        forecast = self.model.predict(pd.DataFrame({'ds': coarse, 'volume': volume}))
+        yhat = pd.Series(forecast['yhat'].to_numpy(), index=coarse)
+        grid = yhat.reindex(yhat.index.union(minutes)).interpolate(method='time')
+        return pd.DataFrame({'Close': grid.reindex(minutes).to_numpy(np.float64)}, index=minutes)
+
     def plot(self) -> None:
         """Plots the forecast, its components, and the volume data."""
         if self.forecast is None:
@@ -122,9 +223,18 @@ class MProphet:
         rmse = performance["rmse"].mean()
         return params, rmse
 
+    @staticmethod
+    def _single_threaded_worker() -> None:
+        threadpool_limits(1)  # Forked workers inherit BLAS pools that environment variables can no longer resize
+
     @classmethod
-    def tune_hyperparameters(cls, config_path: str, n_jobs: Optional[int] = None) -> Dict[str, Any]:
-        """Tune hyperparameters using grid search and cross-validation with parallel processing."""
+    def tune_hyperparameters(cls, config_path: str, n_jobs: Optional[int] = None, job=None) -> Dict[str, Any]:
+        """
+        Tune hyperparameters using grid search and cross-validation with parallel processing.
+
+        job, if given, gets progress per finished candidate; cancelling it drops
+        the queued candidates without waiting for the ones already running.
+        """
         config = cls.load_config(config_path)
         logger = logging.getLogger(__name__)
         logger.info("Tuning hyperparameters")
@@ -133,19 +243,33 @@ class MProphet:
 
         # Determine the number of workers
         if n_jobs is None or n_jobs <= 0:
-            n_jobs = multiprocessing.cpu_count()  # Use all available cores
+            # The process's core budget (src/utils/resources.py), else all available cores
+            n_jobs = int(os.environ.get('CCB_CORES') or multiprocessing.cpu_count())
 
         logger.info(f"Using {n_jobs} workers for hyperparameter tuning")
 
-        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
-            futures = [executor.submit(cls._evaluate_params, (config_path, params))
-                       for params in ParameterGrid(config['param_grid'])]
-
-            for future in as_completed(futures):
-                params, rmse = future.result()
-                if rmse < best_score:
-                    best_score = rmse
-                    best_params = params
+        # Each Stan fit is single-threaded; keep NumPy's BLAS pools in the workers to one thread as well
+        executor = ProcessPoolExecutor(max_workers=n_jobs, initializer=cls._single_threaded_worker)
+        try:
+            pending = {executor.submit(cls._evaluate_params, (config_path, params))
+                       for params in ParameterGrid(config['param_grid'])}
+            total = len(pending)
+
+            while pending:
+                # Wake periodically so a cancelled job is noticed while long fits run
+                done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                for future in done:
+                    params, rmse = future.result()
+                    if rmse < best_score:
+                        best_score = rmse
+                        best_params = params
+                if job is not None:
+                    job.progress((total - len(pending)) / total,
+                                 f"Prophet search: {total - len(pending)}/{total} candidates")
+        except BaseException:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        executor.shutdown()
 
         logger.info(f"Best hyperparameters: {best_params}")
         return best_params
@@ -160,6 +284,10 @@ class MProphet:
             f.write(model_to_json(self.model))
         self.logger.info(f"Model saved to {self.config['model_save_path']}")
 
+        if self.warm_start_init is not None:
+            with open(self._params_path(), "w") as f:
+                json.dump({name: np.asarray(value).tolist() for name, value in self.warm_start_init.items()}, f)
+
     def load_model(self) -> None:
         """Load a trained model from a file."""
         if not os.path.exists(self.config['model_save_path']):
@@ -169,6 +297,15 @@ class MProphet:
             self.model = model_from_json(f.read())
         self.logger.info(f"Model loaded from {self.config['model_save_path']}")
 
+        if os.path.exists(self._params_path()):
+            with open(self._params_path(), "r") as f:
+                self.warm_start_init = {name: np.asarray(value) for name, value in json.load(f).items()}
+
+    def _params_path(self) -> str:
+        """Path of the warm-start parameter file stored next to the saved model."""
+        root, _ = os.path.splitext(self.config['model_save_path'])
+        return f"{root}_params.json"
+
     def run(self) -> Dict[str, float]:
         """Run the entire modeling process."""
         self.download_data()
@@ -14,23 +14,39 @@ import warnings
 from joblib import dump, load
 import yaml
 import os
+import pickle
+import shutil
+from tree_inference import CompiledTreePredictor, ForestArrays
+from job_callbacks import fit_search
 
 warnings.filterwarnings('ignore')
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 
 class RandomForestPredictor:
+    FEATURE_COLUMNS = ['Close', 'SMA_20', 'EMA_12', 'RSI', 'BB_upper', 'BB_lower', 'Volatility',
+                       'Prev_Close', 'Prev_SMA_20', 'Prev_EMA_12', 'Prev_RSI', 'Prev_BB_upper', 'Prev_BB_lower',
+                       'Prev_Volatility']
+
     def __init__(self, config_path='configs/random_forest_config.yaml'):
         with open(config_path, 'r') as file:
             self.config = yaml.safe_load(file)
         self.model = None
+        self.forest = None
+        self.compiled = None
+        self.n_jobs = None  # Search processes; None = all cores
         self.scaler_x = MinMaxScaler()
         self.scaler_y = MinMaxScaler()
 
     def download_and_prepare_data(self, symbol, start_date, end_date):
+        logging.info(f"Downloading data for {symbol} from {start_date} to {end_date}")
+        return self.add_features(yf.download(symbol, start=start_date, end=end_date))
+
+    def add_features(self, df):
+        """Add the model's features and target to an OHLCV frame (yfinance or DataAcquisition columns)."""
         try:
-            logging.info(f"Downloading data for {symbol} from {start_date} to {end_date}")
-            df = yf.download(symbol, start=start_date, end=end_date)
+            df = df.rename(columns={c: c.capitalize() for c in ('open', 'high', 'low', 'close', 'volume')
+                                    if c in df.columns})
 
             # Add technical indicators
             df['SMA_20'] = SMAIndicator(close=df['Close'], window=20).sma_indicator()
@@ -62,14 +78,20 @@ class RandomForestPredictor:
             raise
 
     def prepare_features_and_target(self, df):
-        features = ['Close', 'SMA_20', 'EMA_12', 'RSI', 'BB_upper', 'BB_lower', 'Volatility',
-                    'Prev_Close', 'Prev_SMA_20', 'Prev_EMA_12', 'Prev_RSI', 'Prev_BB_upper', 'Prev_BB_lower',
-                    'Prev_Volatility']
-        X = df[features]
+        X = df[self.FEATURE_COLUMNS]
         y = df['target']
         return X, y
 
-    def train_and_evaluate_model(self, X, y):
+    def prepare_prediction_data(self, df):
+        """
+        Scaled features for forecasting the close of df's last row.
+
+        A row's features forecast the next close, so add_features drops the last
+        row (it has no target yet) and the row before it is the one to predict from.
+        """
+        return self.scaler_x.transform(self.add_features(df)[self.FEATURE_COLUMNS])
+
+    def train_and_evaluate_model(self, X, y, job=None):
         # Split into Train and Test Sets
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=self.config['test_size'], random_state=42,
                                                             shuffle=False)
@@ -79,6 +101,14 @@ class RandomForestPredictor:
         y_train_scaled = self.scaler_y.fit_transform(y_train.values.reshape(-1, 1))
         X_test_scaled = self.scaler_x.transform(X_test)
 
+        X_fit, y_fit = X_train_scaled, y_train_scaled.ravel()
+        compaction = self.config.get('compaction', {})
+        if compaction.get('enabled', False):
+            # Compaction ranks trees on rows held out of the fit; the test set stays unseen for evaluation
+            X_fit, X_val, y_fit, y_val = train_test_split(X_fit, y_fit,
+                                                          test_size=compaction.get('validation_size', 0.1),
+                                                          shuffle=False)
+
         # Hyperparameter tuning
         param_dist = self.config['hyperparameter_tuning']
 
@@ -86,20 +116,28 @@ class RandomForestPredictor:
 
         # Random search of parameters
         random_search = RandomizedSearchCV(estimator=rf, param_distributions=param_dist,
-                                           n_iter=100, cv=3, verbose=2, random_state=42, n_jobs=-1)
+                                           n_iter=100, cv=3, verbose=2, random_state=42,
+                                           n_jobs=self.n_jobs or -1)
 
-        # Fit the random search model
-        random_search.fit(X_train_scaled, y_train_scaled.ravel())
+        # Fit the random search model; a cancelled job stops it
+        fit_search(random_search, job, X_fit, y_fit, label="RandomForest search")
 
         logging.info(f"Best parameters found: {random_search.best_params_}")
 
         # Get the best model
         self.model = random_search.best_estimator_
+        self.forest = self.compiled = None  # Drop a loaded or compiled forest so it can't outlive the retrain
 
         # Make Predictions
         predictions_scaled = self.model.predict(X_test_scaled)
         predictions = self.scaler_y.inverse_transform(predictions_scaled.reshape(-1, 1))
 
+        if compaction.get('enabled', False):
+            self.compact(X_fit, y_fit, X_val, y_val,
+                         n_trees=compaction.get('n_trees'), float32=compaction.get('float32', True))
+            predictions_scaled = self.predict_scaled(X_test_scaled)
+            predictions = self.scaler_y.inverse_transform(predictions_scaled.reshape(-1, 1))
+
         # Evaluate Model
         mse = mean_squared_error(y_test, predictions)
         mae = mean_absolute_error(y_test, predictions)
@@ -107,6 +145,76 @@ class RandomForestPredictor:
 
         return X_test, y_test, predictions, mse, mae, r2
 
+    def oob_tree_errors(self, X_train, y_train):
+        """
+        Mean squared error of each tree on the training rows left out of its bootstrap sample.
+
+        X_train and y_train must be the rows the forest was fit on.
+        """
+        n_samples = X_train.shape[0]
+        errors = np.empty(len(self.model.estimators_))
+        for i, (estimator, in_bag) in enumerate(zip(self.model.estimators_, self.model.estimators_samples_)):
+            oob = np.ones(n_samples, dtype=bool)
+            oob[in_bag] = False
+            errors[i] = mean_squared_error(y_train[oob], estimator.predict(X_train[oob])) if oob.any() else np.inf
+        return errors
+
+    def compact(self, X_train, y_train, X_val, y_val, n_trees=None, float32=True):
+        """
+        Shrink the trained forest into compact node arrays for inference.
+
+        Keeps the n_trees trees with the lowest out-of-bag error (validation error
+        when the forest was fit without bootstrap), stores thresholds and leaf
+        values as float32 and drops the sklearn estimator with its per-node
+        impurity and sample-count metadata. All arrays are in scaled units.
+
+        X_train/y_train are the rows the forest was fit on. X_val/y_val must be
+        held out of the fit and must not be the test set, or the ranking
+        overfits the rows the model is later scored on.
+
+        Returns:
+            dict: Tree counts, sizes in MB and validation RMSE before and after.
+        """
+        if self.model is None:
+            raise ValueError("Model hasn't been trained or loaded yet.")
+
+        n_total = len(self.model.estimators_)
+        n_trees = min(n_trees or n_total, n_total)
+        if self.model.bootstrap:
+            errors = self.oob_tree_errors(X_train, y_train)
+        else:
+            errors = np.array([mean_squared_error(y_val, estimator.predict(X_val))
+                               for estimator in self.model.estimators_])
+        keep = np.sort(np.argsort(errors, kind='stable')[:n_trees])
+
+        size_before = len(pickle.dumps(self.model, protocol=pickle.HIGHEST_PROTOCOL))
+        rmse_before = np.sqrt(mean_squared_error(y_val, self.model.predict(X_val)))
+
+        self.forest = ForestArrays.from_sklearn(self.model, trees=keep,
+                                                dtype=np.float32 if float32 else np.float64)
+        self.compiled = CompiledTreePredictor.from_forest_arrays(self.forest)
+        self.model = None
+
+        rmse_after = np.sqrt(mean_squared_error(y_val, self.compiled.predict_batch(X_val)))
+        report = {
+            'n_trees_before': n_total,
+            'n_trees_after': self.forest.n_trees,
+            'size_before_mb': size_before / 1e6,
+            'size_after_mb': self.forest.nbytes / 1e6,
+            'rmse_before': rmse_before,
+            'rmse_after': rmse_after,
+        }
+        logging.info(f"Compacted forest from {n_total} to {self.forest.n_trees} trees: "
+                     f"{report['size_before_mb']:.1f} MB -> {report['size_after_mb']:.1f} MB, "
+                     f"validation RMSE (scaled) {rmse_before:.6f} -> {rmse_after:.6f}")
+        return report
+
+    def predict_scaled(self, X_scaled):
+        """Predict scaled targets with the compact forest when present, else the sklearn model."""
+        if self.compiled is not None:
+            return self.compiled.predict_batch(X_scaled)
+        return self.model.predict(X_scaled)
+
     def plot_results(self, y_test, predictions, ticker):
         plt.figure(figsize=(12, 6))
         plt.plot(y_test.index, y_test, label='Actual', marker='o')
@@ -124,24 +232,48 @@ class RandomForestPredictor:
         if not os.path.exists(self.config['model_dir']):
             os.makedirs(self.config['model_dir'])
         model_path = os.path.join(self.config['model_dir'], 'random_forest_model.joblib')
+        compact_path = os.path.join(self.config['model_dir'], 'random_forest_compact')
         scaler_path = os.path.join(self.config['model_dir'], 'random_forest_scalers.joblib')
-        dump(self.model, model_path)
+        if self.forest is not None:
+            if os.path.exists(model_path):
+                os.remove(model_path)
+            self.forest.save(compact_path)
+        else:
+            if os.path.exists(compact_path):
+                shutil.rmtree(compact_path)
+            dump(self.model, model_path)
         dump((self.scaler_x, self.scaler_y), scaler_path)
         logging.info(f"Model and scalers saved successfully to {self.config['model_dir']}")
 
     def load_model(self):
         model_path = os.path.join(self.config['model_dir'], 'random_forest_model.joblib')
+        compact_path = os.path.join(self.config['model_dir'], 'random_forest_compact')
         scaler_path = os.path.join(self.config['model_dir'], 'random_forest_scalers.joblib')
-        self.model = load(model_path)
+        if os.path.isdir(compact_path):
+            self.model = None
+            self.forest = ForestArrays.load(compact_path)
+            self.compiled = CompiledTreePredictor.from_forest_arrays(self.forest)
+        else:
+            self.model = load(model_path)
+            self.forest = None
+            self.compiled = None
         self.scaler_x, self.scaler_y = load(scaler_path)
         logging.info(f"Model and scalers loaded successfully from {self.config['model_dir']}")
 
 
+    def compile_inference(self, backend='auto'):
+        if self.model is None and self.forest is not None:
+            return self.compiled  # Compact forests already predict through their node arrays
+        if self.model is None:
+            raise ValueError("Model hasn't been trained or loaded yet.")
+        self.compiled = CompiledTreePredictor(self.model, backend)
+        return self.compiled
+
     def predict_new_data(self, ticker, start_date, end_date):
         df = self.download_and_prepare_data(ticker, start_date, end_date)
         X, y = self.prepare_features_and_target(df)
         X_scaled = self.scaler_x.transform(X)
-        predictions_scaled = self.model.predict(X_scaled)
+        predictions_scaled = self.predict_scaled(X_scaled)
         predictions = self.scaler_y.inverse_transform(predictions_scaled.reshape(-1, 1))
 
         mse = mean_squared_error(y, predictions)
@@ -10,9 +10,16 @@ import ta
 from bayes_opt import BayesianOptimization
 import yaml
 import os
+import json
+from tree_inference import CompiledTreePredictor
+from cross_asset import build_pooled_frame, time_split, latest_rows
+from job_callbacks import xgboost_callback
 
 
 class XGBoost_Predictor:
+    FEATURE_COLUMNS = ['Prev_Close', 'Prev_SMA_20', 'Prev_EMA_12', 'Prev_RSI', 'Prev_MACD',
+                       'Prev_BB_upper', 'Prev_BB_lower', 'Prev_OBV', 'Day_of_Week', 'Month', 'Volume']
+
     def __init__(self, config_path):
         with open(config_path, 'r') as f:
             self.config = yaml.safe_load(f)
@@ -23,15 +30,25 @@ class XGBoost_Predictor:
         self.test_size = self.config['test_size']
         self.plot_dir = self.config['plot_dir']
         self.hyperparameter_tuning = self.config['hyperparameter_tuning']
+        self.scaler_x = MinMaxScaler()
         self.scaler_y = MinMaxScaler()
 
         if not os.path.exists(self.plot_dir):
             os.makedirs(self.plot_dir)
 
         self.model = None
+        self.compiled = None  # Low-latency predictor of model, built by compile_inference
+        self.pooled_model = None
+        self.pooled_symbols = None
+        self.n_jobs = None  # Training threads; None = XGBoost's default (all cores)
 
     def download_data(self):
-        df = yf.download(self.ticker, start=self.start_date, end=self.end_date)
+        return self.add_features(yf.download(self.ticker, start=self.start_date, end=self.end_date))
+
+    def add_features(self, df):
+        # Accepts yfinance (Close) and DataAcquisition (close) column names
+        df = df.rename(columns={c: c.capitalize() for c in ('open', 'high', 'low', 'close', 'volume')
+                                if c in df.columns})
         df = df.dropna()
 
         # Technical Indicators
@@ -56,18 +73,17 @@ class XGBoost_Predictor:
         return df
 
     def prepare_data(self, df):
-        feature_columns = ['Prev_Close', 'Prev_SMA_20', 'Prev_EMA_12', 'Prev_RSI', 'Prev_MACD',
-                           'Prev_BB_upper', 'Prev_BB_lower', 'Prev_OBV', 'Day_of_Week', 'Month', 'Volume']
+        feature_columns = self.FEATURE_COLUMNS
 
         # Use TimeSeriesSplit for data splitting and get the last split for training and testing
         tscv = TimeSeriesSplit(n_splits=5)
         for train_index, test_index in tscv.split(df):
             pass  # Iterate until the last split
 
-        # Fit and transform scaler for the final split
-        scaler_x = MinMaxScaler()
-        X_train = scaler_x.fit_transform(df[feature_columns].iloc[train_index])
-        X_test = scaler_x.transform(df[feature_columns].iloc[test_index])
+        # Fit and transform scaler for the final split; kept to scale prediction inputs
+        self.scaler_x = MinMaxScaler()
+        X_train = self.scaler_x.fit_transform(df[feature_columns].iloc[train_index])
+        X_test = self.scaler_x.transform(df[feature_columns].iloc[test_index])
 
         self.scaler_y.fit(df[['Close']].iloc[train_index])  # Fit the scaler to the last split
         y_train = self.scaler_y.transform(df[['Close']].iloc[train_index])
@@ -75,8 +91,19 @@ class XGBoost_Predictor:
 
         return X_train, X_test, y_train, y_test
 
-    def optimize_xgb(self, X_train, y_train):
+    def prepare_prediction_data(self, df):
+        # Scaled features of every complete row; the last row's features forecast df's last close
+        return self.scaler_x.transform(self.add_features(df)[self.FEATURE_COLUMNS])
+
+    def optimize_xgb(self, X_train, y_train, job=None):
+        init_points = 5  # BayesianOptimization.maximize default
+        total = init_points + self.hyperparameter_tuning['n_iter']
+        evaluated = [0]
+
         def xgb_evaluate(max_depth, n_estimators, learning_rate, subsample, colsample_bytree):
+            if job is not None:
+                job.progress(evaluated[0] / total, f"XGBoost search: candidate {evaluated[0] + 1}/{total}")
+            evaluated[0] += 1
             params = {
                 'max_depth': int(max_depth),
                 'n_estimators': int(n_estimators),
@@ -85,7 +112,8 @@ class XGBoost_Predictor:
                 'colsample_bytree': colsample_bytree,
             }
 
-            model = xgb.XGBRegressor(**params)
+            model = xgb.XGBRegressor(**params, n_jobs=self.n_jobs,
+                                     callbacks=[xgboost_callback(job)] if job is not None else None)
             tscv = TimeSeriesSplit(n_splits=5)
 
             scores = []
@@ -117,11 +145,11 @@ class XGBoost_Predictor:
             random_state=42
         )
 
-        optimizer.maximize(n_iter=self.hyperparameter_tuning['n_iter'])
+        optimizer.maximize(init_points=init_points, n_iter=self.hyperparameter_tuning['n_iter'])
 
         return optimizer.max['params']
 
-    def train_model(self, X_train, y_train, params):
+    def train_model(self, X_train, y_train, params, job=None):
 
         params['max_depth'] = int(params['max_depth'])
         params['n_estimators'] = int(params['n_estimators'])
@@ -129,12 +157,55 @@ class XGBoost_Predictor:
         params['subsample'] = float(params['subsample'])
         params['colsample_bytree'] = float(params['colsample_bytree'])
 
-        self.model = xgb.XGBRegressor(**params)
+        self.model = xgb.XGBRegressor(**params, n_jobs=self.n_jobs,
+                                      callbacks=[xgboost_callback(job)] if job is not None else None)
+        self.compiled = None  # A compiled predictor of the previous model must not outlive the retrain
         self.model.fit(X_train, y_train)
+        self.model.set_params(callbacks=None)  # Keep the job out of saved models
 
     def predict(self, X):
         return self.model.predict(X)
 
+    def compile_inference(self, backend='auto'):
+        if self.model is None:
+            raise ValueError("Model hasn't been trained or loaded yet.")
+        self.compiled = CompiledTreePredictor(self.model, backend)
+        return self.compiled
+
+    def train_pooled(self, frames):
+        # One model across symbols: categorical symbol column, scale-free features, log-return target
+        self.pooled_symbols = sorted(frames)
+        X, y = build_pooled_frame(frames, self.pooled_symbols)
+        X_train, X_test, y_train, y_test = time_split(X, y, self.test_size)
+
+        params = dict(self.config.get('pooled_params', {}))
+        self.pooled_model = xgb.XGBRegressor(tree_method='hist', enable_categorical=True, n_jobs=self.n_jobs,
+                                             **params)
+        self.pooled_model.fit(X_train, y_train, eval_set=[(X_test, y_test)], verbose=False)
+
+        rmse = np.sqrt(mean_squared_error(y_test, self.pooled_model.predict(X_test)))
+        print(f"Pooled model over {len(self.pooled_symbols)} symbols, return RMSE:", rmse)
+        return rmse
+
+    def predict_pooled(self, frames):
+        # Returns {symbol: predicted next close}
+        if self.pooled_model is None:
+            raise ValueError("Pooled model hasn't been trained or loaded yet.")
+        X, closes = latest_rows(frames, self.pooled_symbols)
+        returns = self.pooled_model.predict(X)
+        return {symbol: closes[symbol] * float(np.exp(ret)) for symbol, ret in zip(X['symbol'].astype(str), returns)}
+
+    def save_pooled_model(self, filename):
+        self.pooled_model.save_model(filename)
+        with open(f"{os.path.splitext(filename)[0]}_symbols.json", 'w') as f:
+            json.dump(self.pooled_symbols, f)
+
+    def load_pooled_model(self, filename):
+        self.pooled_model = xgb.XGBRegressor()
+        self.pooled_model.load_model(filename)
+        with open(f"{os.path.splitext(filename)[0]}_symbols.json", 'r') as f:
+            self.pooled_symbols = json.load(f)
+
     def evaluate(self, y_true, y_pred):
         y_true_real = self.scaler_y.inverse_transform(y_true)
         y_pred_real = self.scaler_y.inverse_transform(y_pred.reshape(-1, 1))
@@ -162,6 +233,7 @@ class XGBoost_Predictor:
     def load_model(self, filename):
         self.model = xgb.XGBRegressor()
         self.model.load_model(filename)
+        self.compiled = None
 
     def run(self):
         df = self.download_data()
@@ -0,0 +1,408 @@
+"""
+Offline benchmarks over synthetic minute data.
+
+Covers _process_data, each model's training and batch prediction,
+MasterPredictor's recursive rollouts, _generate_master_prediction and chart rendering at sizes from one day
+to two years of 1m candles. Results are written as JSON and can be compared with
+a previous run to catch regressions:
+
+    python benchmarks/run_benchmarks.py --sizes 1d 1w 1m --output results.json
+    python benchmarks/run_benchmarks.py --compare results.json --threshold 1.25
+"""
+import os
+import sys
+import json
+import time
+import fnmatch
+import logging
+import argparse
+import platform
+import statistics
+import subprocess
+from datetime import datetime
+from typing import Callable, Dict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # Model configs are loaded from paths relative to the project root
+
+import numpy as np
+import pandas as pd
+
+from src.data.synthetic import generate_ohlcv
+
+SIZES = {"1d": 1440, "1w": 10080, "1m": 43200, "6m": 259200, "1y": 525600, "2y": 1051200}
+DEFAULT_SIZES = ["1d", "1w", "1m"]
+
+# Models are trained on at most this many rows so predict benchmarks on large
+# sizes measure inference, not a multi-hour fit
+TRAIN_ROWS = SIZES["1m"]
+
+# Fixed parameters replace the hyperparameter searches, which would dominate every run
+TRAIN_PARAMS = {
+    "CatBoost": {"iterations": 500, "learning_rate": 0.1, "depth": 6, "verbose": 0},
+    "LightGBM": {"num_leaves": 31, "learning_rate": 0.1},
+    "RandomForest": {"n_estimators": 100, "max_depth": 20, "n_jobs": -1, "random_state": 42},
+    "XGBoost": {"max_depth": 6, "n_estimators": 300, "learning_rate": 0.1, "subsample": 0.8,
+                "colsample_bytree": 0.8},
+    "LSTM": {"epochs": 1}
+}
+TREE_MODELS = ["CatBoost", "LightGBM", "RandomForest", "XGBoost"]
+
+BENCHMARKS: Dict[str, tuple] = {}
+
+
+def benchmark(name: str, max_size: str = "2y"):
+    """Register setup(ctx) -> callable as a benchmark for every size up to max_size"""
+    def register(setup: Callable):
+        BENCHMARKS[name] = (setup, SIZES[max_size])
+        return setup
+    return register
+
+
+class Context:
+    """Synthetic data, derived frames and trained models for one size, built once and shared"""
+
+    def __init__(self, rows: int, horizon: int):
+        self.rows = rows
+        self.horizon = horizon
+        self._cache = {}
+
+    def cached(self, key: str, build: Callable):
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    @property
+    def raw(self) -> pd.DataFrame:
+        return self.cached("raw", lambda: generate_ohlcv(self.rows))
+
+    @property
+    def processed(self) -> pd.DataFrame:
+        from src.data.data_acquisition import DataAcquisition
+        return self.cached("processed", lambda: DataAcquisition()._process_data(self.raw.copy()))
+
+    def trained(self, name: str):
+        return self.cached(f"model:{name}", lambda: train_model(name, self))[0]
+
+    def test_rows(self, name: str) -> np.ndarray:
+        """The held-out feature rows of a trained model, in the layout its predict takes"""
+        return self.cached(f"model:{name}", lambda: train_model(name, self))[1]
+
+
+def train_model(name: str, ctx: Context):
+    """
+    Train one model on the last TRAIN_ROWS processed candles with its module's own
+    features and training method, as MasterPredictor._train_* does, and return it
+    with its held-out feature rows.
+    """
+    data = ctx.processed.iloc[-TRAIN_ROWS:].copy()
+
+    if name == "LSTM":
+        from configs.LstmConfig import Config
+        from Lstm_model import LSTMPredictor
+        model = LSTMPredictor()
+        X_train, X_test, y_train, y_test = model.prepare_data(model.add_features(data))
+        epochs, Config.EPOCHS = Config.EPOCHS, TRAIN_PARAMS["LSTM"]["epochs"]
+        try:
+            model.train_model(X_train, y_train, X_test, y_test)
+        finally:
+            Config.EPOCHS = epochs
+        return model, X_test
+    if name == "CatBoost":
+        from Catboost_Regressor import CatBoostPredictor
+        model = CatBoostPredictor()
+        X_train, X_test, y_train, y_test = model.prepare_data(model.add_features(data))
+        model.train_model(X_train, y_train, X_test, y_test, dict(TRAIN_PARAMS[name]))
+        return model, X_test.to_numpy()
+    if name == "LightGBM":
+        from lgbm_model import LGBMRegressorModel
+        model = LGBMRegressorModel()
+        X_train, X_test, y_train, y_test = model.prepare_data(model.add_features(data))
+        model.booster = model.model(X_train, y_train, X_test, y_test, dict(TRAIN_PARAMS[name]))
+        return model, X_test
+    if name == "RandomForest":
+        from sklearn.ensemble import RandomForestRegressor
+        from Random_Forest_Regressor import RandomForestPredictor
+        model = RandomForestPredictor()
+        X, y = model.prepare_features_and_target(model.add_features(data))
+        cut = int(len(X) * (1 - model.config['test_size']))
+        X_train = model.scaler_x.fit_transform(X.iloc[:cut])
+        y_train = model.scaler_y.fit_transform(y.iloc[:cut].to_numpy().reshape(-1, 1)).ravel()
+        model.model = RandomForestRegressor(**TRAIN_PARAMS[name]).fit(X_train, y_train)
+        return model, model.scaler_x.transform(X.iloc[cut:])
+    if name == "XGBoost":
+        from Xgboost_model import XGBoost_Predictor
+        model = XGBoost_Predictor('configs/Xgboost_config.yaml')
+        X_train, X_test, y_train, _ = model.prepare_data(model.add_features(data))
+        model.train_model(X_train, y_train, dict(TRAIN_PARAMS[name]))
+        return model, X_test
+    if name == "Prophet":
+        from Prophet_model import MProphet
+        model = MProphet('configs/prophet_config.yaml')
+        model.data = model.to_prophet_frame(ctx.raw)
+        model.fit_predict()
+        return model, None
+    raise ValueError(f"Unknown model: {name}")
+
+
+def rollout_predictor(name: str, ctx: Context):
+    """A MasterPredictor whose name model is the benchmark's trained one"""
+    from src.models.master_predictor import MasterPredictor
+    predictor = MasterPredictor()
+    predictor.models[name] = ctx.trained(name)
+    return predictor
+
+
+@benchmark("features.process_data")
+def bench_process_data(ctx):
+    from src.data.data_acquisition import DataAcquisition
+    acquisition = DataAcquisition()
+    raw = ctx.raw
+    return lambda: acquisition._process_data(raw.copy())
+
+
+@benchmark("features.process_data.compact")
+def bench_process_data_compact(ctx):
+    from src.data.data_acquisition import DataAcquisition
+    from src.data.dtypes import compact_frame
+    acquisition = DataAcquisition(compact=True)
+    raw = compact_frame(ctx.raw)
+    return lambda: acquisition._process_data(raw.copy())
+
+
+@benchmark("features.process_data.polars")
+def bench_process_data_polars(ctx):
+    from src.data.data_acquisition import DataAcquisition
+    from src.data import polars_features
+    if not polars_features.available():
+        raise ImportError("polars is not installed")
+    acquisition = DataAcquisition(backend="polars")
+    raw = ctx.raw
+    return lambda: acquisition._process_data(raw.copy())
+
+
+def _register_model_benchmarks(name: str, train_max: str):
+    @benchmark(f"train.{name}", max_size=train_max)
+    def bench_train(ctx):
+        return lambda: train_model(name, ctx)
+
+    # Every step recomputes the model's features over the whole history, as MasterPredictor does
+    @benchmark(f"rollout.{name}", max_size="1m")
+    def bench_rollout(ctx):
+        """MasterPredictor.predict_model: the model's _predict_* forecast of ctx.horizon minutes"""
+        predictor = rollout_predictor(name, ctx)
+        data = ctx.processed
+        return lambda: predictor.predict_model(name, data, ctx.horizon)
+
+    if name == "Prophet":
+        @benchmark(f"predict.{name}")
+        def bench_predict(ctx):
+            model = ctx.trained(name)
+            return lambda: model.forecast_minutes(ctx.horizon)
+        return
+
+    if name == "LSTM":
+        @benchmark(f"predict.{name}", max_size="1y")
+        def bench_predict(ctx):
+            model = ctx.trained(name)
+            dataset = model.make_dataset(model.prepare_prediction_data(ctx.processed))
+            return lambda: model.predict(dataset)
+        return
+
+    @benchmark(f"predict.{name}")
+    def bench_predict(ctx):
+        from src.models.master_predictor import MasterPredictor
+        model = ctx.trained(name)
+        X = ctx.test_rows(name)
+        return lambda: MasterPredictor._tree_predict(model, X)
+
+    @benchmark(f"predict.{name}.compiled")
+    def bench_predict_compiled(ctx):
+        model = ctx.trained(name)
+        compiled = model.compile_inference()
+        model.compiled = None  # The other benchmarks share the model and time its native path
+        X = ctx.test_rows(name)
+        return lambda: compiled.predict_batch(X)
+
+
+for _name, _train_max in [("CatBoost", "1y"), ("LightGBM", "2y"), ("RandomForest", "1m"),
+                          ("XGBoost", "1y"), ("LSTM", "1w"), ("Prophet", "6m")]:
+    _register_model_benchmarks(_name, _train_max)
+
+
+def _synthetic_predictions(ctx) -> Dict[str, pd.DataFrame]:
+    index = pd.date_range(start=ctx.raw.index[-1], periods=ctx.horizon + 1, freq='min')[1:]
+    rng = np.random.default_rng(1)
+    last = float(ctx.raw['close'].iloc[-1])
+    return {name: pd.DataFrame({'Close': last * np.exp(np.cumsum(rng.normal(0, 0.0008, ctx.horizon)))},
+                               index=index)
+            for name in ["LSTM", "CatBoost", "LightGBM", "Prophet", "RandomForest", "XGBoost"]}
+
+
+@benchmark("ensemble.generate_master_prediction", max_size="1d")
+def bench_master(ctx):
+    from src.models.master_predictor import MasterPredictor
+    predictor = MasterPredictor()
+    predictions = _synthetic_predictions(ctx)
+    return lambda: predictor._generate_master_prediction(predictions)
+
+
+class _Switch:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+class _Theme:
+    def __init__(self):
+        self.current_theme = {"colors": {"background": "#000000", "text": "#ffffff", "secondary": "#14213d",
+                                         "accent": "#00ff9d"}}
+
+    @staticmethod
+    def get_indicator_color(indicator):
+        return {"buy": "#00ff00", "sell": "#ff0000"}.get(indicator, "#ffffff")
+
+
+def _register_chart_benchmark(graph_type: str):
+    @benchmark(f"chart.{graph_type}", max_size="1d")
+    def bench_chart(ctx):
+        """PredictionGraphsPage.update_graph on an off-screen Agg canvas with all models and overlays on"""
+        from types import SimpleNamespace
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from src.gui.pages.prediction_graphs import PredictionGraphsPage
+
+        predictions = _synthetic_predictions(ctx)
+        from src.models.master_predictor import MasterPredictor
+        master = MasterPredictor()._generate_master_prediction(predictions)
+        figure = Figure(figsize=(10, 6), dpi=100)
+        page = SimpleNamespace(
+            figure=figure,
+            canvas=FigureCanvasAgg(figure),
+            graph_type=_Switch(graph_type),
+            model_switches={name: _Switch(True) for name in ["MASTER", *predictions]},
+            overlay_switches={name: _Switch(True) for name in ["buy_sell", "high_low", "volatility", "volume"]},
+            model_colors={name: "#ffffff" for name in ["MASTER", *predictions]},
+            app=SimpleNamespace(theme_manager=_Theme(), state={
+                "selected_crypto": "BTCUSDT", "master_prediction": master, "individual_predictions": predictions
+            })
+        )
+        page.get_prediction = lambda model: PredictionGraphsPage.get_prediction(page, model)
+        page.add_overlay = lambda ax, overlay_id: PredictionGraphsPage.add_overlay(page, ax, overlay_id)
+        page.plot_candlesticks = lambda ax, data, model: PredictionGraphsPage.plot_candlesticks(page, ax, data, model)
+        return lambda: PredictionGraphsPage.update_graph(page)
+
+
+for _graph_type in ["line", "candle", "bar"]:
+    _register_chart_benchmark(_graph_type)
+
+
+def measure(fn: Callable, repeat: int, min_time: float) -> list:
+    """Run fn at least repeat times and until min_time seconds have passed; return per-run seconds"""
+    times = []
+    started = time.perf_counter()
+    while len(times) < repeat or time.perf_counter() - started < min_time:
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def environment() -> Dict:
+    versions = {}
+    for package in ["numpy", "pandas", "sklearn", "lightgbm", "xgboost", "catboost", "tensorflow",
+                    "prophet", "matplotlib"]:
+        try:
+            versions[package] = __import__(package).__version__
+        except Exception:
+            versions[package] = None
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except Exception:
+        commit = None
+    return {"timestamp": datetime.now().isoformat(), "python": platform.python_version(),
+            "platform": platform.platform(), "cpu_count": os.cpu_count(), "commit": commit, "versions": versions}
+
+
+def run(sizes, patterns, repeat: int, min_time: float, horizon: int) -> Dict:
+    logger = logging.getLogger(__name__)
+    results = []
+    for size in sizes:
+        ctx = Context(SIZES[size], horizon)
+        for name, (setup, max_rows) in BENCHMARKS.items():
+            if SIZES[size] > max_rows or not any(fnmatch.fnmatch(name, p) for p in patterns):
+                continue
+            result = {"name": name, "size": size, "rows": SIZES[size], "horizon": horizon}
+            try:
+                fn = setup(ctx)
+                fn()  # Warm-up: first-call compilation and lazy imports stay out of the timings
+                times = measure(fn, repeat, min_time)
+                result.update({"status": "ok", "runs": len(times), "min": min(times),
+                               "median": statistics.median(times), "mean": statistics.fmean(times),
+                               "stdev": statistics.stdev(times) if len(times) > 1 else 0.0})
+                logger.info(f"{name} [{size}]: median {result['median'] * 1000:.2f} ms over {len(times)} runs")
+            except Exception as e:
+                result.update({"status": "error", "error": f"{type(e).__name__}: {str(e)}"})
+                logger.error(f"{name} [{size}] failed: {str(e)}")
+            results.append(result)
+    return {"environment": environment(), "results": results}
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> list:
+    """Return (name, size, baseline median, current median, ratio) for every benchmark slower than threshold"""
+    previous = {(r["name"], r["size"]): r for r in baseline["results"] if r.get("status") == "ok"}
+    regressions = []
+    for result in current["results"]:
+        before = previous.get((result["name"], result["size"]))
+        if before is None or result.get("status") != "ok":
+            continue
+        ratio = result["median"] / before["median"]
+        if ratio > threshold:
+            regressions.append((result["name"], result["size"], before["median"], result["median"], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline CRYSTAL-CRYPTO-BALL benchmarks on synthetic data")
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES, choices=list(SIZES))
+    parser.add_argument("--only", nargs="+", default=["*"], help="Glob patterns of benchmark names to run")
+    parser.add_argument("--repeat", type=int, default=3, help="Minimum timed runs per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Minimum seconds spent timing each benchmark")
+    parser.add_argument("--horizon", type=int, default=60, help="Forecast minutes for rollouts, ensemble and charts")
+    parser.add_argument("--output", default="benchmarks/results.json", help="Where the JSON results are written")
+    parser.add_argument("--compare", metavar="BASELINE", help="Previous results file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Median slowdown ratio counted as a regression")
+    parser.add_argument("--list", action="store_true", help="List benchmark names and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, (_, max_rows) in BENCHMARKS.items():
+            print(f"{name}  (up to {max_rows} rows)")
+        return 0
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)  # Read first, the output may overwrite it
+
+    report = run(args.sizes, args.only, args.repeat, args.min_time, args.horizon)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(report['results'])} results to {args.output}")
+
+    if baseline is not None:
+        regressions = compare(report, baseline, args.threshold)
+        for name, size, before, after, ratio in regressions:
+            print(f"REGRESSION {name} [{size}]: {before * 1000:.2f} ms -> {after * 1000:.2f} ms ({ratio:.2f}x)")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
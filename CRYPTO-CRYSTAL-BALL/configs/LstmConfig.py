@@ -9,14 +9,21 @@ class Config:
     # Model parameters
     LSTM_UNITS = [128, 64]
     DENSE_UNITS = [32]
+    # StatefulLSTMPredictor cannot stream bidirectional layers; LSTMs saved while this
+    # defaulted to True keep predicting from windows but must be retrained to stream
+    BIDIRECTIONAL = False
     DROPOUT_RATE = 0.2
     LEARNING_RATE = 1e-3
     OPTIMIZER = Adam(learning_rate=LEARNING_RATE)
 
+    # Sequence parameters
+    LOOKBACK = 60
+
     # Training parameters
     BATCH_SIZE = 32
     EPOCHS = 100
     VALIDATION_SPLIT = 0.2
+    SHUFFLE_SEED = 42  # Order of the shuffled training windows
 
     # File paths
     MODEL_SAVE_PATH = "models/lstm_model.pkl"
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+RETURN_LAGS = (1, 5, 15, 60)
+POOLED_FEATURES = ['ret_1', 'ret_5', 'ret_15', 'ret_60', 'sma_ratio', 'ema_ratio', 'rsi',
+                   'volatility', 'volume_z', 'hour', 'day_of_week', 'symbol']
+
+
+def _column(df: pd.DataFrame, name: str) -> pd.Series:
+    """Look a column up case-insensitively so yfinance (Close) and exchange (close) frames both work."""
+    columns = {c.lower(): c for c in df.columns}
+    return df[columns[name]]
+
+
+def symbol_features(df: pd.DataFrame, sma_window: int = 20, ema_window: int = 12,
+                    rsi_window: int = 14) -> pd.DataFrame:
+    """
+    Scale-free features for one symbol's OHLCV frame.
+
+    Every price feature is a log return or a ratio to the close, and volume is
+    z-scored over a rolling day, so rows from assets trading at very different
+    prices and volumes are comparable inside one model.
+    """
+    close = _column(df, 'close').astype(float)
+    volume = _column(df, 'volume').astype(float)
+    log_close = np.log(close)
+
+    features = pd.DataFrame(index=df.index)
+    for lag in RETURN_LAGS:
+        features[f'ret_{lag}'] = log_close.diff(lag)
+    features['sma_ratio'] = close / close.rolling(window=sma_window).mean() - 1
+    features['ema_ratio'] = close / close.ewm(span=ema_window, adjust=False).mean() - 1
+
+    delta = close.diff()
+    gain = delta.clip(lower=0).rolling(window=rsi_window).mean()
+    loss = (-delta.clip(upper=0)).rolling(window=rsi_window).mean()
+    features['rsi'] = 1 - 1 / (1 + gain / loss)
+
+    features['volatility'] = features['ret_1'].rolling(window=sma_window).std()
+    volume_mean = volume.rolling(window=1440, min_periods=sma_window).mean()
+    volume_std = volume.rolling(window=1440, min_periods=sma_window).std()
+    features['volume_z'] = (volume - volume_mean) / volume_std.replace(0, np.nan)
+
+    index = pd.DatetimeIndex(df.index)
+    features['hour'] = index.hour
+    features['day_of_week'] = index.dayofweek
+    return features
+
+
+def build_pooled_frame(frames: Dict[str, pd.DataFrame], symbols: Optional[List[str]] = None,
+                       with_target: bool = True) -> Tuple[pd.DataFrame, Optional[pd.Series]]:
+    """
+    Stack per-symbol features into one frame with a categorical symbol column.
+
+    symbols fixes the category order so codes stay stable between training and
+    prediction. The target is the next period's log return of each symbol.
+    """
+    symbols = symbols or sorted(frames)
+    parts, targets = [], []
+    for symbol, df in frames.items():
+        features = symbol_features(df)
+        features['symbol'] = symbol
+        if with_target:
+            target = np.log(_column(df, 'close').astype(float)).diff().shift(-1)
+            valid = features.notna().all(axis=1) & target.notna()
+            targets.append(target[valid])
+        else:
+            valid = features.notna().all(axis=1)
+        parts.append(features[valid])
+
+    pooled = pd.concat(parts)
+    pooled['symbol'] = pd.Categorical(pooled['symbol'], categories=symbols)
+    pooled = pooled[POOLED_FEATURES]
+    return pooled, (pd.concat(targets) if with_target else None)
+
+
+def time_split(X: pd.DataFrame, y: pd.Series, test_size: float) -> Tuple[pd.DataFrame, pd.DataFrame,
+                                                                         pd.Series, pd.Series]:
+    """Split pooled rows at a single timestamp so no symbol's test period leaks into training."""
+    cutoff = pd.Series(X.index).quantile(1 - test_size)
+    train = X.index < cutoff
+    return X[train], X[~train], y[train], y[~train]
+
+
+def latest_rows(frames: Dict[str, pd.DataFrame], symbols: List[str]) -> Tuple[pd.DataFrame, Dict[str, float]]:
+    """Feature row for the most recent complete candle of each symbol plus that candle's close."""
+    X, _ = build_pooled_frame(frames, symbols, with_target=False)
+    last = X.groupby('symbol', observed=True).tail(1)
+    closes = {symbol: float(_column(frames[symbol], 'close').loc[index])
+              for symbol, index in zip(last['symbol'].astype(str), last.index)}
+    return last, closes
@@ -0,0 +1,163 @@
+"""Headless batch entry point: acquire -> train -> predict -> export, without the Tk GUI"""
+import os
+import sys
+import json
+import argparse
+import logging
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from src.utils.constants import MODEL_INFO
+from src.utils.resources import configure_process, process_cores
+
+MODEL_NAMES = [name for name in MODEL_INFO if name != "MASTER"]
+
+
+def setup_environment():
+    """Setup required directories"""
+    for directory in ['models', 'plots', 'logs', 'data']:
+        os.makedirs(directory, exist_ok=True)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run CRYSTAL-CRYPTO-BALL forecasts without the GUI")
+    parser.add_argument("symbols", nargs="+", help="Symbols to forecast, e.g. BTCUSDT ETHUSDT")
+    parser.add_argument("--models", nargs="+", default=MODEL_NAMES, choices=MODEL_NAMES,
+                        help="Models to enable (default: all)")
+    parser.add_argument("--start", help="History start date YYYY-MM-DD (default: --days before --end)")
+    parser.add_argument("--end", default=datetime.now().strftime("%Y-%m-%d"), help="History end date YYYY-MM-DD")
+    parser.add_argument("--days", type=int, default=30, help="Days of history when --start is not given")
+    parser.add_argument("--hours", type=int, default=1, help="Forecast length in hours")
+    parser.add_argument("--forecast-days", type=int, default=0, help="Additional forecast length in days")
+    parser.add_argument("--load-models", metavar="DIR",
+                        help="Load saved model bundles from DIR/<symbol> instead of training")
+    parser.add_argument("--save-models", metavar="DIR", help="Save trained model bundles to DIR/<symbol>")
+    parser.add_argument("--output-dir", default="data/forecasts", help="Where forecast files are written")
+    parser.add_argument("--format", choices=["json", "parquet"], default="json", help="Forecast file format")
+    parser.add_argument("--workers", type=int, default=1, help="Symbols processed in parallel processes")
+    parser.add_argument("--deadline", type=float, help="Ensemble deadline in seconds (default: wait for all)")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="Record stage timings and write them to PATH (.json, otherwise Prometheus text)")
+    parser.add_argument("--memory-profile", metavar="PATH",
+                        help="Profile peak and retained memory per stage and write a JSON report to PATH")
+    parser.add_argument("--compact", action="store_true", default=None,
+                        help="Hold candles as float32 with int8 calendar fields to roughly halve memory")
+    parser.add_argument("--feature-backend", choices=["pandas", "polars"],
+                        help="Feature pipeline implementation (default: DATA_ACQUISITION['feature_backend'])")
+    parser.add_argument("--log-level", default="INFO", help="Logging level")
+    return parser.parse_args(argv)
+
+
+def export_forecast(symbol, master_prediction, individual_predictions, output_dir, fmt):
+    """Write the master and per-model forecasts for one symbol as a single table"""
+    import pandas as pd
+
+    table = pd.DataFrame({"MASTER": master_prediction["Close"]})
+    for model_name, prediction in individual_predictions.items():
+        table[model_name] = prediction["Close"]
+    table.index.name = "timestamp"
+
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"{symbol}_forecast.{fmt}")
+    if fmt == "parquet":
+        table.to_parquet(path)
+    else:
+        table.reset_index().to_json(path, orient="records", date_format="iso", indent=2)
+    return path
+
+
+def run_symbol(symbol, args):
+    """Run the full pipeline for one symbol and return a summary"""
+    from src.data.data_acquisition import DataAcquisition
+    from src.models.master_predictor import MasterPredictor
+    from src.utils import instrumentation
+
+    parallel = args.workers > 1 and len(args.symbols) > 1
+    if parallel:
+        # Worker processes are reused across symbols, so start each symbol with empty measurements
+        instrumentation.registry.reset()
+    if args.metrics:
+        instrumentation.enable()
+    if args.memory_profile:
+        # Worker processes skip atexit handlers, so per-symbol reports are written below
+        mem_root, mem_ext = os.path.splitext(args.memory_profile)
+        profiler = instrumentation.enable_memory_profiling(f"{mem_root}_{symbol}{mem_ext}" if parallel
+                                                           else args.memory_profile)
+        if parallel:
+            profiler.reset()
+
+    logging.basicConfig(level=args.log_level, format='%(asctime)s - %(levelname)s - %(message)s')
+    logger = logging.getLogger(__name__)
+
+    end_date = args.end
+    start_date = args.start or (datetime.strptime(end_date, "%Y-%m-%d") - timedelta(days=args.days)).strftime("%Y-%m-%d")
+    enabled_models = {name: name in args.models for name in MODEL_NAMES}
+    forecast_length = {"hours": args.hours, "days": args.forecast_days}
+
+    logger.info(f"Acquiring {symbol} data from {start_date} to {end_date}")
+    data = DataAcquisition(compact=args.compact, backend=args.feature_backend).get_historical_data(symbol, start_date, end_date)
+
+    predictor = MasterPredictor()
+    if args.load_models:
+        predictor.load_models(os.path.join(args.load_models, symbol))
+    else:
+        predictor.train_models(data, enabled_models)
+        if args.save_models:
+            predictor.save_models(os.path.join(args.save_models, symbol))
+
+    master_prediction, individual_predictions = predictor.predict(data, forecast_length, enabled_models,
+                                                                  deadline=args.deadline)
+    path = export_forecast(symbol, master_prediction, individual_predictions, args.output_dir, args.format)
+    logger.info(f"Wrote {symbol} forecast to {path}")
+    if args.metrics and parallel:
+        # Each worker process has its own registry, so write one file per symbol
+        root, ext = os.path.splitext(args.metrics)
+        instrumentation.export(f"{root}_{symbol}{ext}")
+    if args.memory_profile:
+        logger.info(f"Memory by stage:\n{profiler.format_report()}")
+        if parallel:
+            profiler.export(f"{mem_root}_{symbol}{mem_ext}")
+    return {"symbol": symbol, "path": path, "models": sorted(individual_predictions),
+            "weights": predictor.weights}
+
+
+def main(argv=None):
+    """Main entry point of the headless CLI"""
+    args = parse_args(argv)
+    setup_environment()
+    logging.basicConfig(level=args.log_level, format='%(asctime)s - %(levelname)s - %(message)s')
+    logger = logging.getLogger(__name__)
+
+    results, failures = [], []
+    if args.workers > 1 and len(args.symbols) > 1:
+        workers = min(args.workers, len(args.symbols))
+        # Split the cores between the worker processes so their thread pools do not oversubscribe the machine
+        cores = max(1, process_cores() // workers)
+        logger.info(f"Running {workers} workers with {cores} cores each")
+        with ProcessPoolExecutor(max_workers=workers, initializer=configure_process,
+                                 initargs=(cores,)) as executor:
+            futures = {executor.submit(run_symbol, symbol, args): symbol for symbol in args.symbols}
+            for future in as_completed(futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logger.error(f"Error processing {futures[future]}: {str(e)}")
+                    failures.append(futures[future])
+    else:
+        for symbol in args.symbols:
+            try:
+                results.append(run_symbol(symbol, args))
+            except Exception as e:
+                logger.error(f"Error processing {symbol}: {str(e)}")
+                failures.append(symbol)
+
+    if args.metrics and not (args.workers > 1 and len(args.symbols) > 1):
+        from src.utils import instrumentation
+        instrumentation.export(args.metrics)
+
+    print(json.dumps({"completed": results, "failed": failures}, indent=2, default=str))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
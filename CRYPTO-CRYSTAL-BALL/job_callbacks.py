@@ -0,0 +1,132 @@
+"""
+Hooks that make the model modules' fits and hyperparameter searches cancellable.
+
+Each hook takes a job (src/utils/jobs.py Job: check(), progress(fraction,
+message) and cancelled) and checks it from inside the library's training loop:
+every boosting round and every Keras batch. A cancelled job then stops
+training within one round or batch instead of after the whole fit, and the
+fit raises the job's JobCancelled. Work with no callbacks, such as
+scikit-learn searches and CatBoost's grid_search, runs in a child process
+that a cancellation terminates.
+"""
+import multiprocessing
+
+
+class LightGBMJobCallback:
+    """LightGBM callback for lgb.train(callbacks=...) and LGBMModel.fit(callbacks=...)"""
+
+    order = 0  # Before early stopping (30) so a cancelled round is not evaluated
+
+    def __init__(self, job, label: str = "LightGBM"):
+        self.job = job
+        self.label = label
+
+    def __call__(self, env) -> None:
+        rounds = max(1, env.end_iteration - env.begin_iteration)
+        self.job.progress((env.iteration - env.begin_iteration + 1) / rounds,
+                          f"{self.label}: round {env.iteration + 1}/{env.end_iteration}")
+
+
+def xgboost_callback(job):
+    """XGBoost TrainingCallback that checks the job after every boosting round"""
+    import xgboost as xgb
+
+    class _JobCallback(xgb.callback.TrainingCallback):
+        def after_iteration(self, model, epoch, evals_log) -> bool:
+            job.check()
+            return False
+
+        def __deepcopy__(self, memo):
+            # The sklearn wrapper deep-copies callbacks; the job must stay shared
+            return self
+
+    return _JobCallback()
+
+
+class CatBoostJobCallback:
+    """CatBoost fit(callbacks=...) object; CatBoost stops when after_iteration returns False"""
+
+    def __init__(self, job, iterations: int, label: str = "CatBoost"):
+        self.job = job
+        self.iterations = max(1, iterations)
+        self.label = label
+
+    def after_iteration(self, info) -> bool:
+        if self.job.cancelled:
+            return False
+        try:
+            self.job.progress(info.iteration / self.iterations,
+                              f"{self.label}: iteration {info.iteration}/{self.iterations}")
+        except Exception:
+            return False  # Cancelled between the check and the report; CatBoost would wrap the exception
+        return True
+
+
+def keras_callback(job, epochs: int, label: str = "LSTM"):
+    """Keras callback that ends fit() after the current batch once the job is cancelled"""
+    import tensorflow as tf
+
+    class _JobCallback(tf.keras.callbacks.Callback):
+        def on_train_batch_end(self, batch, logs=None):
+            if job.cancelled:
+                self.model.stop_training = True
+
+        def on_epoch_end(self, epoch, logs=None):
+            if not job.cancelled:
+                job.progress((epoch + 1) / epochs, f"{label}: epoch {epoch + 1}/{epochs}")
+
+    return _JobCallback()
+
+
+def run_cancellable(job, fn, *args, label: str = "job", poll_interval: float = 0.2):
+    """
+    Run fn(*args) in a child process and return its result, checking the job
+    every poll_interval seconds. For native code with no callbacks, such as
+    CatBoost's grid_search and scikit-learn searches: a cancelled job
+    terminates the process and raises JobCancelled. fn must be a module-level
+    function so it can be pickled.
+
+    args travel to the child pickled and the result comes back the same way,
+    so a call costs a process start plus one copy each of the training data
+    and of the result (a fitted search includes its best_estimator_). Both are
+    small next to a hyperparameter search, which is what this is used for, so
+    no file or shared-memory transport is used.
+    """
+    job.progress(0.0, f"{label}: running")
+    pool = multiprocessing.get_context("spawn").Pool(1)
+    try:
+        result = pool.apply_async(fn, args)
+        while True:
+            try:
+                value = result.get(timeout=poll_interval)
+                break
+            except multiprocessing.TimeoutError:
+                job.check()
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+    job.progress(1.0, f"{label}: done")
+    return value
+
+
+def _fit(search, X, y, fit_params):
+    return search.fit(X, y, **fit_params)
+
+
+def fit_search(search, job, X, y, label: str = "search", **fit_params):
+    """
+    Fit a scikit-learn search (GridSearchCV, RandomizedSearchCV) that a
+    cancelled job stops.
+
+    search.fit runs unchanged in a run_cancellable child process, which a
+    cancellation terminates along with the search's joblib workers, and the
+    fitted attributes are copied back onto search. Without a job this is just
+    search.fit(X, y, **fit_params). fit_params are pickled into the child, so
+    they must not hold the job.
+    """
+    if job is None:
+        return search.fit(X, y, **fit_params)
+    fitted = run_cancellable(job, _fit, search, X, y, fit_params, label=label)
+    search.__dict__.update(fitted.__dict__)
+    return search
@@ -12,7 +12,11 @@ import matplotlib.pyplot as plt
 import os
 import joblib
 import yaml
+import json
 from pathlib import Path
+from tree_inference import CompiledTreePredictor
+from cross_asset import build_pooled_frame, time_split, latest_rows
+from job_callbacks import LightGBMJobCallback, fit_search
 
 
 class LGBMRegressorModel:
@@ -23,6 +27,9 @@ class LGBMRegressorModel:
     prediction, and visualization for stock price data using LightGBM.
     """
 
+    FEATURE_COLUMNS = ['Prev_Close', 'Prev_SMA_20', 'Prev_EMA_12', 'Prev_RSI', 'Day_of_Week',
+                       'Volume', 'Open', 'High', 'Low']
+
     def __init__(self, config_path='configs/LGBM_Config.yaml'):
         """
         Initialize the LGBMRegressorModel.
@@ -31,6 +38,11 @@ class LGBMRegressorModel:
             config_path (str): Path to the configuration YAML file.
         """
         self.config = self.load_config(config_path)
+        self.booster = None
+        self.compiled = None  # Low-latency predictor of booster, built by compile_inference
+        self.pooled_booster = None
+        self.pooled_symbols = None
+        self.n_jobs = None  # Training threads; None = LightGBM's default (all cores)
         self.ensure_directories()
 
     @staticmethod
@@ -64,7 +76,20 @@ class LGBMRegressorModel:
         Returns:
             tuple: X_train, X_test, y_train, y_test for model training.
         """
-        df = yf.download(ticker, start=start, end=end)
+        return self.prepare_data(self.add_features(yf.download(ticker, start=start, end=end)))
+
+    def add_features(self, df):
+        """
+        Add the model's technical indicators and lagged features.
+
+        Args:
+            df (pd.DataFrame): OHLCV data with yfinance (Close) or DataAcquisition (close) column names.
+
+        Returns:
+            pd.DataFrame: Data with the feature columns, without incomplete rows.
+        """
+        df = df.rename(columns={c: c.capitalize() for c in ('open', 'high', 'low', 'close', 'volume')
+                                if c in df.columns})
         df = df.dropna()
 
         # Technical Indicators
@@ -85,19 +110,54 @@ class LGBMRegressorModel:
         df['Prev_EMA_12'] = df['EMA_12'].shift(1)
         df['Prev_RSI'] = df['RSI'].shift(1)
 
-        df = df.dropna()
+        return df.dropna()
+
+    def prepare_data(self, df):
+        """
+        Scale the features and target and split them in time order.
+
+        Args:
+            df (pd.DataFrame): Output of add_features.
 
+        Returns:
+            tuple: X_train, X_test, y_train, y_test for model training.
+        """
         # Separate scalers for each column
         self.scaler_x = MinMaxScaler()
         self.scaler_y = MinMaxScaler()
-        x = self.scaler_x.fit_transform(df[['Prev_Close', 'Prev_SMA_20', 'Prev_EMA_12', 'Prev_RSI', 'Day_of_Week',
-                                            'Volume', 'Open', 'High', 'Low']])
+        x = self.scaler_x.fit_transform(df[self.FEATURE_COLUMNS])
         y = self.scaler_y.fit_transform(df[['Close']])
 
         X_train, X_test, y_train, y_test = train_test_split(x, y, test_size=self.config['test_size'], shuffle=False)
         return X_train, X_test, y_train, y_test
 
-    def model(self, X_train, y_train, X_test, y_test, best_params):
+    def prepare_prediction_data(self, df):
+        """
+        Scaled features of every complete row of an OHLCV frame.
+
+        Args:
+            df (pd.DataFrame): OHLCV data; the last row's features forecast its close.
+
+        Returns:
+            np.array: Features scaled like the training data.
+        """
+        return self.scaler_x.transform(self.add_features(df)[self.FEATURE_COLUMNS])
+
+    def predict(self, X):
+        """
+        Predict scaled targets with the trained booster.
+
+        Args:
+            X (np.array): Scaled features.
+
+        Returns:
+            np.array: Scaled predictions; scaler_y.inverse_transform converts them to prices.
+        """
+        if self.booster is None:
+            raise ValueError("Model hasn't been trained or loaded yet.")
+        return self.booster.predict(X)
+
+    def model(self, X_train, y_train, X_test, y_test, best_params, job=None):
         """
         Train the LightGBM model with the best parameters.
 
@@ -107,29 +167,35 @@ class LGBMRegressorModel:
             X_test (np.array): Testing features.
             y_test (np.array): Testing target.
             best_params (dict): Best parameters from grid search.
+            job (Job, optional): Checked and given progress every boosting round.
 
         Returns:
             lgb.Booster: Trained LightGBM model.
         """
         params = self.config['lgbm_params'].copy()
         params.update(best_params)
+        params['num_threads'] = self.n_jobs or 0  # 0 = OpenMP default
 
         lgb_train = lgb.Dataset(X_train, y_train)
         lgb_eval = lgb.Dataset(X_test, y_test, reference=lgb_train)
 
         early_stopping_callback = lgb.early_stopping(stopping_rounds=self.config['early_stopping_rounds'], verbose=True)
+        callbacks = [early_stopping_callback]
+        if job is not None:
+            callbacks.append(LightGBMJobCallback(job))
 
         model = lgb.train(
             params,
             lgb_train,
             num_boost_round=self.config['num_boost_round'],
             valid_sets=lgb_eval,
-            callbacks=[early_stopping_callback]
+            callbacks=callbacks
         )
+        self.compiled = None  # A compiled predictor of the previous booster must not outlive the retrain
 
         return model
 
-    def grid(self, X_train, y_train, X_test, y_test):
+    def grid(self, X_train, y_train, X_test, y_test, job=None):
         """
         Perform grid search for hyperparameter tuning.
 
@@ -138,6 +204,7 @@ class LGBMRegressorModel:
             y_train (np.array): Training target.
             X_test (np.array): Testing features.
             y_test (np.array): Testing target.
+            job (Job, optional): Cancels the search, which then runs in a child process.
 
         Returns:
             tuple: GridSearchCV object and best parameters.
@@ -150,16 +217,15 @@ class LGBMRegressorModel:
         early_stopping_callback = lgb.early_stopping(stopping_rounds=self.config['early_stopping_rounds'], verbose=True)
 
         grid_search = GridSearchCV(
-            estimator=lgb.LGBMRegressor(**self.config['lgbm_params']),
+            estimator=lgb.LGBMRegressor(**self.config['lgbm_params'], n_jobs=self.n_jobs),
             param_grid=param_grid,
             scoring='neg_mean_squared_error',
             cv=self.config['cv_folds'],
             verbose=2
         )
 
-        grid_search.fit(X_train, y_train,
-                        eval_set=[(X_test, y_test)],
-                        callbacks=[early_stopping_callback])
+        fit_search(grid_search, job, X_train, y_train, label="LightGBM search",
+                   eval_set=[(X_test, y_test)], callbacks=[early_stopping_callback])
 
         best_model = grid_search.best_estimator_
         print("Best Parameters:", grid_search.best_params_)
@@ -197,6 +263,101 @@ class LGBMRegressorModel:
 
         return rmse
 
+    def compile_inference(self, backend='auto'):
+        """
+        Wrap the trained booster for low-latency single-row and batch prediction.
+
+        Args:
+            backend (str): 'auto', 'native' or 'treelite'.
+
+        Returns:
+            CompiledTreePredictor: Predictor exposing predict_one and predict_batch.
+        """
+        if self.booster is None:
+            raise ValueError("Model hasn't been trained or loaded yet.")
+        self.compiled = CompiledTreePredictor(self.booster, backend)
+        return self.compiled
+
+    def train_pooled(self, frames):
+        """
+        Fit one LightGBM model across many symbols.
+
+        Rows from every symbol are stacked with a categorical symbol feature and
+        scale-free return/ratio features, and the target is the next period's log
+        return, so a single booster serves the whole universe.
+
+        Args:
+            frames (dict): Symbol -> OHLCV DataFrame with a DatetimeIndex.
+
+        Returns:
+            tuple: Trained lgb.Booster and test RMSE of the predicted log returns.
+        """
+        self.pooled_symbols = sorted(frames)
+        X, y = build_pooled_frame(frames, self.pooled_symbols)
+        X_train, X_test, y_train, y_test = time_split(X, y, self.config['test_size'])
+
+        params = self.config['lgbm_params'].copy()
+        params.update(self.config.get('pooled_params', {}))
+        params['num_threads'] = self.n_jobs or 0
+
+        lgb_train = lgb.Dataset(X_train, y_train, categorical_feature=['symbol'])
+        lgb_eval = lgb.Dataset(X_test, y_test, reference=lgb_train)
+        early_stopping_callback = lgb.early_stopping(stopping_rounds=self.config['early_stopping_rounds'], verbose=True)
+
+        self.pooled_booster = lgb.train(
+            params,
+            lgb_train,
+            num_boost_round=self.config.get('pooled_num_boost_round', self.config['num_boost_round']),
+            valid_sets=lgb_eval,
+            callbacks=[early_stopping_callback]
+        )
+
+        rmse = math.sqrt(mean_squared_error(y_test, self.pooled_booster.predict(X_test)))
+        print(f'Pooled model over {len(self.pooled_symbols)} symbols, return RMSE: {rmse}')
+        return self.pooled_booster, rmse
+
+    def predict_pooled(self, frames):
+        """
+        Predict the next close of every symbol with the pooled model.
+
+        Args:
+            frames (dict): Symbol -> recent OHLCV DataFrame. Symbols must have been seen in training.
+
+        Returns:
+            dict: Symbol -> predicted next close.
+        """
+        if self.pooled_booster is None:
+            raise ValueError("Pooled model hasn't been trained or loaded yet.")
+        X, closes = latest_rows(frames, self.pooled_symbols)
+        returns = self.pooled_booster.predict(X)
+        return {symbol: closes[symbol] * math.exp(ret) for symbol, ret in zip(X['symbol'].astype(str), returns)}
+
+    def save_pooled_model(self, name='pooled'):
+        """
+        Save the pooled booster and its symbol vocabulary.
+
+        Args:
+            name (str): File name prefix inside models/.
+        """
+        self.pooled_booster.save_model(f'models/{name}_lgbm_model.txt')
+        with open(f'models/{name}_lgbm_symbols.json', 'w') as f:
+            json.dump(self.pooled_symbols, f)
+
+    def load_pooled_model(self, name='pooled'):
+        """
+        Load a pooled booster saved by save_pooled_model.
+
+        Args:
+            name (str): File name prefix inside models/.
+
+        Returns:
+            lgb.Booster: Loaded pooled model.
+        """
+        self.pooled_booster = lgb.Booster(model_file=f'models/{name}_lgbm_model.txt')
+        with open(f'models/{name}_lgbm_symbols.json', 'r') as f:
+            self.pooled_symbols = json.load(f)
+        return self.pooled_booster
+
     def save_model(self, model, ticker):
         """
         Save the trained model and scalers.
@@ -239,6 +400,7 @@ class LGBMRegressorModel:
         X_train, X_test, y_train, y_test = self.yfdown(ticker, start_date, end_date)
         grid_search, best_params = self.grid(X_train, y_train, X_test, y_test)
         model = self.model(X_train, y_train, X_test, y_test, best_params)
+        self.booster = model
         rmse = self.yhat(ticker, model, X_test, y_test)
         print(f'RMSE: {rmse}')
         self.save_model(model, ticker)
@@ -0,0 +1,254 @@
+import numpy as np
+import logging
+import os
+import json
+import shutil
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sklearn.preprocessing import MinMaxScaler
+
+from tree_inference import ForestArrays, CompiledTreePredictor
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+SCALER_FIELDS = ('min_', 'scale_', 'data_min_', 'data_max_', 'data_range_', 'n_samples_seen_')
+
+
+def save_scaler(scaler: MinMaxScaler, directory: str) -> None:
+    """Write the fitted arrays of a MinMaxScaler as one .npy file per attribute."""
+    os.makedirs(directory, exist_ok=True)
+    for name in SCALER_FIELDS:
+        np.save(os.path.join(directory, f'{name}.npy'), np.asarray(getattr(scaler, name)))
+    np.save(os.path.join(directory, 'feature_range.npy'), np.asarray(scaler.feature_range))
+
+
+def load_scaler(directory: str) -> MinMaxScaler:
+    """Rebuild a fitted MinMaxScaler from arrays written by save_scaler()."""
+    scaler = MinMaxScaler(feature_range=tuple(np.load(os.path.join(directory, 'feature_range.npy')).tolist()))
+    for name in SCALER_FIELDS:
+        setattr(scaler, name, np.load(os.path.join(directory, f'{name}.npy')))
+    scaler.n_features_in_ = scaler.min_.shape[0]
+    return scaler
+
+
+def _save_scalers(predictor: Any, directory: str, files: Dict[str, str]) -> None:
+    for name in ('scaler_x', 'scaler_y'):
+        scaler = getattr(predictor, name, None)
+        if scaler is not None and hasattr(scaler, 'min_'):
+            save_scaler(scaler, os.path.join(directory, name))
+            files[name] = name
+
+
+def _load_scalers(predictor: Any, directory: str, files: Dict[str, str]) -> None:
+    for name in ('scaler_x', 'scaler_y'):
+        if name in files:
+            setattr(predictor, name, load_scaler(os.path.join(directory, files[name])))
+
+
+def _save_lstm(predictor: Any, directory: str, files: Dict[str, str]) -> None:
+    predictor.model.save(os.path.join(directory, 'model.keras'))
+    files['model'] = 'model.keras'
+
+
+def _load_lstm(predictor: Any, directory: str, files: Dict[str, str]) -> None:
+    import tensorflow as tf
+    predictor.model = tf.keras.models.load_model(os.path.join(directory, files['model']), compile=False)
+    predictor._inference_fn = None
+
+
+def _save_catboost(predictor: Any, directory: str, files: Dict[str, str]) -> None:
+    predictor.model.save_model(os.path.join(directory, 'model.cbm'), format='cbm')
+    files['model'] = 'model.cbm'
+
+
+def _load_catboost(predictor: Any, directory: str, files: Dict[str, str]) -> None:
+    from catboost import CatBoostRegressor
+    predictor.model = CatBoostRegressor()
+    predictor.model.load_model(os.path.join(directory, files['model']), format='cbm')
+
+
+def _save_lightgbm(predictor: Any, directory: str, files: Dict[str, str]) -> None:
+    predictor.booster.save_model(os.path.join(directory, 'model.txt'))
+    files['model'] = 'model.txt'
+
+
+def _load_lightgbm(predictor: Any, directory: str, files: Dict[str, str]) -> None:
+    import lightgbm as lgb
+    predictor.booster = lgb.Booster(model_file=os.path.join(directory, files['model']))
+
+
+def _save_xgboost(predictor: Any, directory: str, files: Dict[str, str]) -> None:
+    predictor.model.save_model(os.path.join(directory, 'model.ubj'))
+    files['model'] = 'model.ubj'
+
+
+def _load_xgboost(predictor: Any, directory: str, files: Dict[str, str]) -> None:
+    import xgboost as xgb
+    predictor.model = xgb.XGBRegressor()
+    predictor.model.load_model(os.path.join(directory, files['model']))
+
+
+def _save_random_forest(predictor: Any, directory: str, files: Dict[str, str]) -> None:
+    forest = predictor.forest if predictor.forest is not None else ForestArrays.from_sklearn(predictor.model)
+    forest.save(os.path.join(directory, 'forest'))
+    files['model'] = 'forest'
+
+
+def _load_random_forest(predictor: Any, directory: str, files: Dict[str, str]) -> None:
+    # The sklearn estimator is not stored; predictions go through the mapped node arrays
+    predictor.model = None
+    predictor.forest = ForestArrays.load(os.path.join(directory, files['model']), mmap_mode='r')
+    predictor.compiled = CompiledTreePredictor.from_forest_arrays(predictor.forest)
+
+
+def _save_prophet(predictor: Any, directory: str, files: Dict[str, str]) -> None:
+    from prophet.serialize import model_to_json
+    with open(os.path.join(directory, 'model.json'), 'w') as f:
+        f.write(model_to_json(predictor.model))
+    files['model'] = 'model.json'
+    if predictor.warm_start_init is not None:
+        with open(os.path.join(directory, 'params.json'), 'w') as f:
+            json.dump({name: np.asarray(value).tolist() for name, value in predictor.warm_start_init.items()}, f)
+        files['params'] = 'params.json'
+
+
+def _load_prophet(predictor: Any, directory: str, files: Dict[str, str]) -> None:
+    from prophet.serialize import model_from_json
+    with open(os.path.join(directory, files['model']), 'r') as f:
+        predictor.model = model_from_json(f.read())
+    if 'params' in files:
+        with open(os.path.join(directory, files['params']), 'r') as f:
+            predictor.warm_start_init = {name: np.asarray(value) for name, value in json.load(f).items()}
+
+
+# Model name -> (attributes that hold a trained model, saver, loader)
+HANDLERS: Dict[str, tuple] = {
+    'LSTM': (('model',), _save_lstm, _load_lstm),
+    'CatBoost': (('model',), _save_catboost, _load_catboost),
+    'LightGBM': (('booster',), _save_lightgbm, _load_lightgbm),
+    'Prophet': (('model',), _save_prophet, _load_prophet),
+    'RandomForest': (('model', 'forest'), _save_random_forest, _load_random_forest),
+    'XGBoost': (('model',), _save_xgboost, _load_xgboost),
+}
+
+
+def _handler(name: str) -> tuple:
+    if name not in HANDLERS:
+        raise ValueError(f"No bundle format for model '{name}'. Choose from {list(HANDLERS)}")
+    return HANDLERS[name]
+
+
+def is_trained(name: str, predictor: Any) -> bool:
+    """Whether predictor holds a trained model that save_bundle() can write."""
+    attributes, _, _ = _handler(name)
+    return any(getattr(predictor, attribute, None) is not None for attribute in attributes)
+
+
+def save_bundle(name: str, predictor: Any, directory: str) -> Dict[str, Any]:
+    """
+    Write a trained predictor as a bundle directory and return its manifest.
+
+    A bundle holds the model in its library's native format (Keras, CatBoost cbm,
+    LightGBM text, XGBoost UBJSON, Prophet JSON, or flattened .npy node arrays
+    for RandomForest), each fitted scaler as .npy arrays, and a manifest.json
+    describing the files.
+    """
+    _, saver, _ = _handler(name)
+    if not is_trained(name, predictor):
+        raise ValueError(f"{name} model hasn't been trained or loaded yet.")
+
+    if os.path.exists(directory):
+        shutil.rmtree(directory)
+    os.makedirs(directory)
+
+    files: Dict[str, str] = {}
+    saver(predictor, directory, files)
+    _save_scalers(predictor, directory, files)
+
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'name': name,
+        'created': datetime.now().isoformat(),
+        'files': files,
+    }
+    with open(os.path.join(directory, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    logger.info(f"Saved {name} bundle to {directory}")
+    return manifest
+
+
+def read_manifest(directory: str) -> Dict[str, Any]:
+    """Read and validate a bundle's manifest.json."""
+    path = os.path.join(directory, MANIFEST_NAME)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Bundle manifest not found: {path}")
+    with open(path, 'r') as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported bundle format version {manifest.get('format_version')} in {path}")
+    return manifest
+
+
+def load_bundle(predictor: Any, directory: str, manifest: Optional[Dict[str, Any]] = None) -> Any:
+    """Fill an untrained predictor instance from a bundle directory and return it."""
+    manifest = manifest or read_manifest(directory)
+    _, _, loader = _handler(manifest['name'])
+    loader(predictor, directory, manifest['files'])
+    _load_scalers(predictor, directory, manifest['files'])
+    logger.info(f"Loaded {manifest['name']} bundle from {directory}")
+    return predictor
+
+
+class LazyBundle:
+    """
+    Stand-in for a predictor whose bundle is only opened on first use.
+
+    Constructing one reads nothing but the manifest. The first attribute access
+    or assignment loads the bundle into the wrapped predictor and from then on
+    everything is forwarded to it.
+    """
+
+    def __init__(self, predictor: Any, directory: str):
+        object.__setattr__(self, '_predictor', predictor)
+        object.__setattr__(self, '_directory', directory)
+        object.__setattr__(self, '_manifest', read_manifest(directory))
+        object.__setattr__(self, '_loaded', False)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    @property
+    def manifest(self) -> Dict[str, Any]:
+        return self._manifest
+
+    @property
+    def predictor(self) -> Any:
+        """The wrapped predictor, without triggering a load."""
+        return self._predictor
+
+    def load(self) -> Any:
+        """Load the bundle if needed and return the underlying predictor."""
+        if not self._loaded:
+            load_bundle(self._predictor, self._directory, self._manifest)
+            object.__setattr__(self, '_loaded', True)
+        return self._predictor
+
+    def __getattr__(self, item: str) -> Any:
+        return getattr(self.load(), item)
+
+    def __setattr__(self, key: str, value: Any) -> None:
+        setattr(self.load(), key, value)
+
+
+def unwrap(model: Any) -> Any:
+    """Return the real predictor behind a LazyBundle, loading it if needed."""
+    return model.load() if isinstance(model, LazyBundle) else model
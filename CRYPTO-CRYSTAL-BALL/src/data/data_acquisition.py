@@ -6,19 +6,51 @@ import numpy as np
 from datetime import datetime, timedelta
 import requests
 import logging
+import os
 import time
 from typing import Dict, List, Optional, Tuple
 import websocket
 import json
 
+from ..utils.constants import DATA_ACQUISITION, WEBSOCKET
+from ..utils.instrumentation import count, timer
+from ..utils.jobs import Job
+from .dtypes import calendar_features, compact_frame, parse_numeric
+from . import polars_features
+
 class DataAcquisition:
     """
     Class to handle cryptocurrency data acquisition from multiple sources
     with built-in redundancy and minute-by-minute granularity
     """
     
-    def __init__(self):
+    def __init__(self, endpoints: Optional[Dict[str, str]] = None, sources: Optional[List[str]] = None,
+                 compact: Optional[bool] = None, backend: Optional[str] = None):
+        """
+        endpoints overrides the exchange base URLs in DATA_ACQUISITION["endpoints"]
+        (also settable as CCB_<KEY>_URL environment variables) and sources limits
+        and orders the historical data sources tried (also CCB_SOURCES, comma separated),
+        e.g. to point everything at a LocalExchange.
+
+        compact selects the compact dtype mode (see dtypes.py); it defaults to
+        DATA_ACQUISITION["compact_dtypes"] or the CCB_COMPACT_DTYPES environment variable.
+        backend picks the feature implementation, "pandas" or "polars" (see
+        polars_features.py); it defaults to DATA_ACQUISITION["feature_backend"]
+        or CCB_FEATURE_BACKEND.
+        """
         self.logger = logging.getLogger(__name__)
+        if compact is None:
+            compact = DATA_ACQUISITION["compact_dtypes"] or bool(os.environ.get("CCB_COMPACT_DTYPES"))
+        self.compact = compact
+        self.backend = backend or os.environ.get("CCB_FEATURE_BACKEND", DATA_ACQUISITION["feature_backend"])
+        if self.backend == "polars" and not polars_features.available():
+            self.logger.warning("polars is not installed; using the pandas feature backend")
+            self.backend = "pandas"
+        elif self.backend not in ("pandas", "polars"):
+            raise ValueError(f"Unknown feature backend: {self.backend}")
+        self.endpoints = {key: os.environ.get(f"CCB_{key.upper()}_URL", url)
+                          for key, url in DATA_ACQUISITION["endpoints"].items()}
+        self.endpoints.update(endpoints or {})
         self.sources = {
             'yfinance': self._get_yfinance_data,
             'ccxt_binance': self._get_ccxt_binance_data,
@@ -26,6 +58,10 @@ class DataAcquisition:
             'binance_api': self._get_binance_api_data,
             'coinbase_api': self._get_coinbase_api_data
         }
+        if sources is None and os.environ.get("CCB_SOURCES"):
+            sources = os.environ["CCB_SOURCES"].split(",")
+        if sources is not None:
+            self.sources = {name: self.sources[name] for name in sources}
         
         # Initialize exchanges
         self.binance = ccxt.binance()
@@ -34,18 +70,28 @@ class DataAcquisition:
         # WebSocket connections for live data
         self.ws_connections = {}
         
+        # Optional WebsocketRecorder that receives every raw frame
+        self.recorder = None
+        
     def get_historical_data(self, symbol: str, start_date: str, end_date: str,
-                          months: int = 1, years: int = 1) -> pd.DataFrame:
+                          months: int = 1, years: int = 1, job: Optional[Job] = None) -> pd.DataFrame:
         """
         Get historical minute-by-minute data using multiple sources with redundancy
+        
+        job is checked before each source is tried and before processing, and
+        receives progress as sources are attempted.
         """
+        job = job or Job()
         data = None
         errors = []
         
-        for source_name, source_func in self.sources.items():
+        for i, source_name in enumerate(self.sources):
+            source_func = self.sources[source_name]
+            job.progress(i / (len(self.sources) + 1), f"Fetching data from {source_name}")
             try:
                 self.logger.info(f"Attempting to fetch data from {source_name}")
-                data = source_func(symbol, start_date, end_date)
+                with timer("acquisition.fetch", source=source_name):
+                    data = source_func(symbol, start_date, end_date)
                 if data is not None and not data.empty:
                     self.logger.info(f"Successfully retrieved data from {source_name}")
                     break
@@ -53,12 +99,20 @@ class DataAcquisition:
                 error_msg = f"Error fetching data from {source_name}: {str(e)}"
                 self.logger.error(error_msg)
                 errors.append(error_msg)
+                count("acquisition.errors", source=source_name)
                 continue
         
         if data is None or data.empty:
             raise Exception(f"Failed to fetch data from all sources. Errors: {errors}")
         
-        return self._process_data(data)
+        if self.compact:
+            data = compact_frame(data)
+        
+        job.progress(len(self.sources) / (len(self.sources) + 1), "Calculating indicators")
+        with timer("features.process_data"):
+            data = self._process_data(data)
+        job.progress(1.0, "Data acquisition complete")
+        return data
     
     def start_live_data_stream(self, symbol: str, callback) -> None:
         """Start streaming live minute-by-minute data"""
@@ -110,7 +164,7 @@ class DataAcquisition:
     
     def _get_binance_api_data(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
         """Get data from Binance public API"""
-        base_url = "https://api.binance.com/api/v3/klines"
+        base_url = f"{self.endpoints['binance_rest']}/api/v3/klines"
         interval = "1m"
         
         start_ts = int(datetime.strptime(start_date, '%Y-%m-%d').timestamp() * 1000)
@@ -124,19 +178,24 @@ class DataAcquisition:
             "limit": 1000
         }
         
-        response = requests.get(base_url, params=params)
+        response = requests.get(base_url, params=params, timeout=DATA_ACQUISITION["timeout"])
+        response.raise_for_status()
         data = response.json()
         
         df = pd.DataFrame(data, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume',
                                        'close_time', 'quote_volume', 'trades', 'taker_buy_base',
                                        'taker_buy_quote', 'ignore'])
+        if self.compact:
+            df = df.drop(columns=['close_time', 'ignore'])
+        df = parse_numeric(df, ['open', 'high', 'low', 'close', 'volume', 'quote_volume',
+                                'taker_buy_base', 'taker_buy_quote'], self.compact)
         df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
         df.set_index('timestamp', inplace=True)
         return df
     
     def _get_coinbase_api_data(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
         """Get data from Coinbase public API"""
-        base_url = "https://api.pro.coinbase.com"
+        base_url = self.endpoints['coinbase_rest']
         product_id = symbol.replace('USDT', '-USD')  # Convert format (e.g., 'BTC-USD')
         
         # Coinbase Pro API endpoint for historical data
@@ -151,7 +210,8 @@ class DataAcquisition:
             "granularity": 60  # 60 seconds = 1 minute
         }
         
-        response = requests.get(f"{base_url}{endpoint}", params=params)
+        response = requests.get(f"{base_url}{endpoint}", params=params, timeout=DATA_ACQUISITION["timeout"])
+        response.raise_for_status()
         data = response.json()
         
         df = pd.DataFrame(data, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
@@ -170,6 +230,13 @@ class DataAcquisition:
             'Volume': 'volume'
         })
         
+        if self.backend == "polars":
+            # One concat instead of per-column inserts keeps the columns as views of Polars' buffers
+            features = pd.DataFrame(polars_features.process_features(df['close'], df.index, self.compact),
+                                    index=df.index, copy=False)
+            df = pd.concat([df.drop(columns=features.columns, errors='ignore'), features], axis=1)
+            return compact_frame(df) if self.compact else df
+        
         # Add technical indicators
         df['SMA_20'] = df['close'].rolling(window=20).mean()
         df['EMA_12'] = df['close'].ewm(span=12, adjust=False).mean()
@@ -178,11 +245,11 @@ class DataAcquisition:
         df['BB_upper'], df['BB_lower'] = self._calculate_bollinger_bands(df['close'])
         
         # Add time-based features
-        df['hour'] = df.index.hour
-        df['minute'] = df.index.minute
-        df['day_of_week'] = df.index.dayofweek
+        for name, values in calendar_features(df.index, self.compact).items():
+            df[name] = values
         
-        return df
+        # The indicators are computed in float64; store them as float32 too
+        return compact_frame(df) if self.compact else df
     
     def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
         """Calculate Relative Strength Index"""
@@ -216,6 +283,8 @@ class DataAcquisition:
     def _setup_binance_websocket(self, symbol: str, callback) -> None:
         """Setup WebSocket connection to Binance"""
         def on_message(ws, message):
+            if self.recorder is not None:
+                self.recorder.record('binance', symbol, message)
             data = json.loads(message)
             callback(data, 'binance')
         
@@ -235,7 +304,7 @@ class DataAcquisition:
             ws.send(json.dumps(subscribe_message))
         
         ws = websocket.WebSocketApp(
-            f"wss://stream.binance.com:9443/ws",
+            self.endpoints['binance_ws'],
             on_message=on_message,
             on_error=on_error,
             on_close=on_close,
@@ -248,13 +317,16 @@ class DataAcquisition:
         
         # Start WebSocket connection in a separate thread
         import threading
-        ws_thread = threading.Thread(target=ws.run_forever)
+        # Reconnect after drops; on_open re-sends the subscription
+        ws_thread = threading.Thread(target=ws.run_forever, kwargs={"reconnect": WEBSOCKET["reconnect_delay"]})
         ws_thread.daemon = True
         ws_thread.start()
     
     def _setup_coinbase_websocket(self, symbol: str, callback) -> None:
         """Setup WebSocket connection to Coinbase"""
         def on_message(ws, message):
+            if self.recorder is not None:
+                self.recorder.record('coinbase', symbol, message)
             data = json.loads(message)
             callback(data, 'coinbase')
         
@@ -274,7 +346,7 @@ class DataAcquisition:
             ws.send(json.dumps(subscribe_message))
         
         ws = websocket.WebSocketApp(
-            "wss://ws-feed.pro.coinbase.com",
+            self.endpoints['coinbase_ws'],
             on_message=on_message,
             on_error=on_error,
             on_close=on_close,
@@ -287,6 +359,7 @@ class DataAcquisition:
         
         # Start WebSocket connection in a separate thread
         import threading
-        ws_thread = threading.Thread(target=ws.run_forever)
+        # Reconnect after drops; on_open re-sends the subscription
+        ws_thread = threading.Thread(target=ws.run_forever, kwargs={"reconnect": WEBSOCKET["reconnect_delay"]})
         ws_thread.daemon = True
         ws_thread.start()
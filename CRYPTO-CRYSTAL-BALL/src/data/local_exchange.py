@@ -0,0 +1,341 @@
+"""Local stand-in for the Binance and Coinbase REST and websocket endpoints used by DataAcquisition"""
+import os
+import json
+import time
+import base64
+import socket
+import random
+import hashlib
+import logging
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from ..utils.constants import LOCAL_EXCHANGE
+from .synthetic import (binance_kline_messages, coinbase_match_messages, generate_market, to_binance_klines,
+                        to_coinbase_candles)
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def _ws_handshake(conn: socket.socket) -> Optional[str]:
+    """Complete the server side of the websocket upgrade and return the request path"""
+    request = b""
+    while b"\r\n\r\n" not in request:
+        chunk = conn.recv(4096)
+        if not chunk:
+            return None
+        request += chunk
+    lines = request.decode("latin-1").split("\r\n")
+    path = lines[0].split(" ")[1]
+    headers = {k.strip().lower(): v.strip() for k, v in (line.split(":", 1) for line in lines[1:] if ":" in line)}
+    accept = base64.b64encode(hashlib.sha1((headers["sec-websocket-key"] + _WS_GUID).encode()).digest()).decode()
+    conn.sendall(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                  f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+    return path
+
+
+def _ws_send(conn: socket.socket, text: str) -> None:
+    """Send one unmasked text frame"""
+    payload = text.encode()
+    length = len(payload)
+    if length < 126:
+        header = bytes([0x81, length])
+    elif length < 2**16:
+        header = bytes([0x81, 126]) + length.to_bytes(2, "big")
+    else:
+        header = bytes([0x81, 127]) + length.to_bytes(8, "big")
+    conn.sendall(header + payload)
+
+
+def _recv_exact(conn: socket.socket, n: int) -> bytes:
+    data = b""
+    while len(data) < n:
+        chunk = conn.recv(n - len(data))
+        if not chunk:
+            raise ConnectionError("Websocket client went away")
+        data += chunk
+    return data
+
+
+def _ws_recv(conn: socket.socket):
+    """Read one (masked) client frame and return (opcode, payload)"""
+    first, second = _recv_exact(conn, 2)
+    length = second & 0x7F
+    if length == 126:
+        length = int.from_bytes(_recv_exact(conn, 2), "big")
+    elif length == 127:
+        length = int.from_bytes(_recv_exact(conn, 8), "big")
+    mask = _recv_exact(conn, 4) if second & 0x80 else b"\0\0\0\0"
+    payload = bytes(b ^ mask[i % 4] for i, b in enumerate(_recv_exact(conn, length)))
+    return first & 0x0F, payload
+
+
+class LocalExchange:
+    """
+    Serves Binance klines and Coinbase candles over REST and kline / match
+    streams over websockets from synthetic or recorded candles.
+
+    REST (rest_port):
+        GET /api/v3/klines?symbol=&interval=1m&startTime=&endTime=&limit=
+        GET /products/<BASE-USD>/candles?start=&end=&granularity=60
+        GET /stats
+    Websocket (ws_port):
+        /ws        Binance stream; send {"method": "SUBSCRIBE", "params": ["btcusdt@kline_1m"], "id": 1}
+        /coinbase  Coinbase feed; send {"type": "subscribe", "product_ids": ["BTC-USD"], "channels": ["matches"]}
+
+    The history ends when the exchange starts; streams then deliver the
+    following candles at stream_speed simulated minutes per real minute, and
+    candles already streamed become visible to REST as well. Latency, HTTP 429
+    rate limits, HTTP 500 errors and websocket drops are injected at the
+    configured rates. Each REST request and websocket connection draws its
+    faults from its own RNG, seeded by the exchange seed, the request (or
+    stream) and how many times it was made before, so runs are repeatable
+    however the server threads interleave.
+    """
+
+    def __init__(self, symbols: List[str], data_dir: Optional[str] = None, seed: int = 0, **options):
+        self.logger = logging.getLogger(__name__)
+        self.options = {**LOCAL_EXCHANGE, **options}
+        self.seed = seed
+        self._draws: Dict[str, int] = {}
+        self.frames = self._load_frames(symbols, data_dir, seed)
+        self.history_end = min(frame.index[0] for frame in self.frames.values()) + pd.Timedelta(
+            days=self.options["history_days"])
+        self.stats = {"rest_requests": 0, "rate_limited": 0, "errors": 0, "ws_connections": 0,
+                      "ws_messages": 0, "disconnects": 0}
+        self._stats_lock = threading.Lock()
+        self._started = None
+        self._servers = []
+
+    def _load_frames(self, symbols: List[str], data_dir: Optional[str], seed: int) -> Dict[str, pd.DataFrame]:
+        if data_dir:
+            return {symbol: pd.read_csv(os.path.join(data_dir, f"{symbol}.csv"), index_col=0, parse_dates=True)
+                    for symbol in symbols}
+        minutes = int((self.options["history_days"] + self.options["stream_days"]) * 1440)
+        start = pd.Timestamp.now().floor("min") - pd.Timedelta(days=self.options["history_days"])
+        return generate_market(symbols, minutes, start=str(start), seed=seed)
+
+    def _count(self, key: str, value: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += value
+
+    def clock(self) -> pd.Timestamp:
+        """Simulated time: the end of the history plus the streamed minutes"""
+        if self._started is None or not self.options["stream_speed"]:
+            return self.history_end
+        return self.history_end + pd.Timedelta(seconds=(time.time() - self._started) * self.options["stream_speed"])
+
+    def endpoints(self) -> Dict[str, str]:
+        """Base URLs to pass as DataAcquisition(endpoints=...)"""
+        host = self.options["host"]
+        return {
+            "binance_rest": f"http://{host}:{self.options['rest_port']}",
+            "coinbase_rest": f"http://{host}:{self.options['rest_port']}",
+            "binance_ws": f"ws://{host}:{self.options['ws_port']}/ws",
+            "coinbase_ws": f"ws://{host}:{self.options['ws_port']}/coinbase"
+        }
+
+    def _visible(self, symbol: str) -> pd.DataFrame:
+        frame = self.frames[symbol]
+        return frame[frame.index < self.clock()]
+
+    def _rng(self, stream: str) -> random.Random:
+        """A fresh RNG for one use of a request or stream, independent of other threads"""
+        with self._stats_lock:
+            draw = self._draws[stream] = self._draws.get(stream, -1) + 1
+        return random.Random(f"{self.seed}:{stream}:{draw}")
+
+    def _inject_faults(self, rng: random.Random) -> Optional[tuple]:
+        """Sleep for the configured latency and return (status, payload) when a fault is injected"""
+        delay = self.options["latency_ms"] + rng.uniform(0, self.options["jitter_ms"])
+        if delay:
+            time.sleep(delay / 1000)
+        roll = rng.random()
+        if roll < self.options["rate_limit_probability"]:
+            self._count("rate_limited")
+            return 429, {"code": -1003, "msg": "Too many requests; current limit exceeded."}
+        if roll < self.options["rate_limit_probability"] + self.options["error_probability"]:
+            self._count("errors")
+            return 500, {"code": -1000, "msg": "An unknown error occurred while processing the request."}
+        return None
+
+    def klines(self, query: Dict[str, str]):
+        symbol = query["symbol"]
+        if symbol not in self.frames:
+            return 400, {"code": -1121, "msg": "Invalid symbol."}
+        frame = self._visible(symbol)
+        if "startTime" in query:
+            frame = frame[frame.index >= pd.Timestamp(int(query["startTime"]), unit="ms")]
+        if "endTime" in query:
+            frame = frame[frame.index <= pd.Timestamp(int(query["endTime"]), unit="ms")]
+        return 200, to_binance_klines(frame.iloc[:min(int(query.get("limit", 500)), 1000)])
+
+    def candles(self, product_id: str, query: Dict[str, str]):
+        symbol = product_id.replace("-USD", "USDT")
+        if symbol not in self.frames:
+            return 404, {"message": "NotFound"}
+        frame = self._visible(symbol)
+        if "start" in query:
+            frame = frame[frame.index >= pd.Timestamp(query["start"])]
+        if "end" in query:
+            frame = frame[frame.index <= pd.Timestamp(query["end"])]
+        if len(frame) > 300:
+            return 400, {"message": "granularity too small for the requested time range"}
+        return 200, to_coinbase_candles(frame)
+
+    def make_handler(self):
+        exchange = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                exchange.logger.debug(format % args)
+
+            def _send(self, status: int, payload) -> None:
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                if status == 429:
+                    self.send_header("Retry-After", "1")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                parts = url.path.strip("/").split("/")
+                if url.path == "/stats":
+                    self._send(200, exchange.stats)
+                    return
+                exchange._count("rest_requests")
+                fault = exchange._inject_faults(exchange._rng(self.path))
+                if fault is not None:
+                    self._send(*fault)
+                elif url.path == "/api/v3/klines":
+                    self._send(*exchange.klines(query))
+                elif len(parts) == 3 and parts[0] == "products" and parts[2] == "candles":
+                    self._send(*exchange.candles(parts[1], query))
+                else:
+                    self._send(404, {"message": f"Unknown path {url.path}"})
+
+        return Handler
+
+    def _stream(self, conn: socket.socket, path: str, request: Dict, closed: threading.Event) -> None:
+        if path.startswith("/coinbase"):
+            symbol = request["product_ids"][0].replace("-USD", "USDT")
+            _ws_send(conn, json.dumps({"type": "subscriptions", "channels": [
+                {"name": "matches", "product_ids": request["product_ids"]}]}))
+            per_candle = self.options["trades_per_candle"]
+            make_messages = lambda frame: coinbase_match_messages(frame, symbol, per_candle)
+        else:
+            symbol = request["params"][0].split("@")[0].upper()
+            _ws_send(conn, json.dumps({"result": None, "id": request.get("id")}))
+            per_candle = self.options["updates_per_candle"]
+            make_messages = lambda frame: binance_kline_messages(frame, symbol, per_candle)
+
+        rng = self._rng(f"ws:{path}:{symbol}")
+        frame = self.frames[symbol]
+        frame = frame[frame.index >= self.clock().floor("min")]
+        speed = self.options["stream_speed"]
+        started = time.time()
+        messages = make_messages(frame)
+        for i in range(len(frame)):
+            if speed:
+                # Candle i closes i + 1 simulated minutes after the stream starts
+                time.sleep(max(0.0, started + (i + 1) * 60 / speed - time.time()))
+            for _ in range(per_candle):
+                if closed.is_set():
+                    return
+                if rng.random() < self.options["disconnect_probability"]:
+                    self._count("disconnects")
+                    conn.shutdown(socket.SHUT_RDWR)
+                    return
+                _ws_send(conn, json.dumps(next(messages)))
+                self._count("ws_messages")
+
+    def _serve_websocket(self, conn: socket.socket) -> None:
+        closed = threading.Event()
+
+        def watch_for_close():
+            """Stop streaming when the client sends a close frame or goes away"""
+            try:
+                while _ws_recv(conn)[0] != 0x8:
+                    pass
+            except (ConnectionError, OSError):
+                pass
+            closed.set()
+
+        try:
+            path = _ws_handshake(conn)
+            if path is None:
+                return
+            self._count("ws_connections")
+            _, payload = _ws_recv(conn)
+            threading.Thread(target=watch_for_close, daemon=True).start()
+            self._stream(conn, path, json.loads(payload), closed)
+        except (ConnectionError, OSError, KeyError, ValueError) as e:
+            self.logger.debug(f"Websocket connection ended: {str(e)}")
+        finally:
+            closed.set()
+            conn.close()
+
+    def _accept_loop(self, server: socket.socket) -> None:
+        while True:
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve_websocket, args=(conn,), daemon=True).start()
+
+    def start(self) -> None:
+        """Start the REST and websocket servers on background threads"""
+        rest = ThreadingHTTPServer((self.options["host"], self.options["rest_port"]), self.make_handler())
+        ws = socket.create_server((self.options["host"], self.options["ws_port"]))
+        self._servers = [rest, ws]
+        self._started = time.time()
+        threading.Thread(target=rest.serve_forever, daemon=True).start()
+        threading.Thread(target=self._accept_loop, args=(ws,), daemon=True).start()
+        self.logger.info(f"Local exchange serving {sorted(self.frames)} at {self.endpoints()}")
+
+    def stop(self) -> None:
+        for server in self._servers:
+            if isinstance(server, ThreadingHTTPServer):
+                server.shutdown()
+                server.server_close()
+            else:
+                server.close()
+        self._servers = []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a local Binance/Coinbase stand-in for offline testing")
+    parser.add_argument("symbols", nargs="+", help="Symbols to serve, e.g. BTCUSDT ETHUSDT")
+    parser.add_argument("--data-dir", help="Serve <symbol>.csv candles from here instead of synthetic data")
+    parser.add_argument("--seed", type=int, default=0)
+    for key in ["rest_port", "ws_port", "history_days", "stream_days", "stream_speed", "latency_ms", "jitter_ms",
+                "rate_limit_probability", "error_probability", "disconnect_probability"]:
+        parser.add_argument(f"--{key.replace('_', '-')}", dest=key, type=type(LOCAL_EXCHANGE[key]),
+                            default=LOCAL_EXCHANGE[key])
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    options = {k: v for k, v in vars(args).items() if k in LOCAL_EXCHANGE}
+    exchange = LocalExchange(args.symbols, data_dir=args.data_dir, seed=args.seed, **options)
+    exchange.start()
+    for key, url in exchange.endpoints().items():
+        print(f"export CCB_{key.upper()}_URL={url}")
+    print("export CCB_SOURCES=binance_api,coinbase_api")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        exchange.stop()
+
+
+if __name__ == "__main__":
+    main()
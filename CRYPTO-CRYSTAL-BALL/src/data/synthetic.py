@@ -0,0 +1,231 @@
+"""
+Synthetic 1-minute market data for offline benchmarks, soak tests and the local exchange stand-in.
+
+generate_market builds correlated multi-symbol OHLCV with regime-switching,
+fat-tailed returns, intraday seasonality, clustered volume and outage gaps, all
+vectorized. The to_* and *_messages helpers render those frames in the payload
+shapes each DataAcquisition source and websocket callback receives; they expect
+frames from generate_market, which carry quote_volume and trades.
+"""
+import argparse
+import os
+from datetime import timezone
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+from ..utils.constants import SYNTHETIC_DATA
+
+
+def _regimes(rng: np.random.Generator, minutes: int, n_regimes: int, switch_probability: float) -> np.ndarray:
+    """Markov regime path: a switch starts a new segment whose regime is drawn uniformly"""
+    segment = np.cumsum(rng.random(minutes) < switch_probability)
+    return rng.integers(n_regimes, size=segment[-1] + 1)[segment]
+
+
+def _gap_mask(rng: np.random.Generator, minutes: int, probability: float, mean_minutes: float) -> np.ndarray:
+    """Boolean mask of minutes lost to outages of geometric length"""
+    starts = np.flatnonzero(rng.random(minutes) < probability)
+    if not len(starts):
+        return np.zeros(minutes, dtype=bool)
+    ends = np.minimum(starts + rng.geometric(1 / mean_minutes, size=len(starts)), minutes)
+    delta = np.zeros(minutes + 1, dtype=np.int32)
+    np.add.at(delta, starts, 1)
+    np.add.at(delta, ends, -1)
+    return np.cumsum(delta[:-1]) > 0
+
+
+def generate_market(symbols: List[str], minutes: int, start: str = "2022-01-01",
+                    start_prices: Optional[Dict[str, float]] = None,
+                    regime_volatility: Optional[List[float]] = None,
+                    regime_switch_probability: float = SYNTHETIC_DATA["regime_switch_probability"],
+                    tail_df: float = SYNTHETIC_DATA["tail_df"],
+                    correlation: float = SYNTHETIC_DATA["correlation"],
+                    volume_persistence: float = SYNTHETIC_DATA["volume_persistence"],
+                    gap_probability: float = SYNTHETIC_DATA["gap_probability"],
+                    gap_mean_minutes: float = SYNTHETIC_DATA["gap_mean_minutes"],
+                    seed: int = 0) -> Dict[str, pd.DataFrame]:
+    """
+    Generate correlated 1-minute OHLCV candles for several symbols.
+
+    Returns {symbol: frame} with lowercase open/high/low/close/volume columns
+    plus quote_volume and trades, indexed by candle open time. All symbols share
+    the volatility regime path and the outage gaps (minutes missing from every
+    frame); returns are multivariate Student-t with the given pairwise correlation.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(symbols)
+    start_prices = {**SYNTHETIC_DATA["start_prices"], **(start_prices or {})}
+    regime_volatility = np.asarray(regime_volatility or SYNTHETIC_DATA["regime_volatility"])
+    index = pd.date_range(start=start, periods=minutes, freq='min')
+
+    # Volatility: regime level times an intraday cycle peaking around the US session
+    minute_of_day = (index.hour * 60 + index.minute).to_numpy()
+    seasonal = 1 + 0.3 * np.cos(2 * np.pi * (minute_of_day / 1440 - 15 / 24))
+    sigma = regime_volatility[_regimes(rng, minutes, len(regime_volatility), regime_switch_probability)] * seasonal
+
+    # Correlated unit-variance Student-t shocks sharing one chi-square mixing variable per minute
+    corr = np.full((n, n), correlation) + np.eye(n) * (1 - correlation)
+    normal = rng.standard_normal((minutes, n)) @ np.linalg.cholesky(corr).T
+    mixing = np.sqrt(rng.chisquare(tail_df, size=(minutes, 1)) / tail_df)
+    shocks = normal / mixing * np.sqrt((tail_df - 2) / tail_df)
+    returns = shocks * sigma[:, None] - 0.5 * sigma[:, None] ** 2
+
+    prices = np.array([start_prices.get(symbol, 100.0) for symbol in symbols])
+    close = prices * np.exp(np.cumsum(returns, axis=0))
+    open_ = np.vstack([prices, close[:-1]])
+    wick = np.abs(rng.standard_normal((2, minutes, n))) * sigma[None, :, None] * 0.5 * close
+    high = np.maximum(open_, close) + wick[0]
+    low = np.minimum(open_, close) - wick[1]
+
+    # Volume: persistent AR(1) log level, boosted by large moves
+    innovations = rng.standard_normal((minutes, n)) * 0.3 * np.sqrt(1 - volume_persistence ** 2)
+    log_level = lfilter([1.0], [1.0, -volume_persistence], innovations, axis=0)
+    volume = (1e6 / prices) * np.exp(log_level) * seasonal[:, None] * (1 + 2 * np.abs(shocks))
+    trades = rng.poisson(20 * volume * prices / 1e6)
+
+    keep = ~_gap_mask(rng, minutes, gap_probability, gap_mean_minutes)
+    index = pd.DatetimeIndex(index[keep], name='timestamp')
+    return {
+        symbol: pd.DataFrame({
+            'open': open_[keep, i], 'high': high[keep, i], 'low': low[keep, i], 'close': close[keep, i],
+            'volume': volume[keep, i], 'quote_volume': volume[keep, i] * close[keep, i],
+            'trades': trades[keep, i]
+        }, index=index)
+        for i, symbol in enumerate(symbols)
+    }
+
+
+def generate_ohlcv(minutes: int, start: str = "2022-01-01", symbol: str = "BTCUSDT", seed: int = 0) -> pd.DataFrame:
+    """
+    Gap-free single-symbol candles shaped like DataAcquisition's raw source output,
+    so benchmark sizes map exactly to row counts.
+    """
+    frame = generate_market([symbol], minutes, start=start, gap_probability=0.0, seed=seed)[symbol]
+    return frame[['open', 'high', 'low', 'close', 'volume']]
+
+
+def _ns(index: pd.DatetimeIndex) -> np.ndarray:
+    # pandas 3 infers the index resolution (e.g. us from a date string), so asi8 is not always ns
+    return index.as_unit('ns').asi8
+
+
+def _ms(index: pd.DatetimeIndex) -> np.ndarray:
+    return _ns(index) // 10**6
+
+
+def to_binance_klines(frame: pd.DataFrame) -> List[list]:
+    """Rows as returned by GET /api/v3/klines (prices and volumes as strings)"""
+    open_ms = _ms(frame.index)
+    taker = frame['volume'].to_numpy() * 0.5
+    return [
+        [int(t), f"{o:.8f}", f"{h:.8f}", f"{l:.8f}", f"{c:.8f}", f"{v:.8f}", int(t) + 59999,
+         f"{q:.8f}", int(n), f"{tb:.8f}", f"{tb * c:.8f}", "0"]
+        for t, o, h, l, c, v, q, n, tb in zip(open_ms, frame['open'], frame['high'], frame['low'], frame['close'],
+                                              frame['volume'], frame['quote_volume'], frame['trades'], taker)
+    ]
+
+
+def to_coinbase_candles(frame: pd.DataFrame) -> List[list]:
+    """Rows as returned by GET /products/<id>/candles: [time, low, high, open, close, volume], newest first"""
+    seconds = _ns(frame.index) // 10**9
+    rows = [[int(t), float(l), float(h), float(o), float(c), float(v)]
+            for t, o, h, l, c, v in zip(seconds, frame['open'], frame['high'], frame['low'], frame['close'],
+                                        frame['volume'])]
+    return rows[::-1]
+
+
+def to_ccxt_ohlcv(frame: pd.DataFrame) -> List[list]:
+    """Rows as returned by ccxt fetch_ohlcv: [ms, open, high, low, close, volume]"""
+    return [[int(t), float(o), float(h), float(l), float(c), float(v)]
+            for t, o, h, l, c, v in zip(_ms(frame.index), frame['open'], frame['high'], frame['low'],
+                                        frame['close'], frame['volume'])]
+
+
+def to_cryptocompare(frame: pd.DataFrame) -> List[dict]:
+    """Records as returned by cryptocompare.get_historical_price_minute"""
+    seconds = _ns(frame.index) // 10**9
+    return [{'time': int(t), 'high': float(h), 'low': float(l), 'open': float(o), 'close': float(c),
+             'volumefrom': float(v), 'volumeto': float(q)}
+            for t, o, h, l, c, v, q in zip(seconds, frame['open'], frame['high'], frame['low'], frame['close'],
+                                           frame['volume'], frame['quote_volume'])]
+
+
+def to_yfinance(frame: pd.DataFrame) -> pd.DataFrame:
+    """Frame as returned by yfinance Ticker.history: capitalized columns and a UTC index"""
+    result = frame[['open', 'high', 'low', 'close', 'volume']].rename(columns=str.capitalize)
+    result.index = result.index.tz_localize(timezone.utc).rename('Datetime')
+    return result
+
+
+def binance_kline_messages(frame: pd.DataFrame, symbol: str, updates_per_candle: int = 1) -> Iterator[dict]:
+    """
+    Kline stream payloads as delivered to the _setup_binance_websocket callback.
+
+    Each candle produces updates_per_candle - 1 in-progress updates (x=False)
+    followed by the closing update (x=True).
+    """
+    for (t, o, h, l, c, v, q, n) in zip(_ms(frame.index), frame['open'], frame['high'], frame['low'],
+                                       frame['close'], frame['volume'], frame['quote_volume'], frame['trades']):
+        t = int(t)
+        for step in range(1, updates_per_candle + 1):
+            fraction = step / updates_per_candle
+            price = o + (c - o) * fraction
+            closed = step == updates_per_candle
+            yield {
+                "e": "kline", "E": t + int(59999 * fraction), "s": symbol,
+                "k": {
+                    "t": t, "T": t + 59999, "s": symbol, "i": "1m", "f": 0, "L": int(n),
+                    "o": f"{o:.8f}", "c": f"{price:.8f}",
+                    "h": f"{(h if closed else max(o, price)):.8f}", "l": f"{(l if closed else min(o, price)):.8f}",
+                    "v": f"{v * fraction:.8f}", "n": int(n * fraction), "x": closed, "q": f"{q * fraction:.8f}",
+                    "V": f"{v * fraction / 2:.8f}", "Q": f"{q * fraction / 2:.8f}", "B": "0"
+                }
+            }
+
+
+def coinbase_match_messages(frame: pd.DataFrame, symbol: str, trades_per_candle: int = 4) -> Iterator[dict]:
+    """
+    'match' channel payloads as delivered to the _setup_coinbase_websocket callback.
+
+    Trades walk open -> high -> low -> close (low first on up candles) and split
+    the candle's volume evenly, so aggregating them reproduces the candle.
+    """
+    product_id = symbol.replace('USDT', '-USD')
+    offsets = np.linspace(0, 59.999, trades_per_candle)
+    sequence = 0
+    for timestamp, o, h, l, c, v in zip(frame.index, frame['open'], frame['high'], frame['low'], frame['close'],
+                                        frame['volume']):
+        waypoints = [o, l, h, c] if c >= o else [o, h, l, c]
+        prices = np.interp(np.linspace(0, 3, trades_per_candle), [0, 1, 2, 3], waypoints)
+        size = v / trades_per_candle
+        for offset, price in zip(offsets, prices):
+            sequence += 1
+            yield {
+                "type": "match", "trade_id": sequence, "sequence": sequence, "product_id": product_id,
+                "side": "buy" if price >= o else "sell", "size": f"{size:.8f}", "price": f"{price:.2f}",
+                "time": (timestamp + pd.Timedelta(seconds=float(offset))).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+            }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write synthetic 1m OHLCV for offline testing")
+    parser.add_argument("symbols", nargs="+", help="Symbols to generate, e.g. BTCUSDT ETHUSDT")
+    parser.add_argument("--days", type=float, default=30)
+    parser.add_argument("--start", default="2022-01-01")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output-dir", default="data/synthetic")
+    args = parser.parse_args(argv)
+
+    frames = generate_market(args.symbols, int(args.days * 1440), start=args.start, seed=args.seed)
+    os.makedirs(args.output_dir, exist_ok=True)
+    for symbol, frame in frames.items():
+        path = os.path.join(args.output_dir, f"{symbol}.csv")
+        frame.to_csv(path)
+        print(f"Wrote {len(frame)} candles to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Record raw websocket frames from DataAcquisition and replay them through the same callbacks"""
+import os
+import gzip
+import time
+import json
+import logging
+import argparse
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from ..utils.constants import WEBSOCKET
+
+Frame = Tuple[float, str, str, str]
+
+
+class WebsocketRecorder:
+    """
+    Appends every raw frame to a gzip file as "received<TAB>source<TAB>symbol<TAB>message" lines.
+
+    Attach with DataAcquisition.recorder = WebsocketRecorder(path); the
+    _setup_*_websocket handlers record each frame before parsing it.
+    """
+
+    def __init__(self, path: Optional[str] = None, flush_interval: float = WEBSOCKET["recording_flush_interval"]):
+        self.logger = logging.getLogger(__name__)
+        self.path = path or os.path.join(WEBSOCKET["recording_dir"],
+                                         f"ws_{datetime.now().strftime('%Y%m%d_%H%M%S')}.tsv.gz")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.flush_interval = flush_interval
+        self.frames = 0
+        self._file = gzip.open(self.path, "at", compresslevel=6)
+        self._last_flush = time.time()
+        self._lock = threading.Lock()
+
+    def record(self, source: str, symbol: str, message: str) -> None:
+        received = time.time()
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(f"{received:.6f}\t{source}\t{symbol}\t{message}\n")
+            self.frames += 1
+            if received - self._last_flush >= self.flush_interval:
+                self._file.flush()
+                self._last_flush = received
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        self.logger.info(f"Recorded {self.frames} websocket frames to {self.path}")
+
+
+def read_frames(path: str, symbol: Optional[str] = None) -> Iterator[Frame]:
+    """Yield (received, source, symbol, message) from a recording, optionally for one symbol"""
+    with gzip.open(path, "rt") as f:
+        for line in f:
+            received, source, frame_symbol, message = line.rstrip("\n").split("\t", 3)
+            if symbol is None or frame_symbol == symbol:
+                yield float(received), source, frame_symbol, message
+
+
+class WebsocketReplayer:
+    """
+    Feeds a recording back to callback(data, source) exactly as the live
+    websocket handlers do, at the recorded pace divided by speed (0 = as fast
+    as possible).
+
+    It implements start_live_data_stream / stop_live_data_stream, so it can
+    stand in for DataAcquisition, e.g. LivePredictionEngine(..., data_acquisition=replayer, ...).
+    """
+
+    def __init__(self, path: str, speed: float = 1.0):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.speed = speed
+        self.stats = {"frames": 0, "errors": 0, "elapsed": 0.0, "recorded_span": 0.0}
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def replay(self, callback: Callable[[Dict, str], None], symbol: Optional[str] = None) -> Dict:
+        """Replay synchronously and return throughput statistics"""
+        started = time.time()
+        first = None
+        for received, source, _, message in read_frames(self.path, symbol):
+            if self._stopped.is_set():
+                break
+            if first is None:
+                first = received
+            if self.speed:
+                delay = started + (received - first) / self.speed - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+            try:
+                callback(json.loads(message), source)
+            except Exception as e:
+                self.stats["errors"] += 1
+                self.logger.error(f"Error in replayed {source} frame: {str(e)}")
+            self.stats["frames"] += 1
+            self.stats["recorded_span"] = received - first
+        self.stats["elapsed"] = time.time() - started
+        self.stats["frames_per_second"] = self.stats["frames"] / self.stats["elapsed"] if self.stats["elapsed"] else 0.0
+        return self.stats
+
+    def start_live_data_stream(self, symbol: str, callback) -> None:
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self.replay, args=(callback, symbol), daemon=True)
+        self._thread.start()
+
+    def stop_live_data_stream(self, symbol: str) -> None:
+        self._stopped.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the replay finishes; returns False on timeout"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+            return not self._thread.is_alive()
+        return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record or replay DataAcquisition websocket frames")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record", help="Record live frames for a symbol")
+    record.add_argument("symbol")
+    record.add_argument("--duration", type=float, default=3600, help="Seconds to record")
+    record.add_argument("--output", help="Recording path (default: a timestamped file in the recording dir)")
+    replay = commands.add_parser("replay", help="Replay a recording and report throughput")
+    replay.add_argument("path")
+    replay.add_argument("--symbol")
+    replay.add_argument("--speed", type=float, default=0, help="Pace multiplier; 0 = as fast as possible")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.command == "record":
+        from .data_acquisition import DataAcquisition
+        acquisition = DataAcquisition()
+        acquisition.recorder = WebsocketRecorder(args.output)
+        acquisition.start_live_data_stream(args.symbol, lambda data, source: None)
+        try:
+            time.sleep(args.duration)
+        except KeyboardInterrupt:
+            pass
+        acquisition.stop_live_data_stream(args.symbol)
+        acquisition.recorder.close()
+    else:
+        stats = WebsocketReplayer(args.path, args.speed).replay(lambda data, source: None, args.symbol)
+        print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
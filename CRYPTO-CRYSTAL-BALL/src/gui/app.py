@@ -190,6 +190,8 @@ class CryptoCrystalBallApp(ctk.CTk):
         """Show the specified page and hide others"""
         if page_name in self.pages:
             if self.current_page:
+                if hasattr(self.current_page, "on_hide"):
+                    self.current_page.on_hide()
                 self.current_page.grid_remove()
             self.pages[page_name].grid()
             self.current_page = self.pages[page_name]
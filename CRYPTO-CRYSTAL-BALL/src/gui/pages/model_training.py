@@ -1,10 +1,12 @@
 import customtkinter as ctk
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import threading
 from datetime import datetime, timedelta
 import time
 import numpy as np
-from ...utils.constants import MODEL_INFO, FORECAST_LENGTH_LIMITS
+from ...utils.constants import MODEL_INFO, FORECAST_LENGTH_LIMITS, PREDICTION
+from ...utils.instrumentation import observe
+from ...utils.jobs import Job, JobCancelled
 
 class ModelTrainingPage(ctk.CTkFrame):
     def __init__(self, parent, app):
@@ -16,8 +18,11 @@ class ModelTrainingPage(ctk.CTkFrame):
         self.grid_columnconfigure(0, weight=1)
         
         self.model_switches: Dict[str, ctk.CTkSwitch] = {}
-        self._stop_acquisition = False
-        self._stop_prediction = False
+        # Jobs for the running background work; cancelled when the page is left
+        self._acquisition_job: Optional[Job] = None
+        self._prediction_job: Optional[Job] = None
+        # The newest prediction run; late ensemble updates from earlier runs are dropped
+        self._latest_prediction: Optional[Job] = None
         
         self.setup_ui()
         
@@ -257,6 +262,34 @@ class ModelTrainingPage(ctk.CTkFrame):
             "live_predictions": self.live_switch.get()
         })
         
+    def _make_job(self) -> Job:
+        """Job whose progress is drawn on the progress bar from the Tk event loop"""
+        def on_progress(fraction: float, message: str):
+            self.after(0, self._show_progress, job, fraction, message)
+        job = Job(on_progress=on_progress)
+        return job
+    
+    def _show_progress(self, job: Job, fraction: float, message: str):
+        if job.cancelled:
+            return  # A superseded job's queued update
+        self.progress_bar.set(fraction)
+        self.progress_label.configure(text=message)
+    
+    def _show_predictions(self, job: Job, master_prediction, individual_predictions):
+        """Publish a forecast from the Tk thread unless its run was cancelled or superseded"""
+        if job.cancelled or job is not self._latest_prediction:
+            return
+        self.app.update_state({
+            "master_prediction": master_prediction,
+            "individual_predictions": individual_predictions
+        })
+    
+    def _show_prediction_error(self, job: Job, error: Exception):
+        if job is not self._latest_prediction:
+            return
+        self.progress_label.configure(text=f"Error: {str(error)}")
+        self.predict_button.configure(state="normal")
+        
     def on_back_clicked(self):
         """Handle Back button click"""
         self.app.show_page("crypto_selection")
@@ -264,7 +297,7 @@ class ModelTrainingPage(ctk.CTkFrame):
     def on_acquire_clicked(self):
         """Handle Acquire Data button click"""
         self.acquire_button.configure(state="disabled")
-        self.back_button.configure(state="disabled")
+        job = self._acquisition_job = self._make_job()
         
         def acquire_data():
             start_time = time.time()
@@ -276,29 +309,35 @@ class ModelTrainingPage(ctk.CTkFrame):
                         days=self.app.state["data_range"]["years"] * 365 +
                              self.app.state["data_range"]["months"] * 30
                     )).strftime("%Y-%m-%d"),
-                    end_date=datetime.now().strftime("%Y-%m-%d")
+                    end_date=datetime.now().strftime("%Y-%m-%d"),
+                    job=job
                 )
+                job.check()
                 
                 # Store data in app state
                 self.app.update_state({"historical_data": data})
                 
-                self.progress_bar.set(1)
-                self.progress_label.configure(text="Data acquisition complete!")
+                elapsed = time.time() - start_time
+                observe("gui.acquisition", elapsed)
+                # Queued behind any pending progress updates so it is drawn last
+                self.after(0, self._show_progress, job, 1.0, f"Data acquisition complete! ({elapsed:.1f}s)")
                 self.predict_button.configure(state="normal")
-                self.back_button.configure(state="normal")
                 
+            except JobCancelled:
+                pass  # The page was left; on_show resets the controls
             except Exception as e:
                 self.progress_label.configure(text=f"Error: {str(e)}")
                 self.acquire_button.configure(state="normal")
-                self.back_button.configure(state="normal")
         
-        self._stop_acquisition = False
         threading.Thread(target=acquire_data, daemon=True).start()
         
     def on_predict_clicked(self):
         """Handle Start Prediction button click"""
         self.predict_button.configure(state="disabled")
-        self.back_button.configure(state="disabled")
+        # A finished run may still be upgrading its forecast with late models; stop it
+        if self._latest_prediction is not None:
+            self._latest_prediction.cancel()
+        job = self._prediction_job = self._latest_prediction = self._make_job()
         
         def run_prediction():
             start_time = time.time()
@@ -306,33 +345,42 @@ class ModelTrainingPage(ctk.CTkFrame):
                 # Train models and generate predictions
                 self.app.master_predictor.train_models(
                     self.app.state["historical_data"],
-                    self.app.state["enabled_models"]
+                    self.app.state["enabled_models"],
+                    job=job.child(0.0, 0.8)
                 )
                 
+                def on_update(master_prediction, individual_predictions):
+                    # A model that missed the deadline finished on an ensemble thread; redraw on the Tk thread
+                    self.after(0, self._show_predictions, job, master_prediction, individual_predictions)
+                
                 master_prediction, individual_predictions = self.app.master_predictor.predict(
                     self.app.state["historical_data"],
                     self.app.state["forecast_length"],
-                    self.app.state["enabled_models"]
+                    self.app.state["enabled_models"],
+                    deadline=PREDICTION["ensemble_deadline"],
+                    on_update=on_update,
+                    job=job.child(0.8, 1.0)
                 )
+                job.check()
                 
                 # Store predictions in app state
-                self.app.update_state({
-                    "master_prediction": master_prediction,
-                    "individual_predictions": individual_predictions
-                })
+                self.after(0, self._show_predictions, job, master_prediction, individual_predictions)
                 
-                self.progress_bar.set(1)
-                self.progress_label.configure(text="Predictions complete!")
+                elapsed = time.time() - start_time
+                observe("gui.prediction", elapsed)
+                self.after(0, self._show_progress, job, 1.0, f"Predictions complete! ({elapsed:.1f}s)")
+                # Models that missed the deadline keep improving the forecast after the page is left
+                if self._prediction_job is job:
+                    self._prediction_job = None
                 
                 # Show completion popup
-                self.show_completion_popup()
+                self.after(0, self.show_completion_popup)
                 
+            except JobCancelled:
+                pass  # The page was left or a new run started; on_show resets the controls
             except Exception as e:
-                self.progress_label.configure(text=f"Error: {str(e)}")
-                self.predict_button.configure(state="normal")
-                self.back_button.configure(state="normal")
+                self.after(0, self._show_prediction_error, job, e)
         
-        self._stop_prediction = False
         threading.Thread(target=run_prediction, daemon=True).start()
         
     def show_completion_popup(self):
@@ -373,5 +421,14 @@ class ModelTrainingPage(ctk.CTkFrame):
         self.back_button.configure(state="normal")
         
         # Stop any running processes
-        self._stop_acquisition = True
-        self._stop_prediction = True
+        self.cancel_jobs()
+        
+    def on_hide(self):
+        """Called when another page is shown; abandoned training and acquisition stop at their next check"""
+        self.cancel_jobs()
+        
+    def cancel_jobs(self):
+        for job in (self._acquisition_job, self._prediction_job):
+            if job is not None:
+                job.cancel()
+        self._acquisition_job = self._prediction_job = None
@@ -246,6 +246,12 @@ class PredictionGraphsPage(ctk.CTkFrame):
             )
             data_label.pack(anchor="w", padx=5, pady=5)
     
+    def get_prediction(self, model_name: str) -> Optional[Any]:
+        """The latest forecast of a model, or None if it has none (not trained yet, disabled or past the deadline)"""
+        if model_name == "MASTER":
+            return self.app.state.get("master_prediction")
+        return (self.app.state.get("individual_predictions") or {}).get(model_name)
+
     def update_graph(self, *args):
         """Update the graph display with enhanced visuals"""
         self.figure.clear()
@@ -256,25 +262,23 @@ class PredictionGraphsPage(ctk.CTkFrame):
         ax.set_facecolor(self.app.theme_manager.current_theme["colors"]["background"])
         
         # Plot enabled models
-        if hasattr(self.app.state, "master_prediction") and hasattr(self.app.state, "individual_predictions"):
-            for model_name, switch in self.model_switches.items():
-                if switch.get():
-                    if model_name == "MASTER":
-                        data = self.app.state["master_prediction"]
-                    else:
-                        data = self.app.state["individual_predictions"][model_name]
-                    
-                    if self.graph_type.get() == "line":
-                        ax.plot(data.index, data["Close"],
-                               label=model_name,
-                               color=self.model_colors[model_name])
-                    elif self.graph_type.get() == "candle":
-                        self.plot_candlesticks(ax, data, model_name)
-                    elif self.graph_type.get() == "bar":
-                        ax.bar(data.index, data["Close"],
-                              label=model_name,
-                              color=self.model_colors[model_name],
-                              alpha=0.5)
+        for model_name, switch in self.model_switches.items():
+            if switch.get():
+                data = self.get_prediction(model_name)
+                if data is None:
+                    continue
+
+                if self.graph_type.get() == "line":
+                    ax.plot(data.index, data["Close"],
+                           label=model_name,
+                           color=self.model_colors[model_name])
+                elif self.graph_type.get() == "candle":
+                    self.plot_candlesticks(ax, data, model_name)
+                elif self.graph_type.get() == "bar":
+                    ax.bar(data.index, data["Close"],
+                          label=model_name,
+                          color=self.model_colors[model_name],
+                          alpha=0.5)
         
         # Add overlays
         for overlay_id, switch in self.overlay_switches.items():
@@ -330,10 +334,9 @@ class PredictionGraphsPage(ctk.CTkFrame):
             # Add buy/sell signals
             for model_name, switch in self.model_switches.items():
                 if switch.get():
-                    if model_name == "MASTER":
-                        data = self.app.state["master_prediction"]
-                    else:
-                        data = self.app.state["individual_predictions"][model_name]
+                    data = self.get_prediction(model_name)
+                    if data is None:
+                        continue
                     
                     # Calculate signals (example logic)
                     sma = data["Close"].rolling(window=20).mean()
@@ -351,10 +354,9 @@ class PredictionGraphsPage(ctk.CTkFrame):
             # Add high/low points
             for model_name, switch in self.model_switches.items():
                 if switch.get():
-                    if model_name == "MASTER":
-                        data = self.app.state["master_prediction"]
-                    else:
-                        data = self.app.state["individual_predictions"][model_name]
+                    data = self.get_prediction(model_name)
+                    if data is None:
+                        continue
                     
                     # Calculate local maxima/minima
                     window = 20
@@ -372,10 +374,9 @@ class PredictionGraphsPage(ctk.CTkFrame):
             # Add volatility bands
             for model_name, switch in self.model_switches.items():
                 if switch.get():
-                    if model_name == "MASTER":
-                        data = self.app.state["master_prediction"]
-                    else:
-                        data = self.app.state["individual_predictions"][model_name]
+                    data = self.get_prediction(model_name)
+                    if data is None:
+                        continue
                     
                     # Calculate Bollinger Bands
                     window = 20
@@ -394,10 +395,9 @@ class PredictionGraphsPage(ctk.CTkFrame):
             
             for model_name, switch in self.model_switches.items():
                 if switch.get():
-                    if model_name == "MASTER":
-                        data = self.app.state["master_prediction"]
-                    else:
-                        data = self.app.state["individual_predictions"][model_name]
+                    data = self.get_prediction(model_name)
+                    if data is None:
+                        continue
                     
                     # Calculate volume profile
                     volume = data["Close"].diff().abs()  # Simulated volume based on price changes
@@ -450,10 +450,11 @@ class PredictionGraphsPage(ctk.CTkFrame):
     
     def update_data_display(self):
         """Update the data display with latest predictions and market data"""
-        if hasattr(self.app.state, "master_prediction") and hasattr(self.app.state, "individual_predictions"):
+        individual_predictions = self.app.state.get("individual_predictions")
+        if individual_predictions:
             # Update static predictions
-            for model_name, predictions in self.app.state["individual_predictions"].items():
-                if model_name in self.model_switches:
+            for model_name, predictions in individual_predictions.items():
+                if model_name in self.model_switches and predictions is not None:
                     latest_pred = predictions["Close"].iloc[-1]
                     change = (latest_pred - predictions["Close"].iloc[0]) / predictions["Close"].iloc[0] * 100
                     
@@ -461,7 +462,7 @@ class PredictionGraphsPage(ctk.CTkFrame):
                     self.model_switches[model_name].configure(text=f"{model_name}\n{text}")
             
             # Update live predictions if enabled
-            if self.app.state["live_predictions"]:
+            if self.app.state.get("live_predictions"):
                 # Similar updates for live predictions
                 pass
     
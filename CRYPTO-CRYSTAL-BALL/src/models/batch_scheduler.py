@@ -0,0 +1,192 @@
+import os
+import json
+import logging
+import multiprocessing
+import time
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+from joblib.externals.loky import get_reusable_executor
+
+from ..utils.constants import BATCH_TRAINING, RESOURCES
+from ..utils.resources import CoreGovernor, configure_process, process_cores
+
+
+def _total_memory_mb() -> Optional[int]:
+    """Physical memory of the machine in MB, or None where sysconf is unavailable"""
+    try:
+        return int(os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') / 2**20)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def _load_symbol_data(symbol: str, start_date: str, end_date: str, symbol_dir: str) -> pd.DataFrame:
+    """Fetch a symbol's candles once and share them between that symbol's jobs via a pickle cache"""
+    cache_path = os.path.join(symbol_dir, f"candles_{start_date}_{end_date}.pkl")
+    if os.path.exists(cache_path):
+        return pd.read_pickle(cache_path)
+
+    from ..data.data_acquisition import DataAcquisition
+    data = DataAcquisition().get_historical_data(symbol, start_date, end_date)
+
+    os.makedirs(symbol_dir, exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    data.to_pickle(tmp_path)
+    os.replace(tmp_path, cache_path)
+    return data
+
+
+def _train_job(symbol: str, model_name: str, start_date: str, end_date: str,
+               output_dir: str, cores: int) -> Tuple[str, str, Optional[float], float]:
+    """Train one model for one symbol in a worker process and save it as a bundle"""
+    # Size every library's thread pool to the cores the scheduler granted this job
+    configure_process(cores)
+
+    from .master_predictor import MasterPredictor
+    from model_bundle import save_bundle, unwrap  # Importable once master_predictor has added the project root
+
+    started = time.time()
+    symbol_dir = os.path.join(output_dir, symbol)
+    data = _load_symbol_data(symbol, start_date, end_date, symbol_dir)
+
+    predictor = MasterPredictor()
+    try:
+        predictor.train_models(data, {model_name: True})
+    finally:
+        # scikit-learn searches leave joblib worker processes idling for minutes, and
+        # this worker cannot exit at shutdown until they do
+        get_reusable_executor().shutdown(wait=True)
+    save_bundle(model_name, unwrap(predictor.models[model_name]), os.path.join(symbol_dir, model_name.lower()))
+    return symbol, model_name, predictor.performance_metrics.get(model_name), time.time() - started
+
+
+class BatchTrainingScheduler:
+    """
+    Train a set of models for many symbols across a process pool.
+
+    Every (symbol, model) pair is one job. Jobs are started longest-first while
+    their estimated cores and memory fit inside the budgets, so large jobs do not
+    end up as stragglers at the end of the run. A job asks for the cores that
+    RESOURCES["job_cores"] gives its model, as it would from the CoreGovernor;
+    None, the whole budget there, would run the batch one job at a time, so
+    here it is an even share of the cores between the models being trained.
+    Each completed pair is appended
+    to a checkpoint file, and a rerun with the same checkpoint skips it.
+    """
+
+    def __init__(self, symbols: List[str], models: List[str], start_date: str, end_date: str,
+                 output_dir: str = 'models/batch', max_workers: Optional[int] = None,
+                 memory_budget_mb: Optional[int] = None, checkpoint_path: Optional[str] = None):
+        self.logger = logging.getLogger(__name__)
+        self.symbols = list(symbols)
+        self.models = list(models)
+        self.start_date = start_date
+        self.end_date = end_date
+        self.output_dir = output_dir
+        self.max_workers = max_workers or BATCH_TRAINING["max_workers"] or process_cores()
+        self.memory_budget_mb = memory_budget_mb or BATCH_TRAINING["memory_budget_mb"] or _total_memory_mb()
+        self.checkpoint_path = checkpoint_path or os.path.join(output_dir, 'checkpoint.jsonl')
+        self.job_resources = BATCH_TRAINING["job_resources"]
+        self.governor = CoreGovernor(total_cores=self.max_workers)
+
+    def load_checkpoint(self) -> Set[Tuple[str, str]]:
+        """Return the (symbol, model) pairs recorded as completed"""
+        completed = set()
+        if not os.path.exists(self.checkpoint_path):
+            return completed
+        with open(self.checkpoint_path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Partial last line from an interrupted write
+                completed.add((record['symbol'], record['model']))
+        return completed
+
+    def _record_completion(self, symbol: str, model_name: str, rmse: Optional[float], seconds: float) -> None:
+        os.makedirs(os.path.dirname(self.checkpoint_path) or '.', exist_ok=True)
+        record = {
+            'symbol': symbol,
+            'model': model_name,
+            'rmse': None if rmse is None else float(rmse),
+            'seconds': round(seconds, 2),
+            'finished': datetime.now().isoformat()
+        }
+        with open(self.checkpoint_path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _resources(self, model_name: str) -> Dict[str, float]:
+        resources = self.job_resources.get(model_name, self.job_resources["default"])
+        job_cores = RESOURCES["job_cores"]
+        share = max(1, self.max_workers // max(1, len(self.models)))
+        requested = job_cores.get(model_name, job_cores["default"]) or share
+        return {
+            'cores': self.governor.requested_cores(model_name, requested),
+            'memory_mb': resources["memory_mb"],
+            'cost': resources["cost"]
+        }
+
+    def plan(self) -> List[Tuple[str, str]]:
+        """List the pending (symbol, model) jobs, most expensive first"""
+        completed = self.load_checkpoint()
+        pending = [(symbol, model_name) for symbol in self.symbols for model_name in self.models
+                   if (symbol, model_name) not in completed]
+        pending.sort(key=lambda job: self._resources(job[1])['cost'], reverse=True)
+        self.logger.info(f"Planned {len(pending)} jobs, {len(completed)} already completed")
+        return pending
+
+    def _fits(self, resources: Dict[str, float], cores_used: int, memory_used: float, running: int) -> bool:
+        if running == 0:
+            return True  # Always make progress, even if a single job exceeds the budget
+        if cores_used + resources['cores'] > self.max_workers:
+            return False
+        if self.memory_budget_mb is not None and memory_used + resources['memory_mb'] > self.memory_budget_mb:
+            return False
+        return True
+
+    def run(self) -> Dict[Tuple[str, str], Dict]:
+        """Run every pending job and return per-job results, including failures"""
+        pending = self.plan()
+        results: Dict[Tuple[str, str], Dict] = {}
+        running = {}
+        cores_used = 0
+        memory_used = 0.0
+
+        # Forked workers deadlock in TensorFlow and OpenMP pools the parent has already started
+        with ProcessPoolExecutor(max_workers=self.max_workers,
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            while pending or running:
+                # Start every pending job, in cost order, that fits the remaining budget
+                for job in list(pending):
+                    resources = self._resources(job[1])
+                    if not self._fits(resources, cores_used, memory_used, len(running)):
+                        continue
+                    future = executor.submit(_train_job, job[0], job[1], self.start_date, self.end_date,
+                                             self.output_dir, resources['cores'])
+                    running[future] = (job, resources)
+                    cores_used += resources['cores']
+                    memory_used += resources['memory_mb']
+                    pending.remove(job)
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    job, resources = running.pop(future)
+                    cores_used -= resources['cores']
+                    memory_used -= resources['memory_mb']
+                    try:
+                        symbol, model_name, rmse, seconds = future.result()
+                        self._record_completion(symbol, model_name, rmse, seconds)
+                        results[job] = {'status': 'completed', 'rmse': rmse, 'seconds': seconds}
+                        self.logger.info(f"Finished {model_name} for {symbol} in {seconds:.1f}s")
+                    except Exception as e:
+                        results[job] = {'status': 'failed', 'error': str(e)}
+                        self.logger.error(f"Error training {job[1]} for {job[0]}: {str(e)}")
+
+        return results
@@ -0,0 +1,147 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+from ..utils.constants import CACHE
+
+Forecast = Tuple[pd.DataFrame, Dict[str, pd.DataFrame]]
+
+
+def data_fingerprint(data: pd.DataFrame, tail_rows: int = 1440) -> str:
+    """
+    Hash the candles a forecast depends on.
+
+    Only the last tail_rows rows are hashed (plus the frame's length, columns and
+    first timestamp), which is enough to notice a new or revised candle without
+    hashing years of history on every request.
+    """
+    tail = data.tail(tail_rows)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(pd.util.hash_pandas_object(tail, index=True).values.tobytes())
+    digest.update(repr((len(data), tuple(data.columns), data.index[0] if len(data) else None)).encode())
+    return digest.hexdigest()
+
+
+def _frame_bytes(frame: pd.DataFrame) -> int:
+    return int(frame.memory_usage(index=True, deep=True).sum())
+
+
+class ForecastCache:
+    """
+    LRU cache of MasterPredictor forecasts.
+
+    Entries are keyed by the data fingerprint, model version, enabled models and
+    weights; the forecast length is kept out of the key so a shorter request is
+    served from a longer cached forecast. Memory is bounded by max_size_mb and
+    entries expire after expiry seconds. With a directory set, entries are also
+    persisted as pickles and survive restarts.
+    """
+
+    def __init__(self, max_size_mb: float = CACHE["max_size"], expiry: float = CACHE["expiry"],
+                 directory: Optional[str] = None):
+        self.logger = logging.getLogger(__name__)
+        self.max_bytes = int(max_size_mb * 2**20)
+        self.expiry = expiry
+        self.directory = directory
+        self._entries: "OrderedDict[str, Tuple[float, int, Forecast, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(fingerprint: str, model_version: str, enabled_models: Dict[str, bool],
+                 weights: Dict[str, float]) -> str:
+        enabled = sorted(name for name, on in enabled_models.items() if on)
+        rounded = sorted((name, round(float(weight), 12)) for name, weight in weights.items() if name in enabled)
+        return hashlib.blake2b(repr((fingerprint, model_version, enabled, rounded)).encode(),
+                               digest_size=16).hexdigest()
+
+    def get(self, key: str, total_minutes: int) -> Optional[Forecast]:
+        """Return the first total_minutes of a cached forecast, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[0] > self.expiry:
+                self._evict(key)
+                entry = None
+            if entry is None:
+                entry = self._load_from_disk(key)
+            if entry is None or entry[1] < total_minutes:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        _, cached_minutes, (master, individual), _ = entry
+        if cached_minutes == total_minutes:
+            return master.copy(), {name: pred.copy() for name, pred in individual.items()}
+        return master.iloc[:total_minutes].copy(), {name: pred.iloc[:total_minutes].copy()
+                                                    for name, pred in individual.items()}
+
+    def put(self, key: str, total_minutes: int, forecast: Forecast) -> None:
+        """Store a copy of a forecast, keeping only the longest horizon per key"""
+        master, individual = forecast
+        size = _frame_bytes(master) + sum(_frame_bytes(pred) for pred in individual.values())
+        if size > self.max_bytes:
+            return
+        # The caller keeps using its frames; a cached entry must not change with them
+        master, individual = master.copy(), {name: pred.copy() for name, pred in individual.items()}
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None and existing[1] > total_minutes:
+                return
+            if existing is not None:
+                self._evict(key)
+            entry = (time.time(), total_minutes, (master, individual), size)
+            self._entries[key] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._evict(next(iter(self._entries)))
+            self._save_to_disk(key, entry)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _evict(self, key: str) -> None:
+        _, _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def _save_to_disk(self, key: str, entry) -> None:
+        if not self.directory:
+            return
+        try:
+            tmp_path = f"{self._path(key)}.tmp"
+            pd.to_pickle(entry, tmp_path)
+            os.replace(tmp_path, self._path(key))
+        except Exception as e:
+            self.logger.error(f"Error persisting forecast cache entry: {str(e)}")
+
+    def _load_from_disk(self, key: str):
+        if not self.directory or not os.path.exists(self._path(key)):
+            return None
+        try:
+            entry = pd.read_pickle(self._path(key))
+        except Exception as e:
+            self.logger.error(f"Error reading forecast cache entry: {str(e)}")
+            return None
+        if time.time() - entry[0] > self.expiry:
+            os.remove(self._path(key))
+            return None
+        self._entries[key] = entry
+        self._bytes += entry[3]
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            self._evict(next(iter(self._entries)))
+        return entry
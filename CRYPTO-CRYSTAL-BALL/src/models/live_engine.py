@@ -0,0 +1,377 @@
+import copy
+import time
+import queue
+import logging
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..utils.constants import PREDICTION, TECHNICAL_INDICATORS
+from ..utils.jobs import Job
+from ..data.dtypes import match_dtypes
+
+# Models whose forecast depends only on the timestamps, not on the latest candle,
+# so last minute's forecast stays valid and only needs one new minute appended
+TIME_ONLY_MODELS = {'Prophet'}
+
+
+def stream_lstm_inputs(previous: pd.Series, timestamp: pd.Timestamp) -> np.ndarray:
+    """
+    The streaming LSTM's input row for the minute at timestamp, built from the
+    previous minute's processed candle in the order of the LSTM's
+    Config.FEATURE_COLUMNS (Prev_Close, Prev_SMA_20, Prev_EMA_12, Prev_RSI, Day_of_Week).
+    """
+    return np.array([previous['close'], previous['SMA_20'], previous['EMA_12'], previous['RSI'],
+                     timestamp.dayofweek], dtype=np.float32)
+
+
+class IncrementalFeatures:
+    """
+    Keeps the indicators added by DataAcquisition._process_data up to date one
+    candle at a time, using only the rolling windows and EMA states instead of
+    recomputing them over the whole history.
+    """
+
+    def __init__(self, history: pd.DataFrame):
+        sma_window = TECHNICAL_INDICATORS["SMA"]["window"]
+        rsi_window = TECHNICAL_INDICATORS["RSI"]["window"]
+        macd = TECHNICAL_INDICATORS["MACD"]
+        self.bb_std = TECHNICAL_INDICATORS["Bollinger"]["std"]
+
+        close = history['close'].astype(float)
+        self.closes = deque(close.iloc[-sma_window:], maxlen=sma_window)
+        self.deltas = deque(close.diff().iloc[-rsi_window:], maxlen=rsi_window)
+        self.alpha_ema = 2 / (TECHNICAL_INDICATORS["EMA"]["window"] + 1)
+        self.alpha_fast = 2 / (macd["fast"] + 1)
+        self.alpha_slow = 2 / (macd["slow"] + 1)
+        self.alpha_signal = 2 / (macd["signal"] + 1)
+
+        self.ema = float(close.ewm(span=TECHNICAL_INDICATORS["EMA"]["window"], adjust=False).mean().iloc[-1])
+        self.ema_fast = float(close.ewm(span=macd["fast"], adjust=False).mean().iloc[-1])
+        self.ema_slow = float(close.ewm(span=macd["slow"], adjust=False).mean().iloc[-1])
+        self.signal = float(history['Signal'].iloc[-1])
+        self.last_close = float(close.iloc[-1])
+
+    def update(self, timestamp: pd.Timestamp, candle: Dict[str, float]) -> pd.Series:
+        """Return the processed feature row for a newly closed candle"""
+        price = candle['close']
+        self.closes.append(price)
+        self.deltas.append(price - self.last_close)
+        self.last_close = price
+
+        self.ema += self.alpha_ema * (price - self.ema)
+        self.ema_fast += self.alpha_fast * (price - self.ema_fast)
+        self.ema_slow += self.alpha_slow * (price - self.ema_slow)
+        macd = self.ema_fast - self.ema_slow
+        self.signal += self.alpha_signal * (macd - self.signal)
+
+        closes = np.fromiter(self.closes, dtype=float)
+        deltas = np.fromiter(self.deltas, dtype=float)
+        sma = closes.mean()
+        std = closes.std(ddof=1)
+        gain = np.where(deltas > 0, deltas, 0).mean()
+        loss = np.where(deltas < 0, -deltas, 0).mean()
+        rsi = 100 - 100 / (1 + gain / loss) if loss else 100.0
+
+        row = dict(candle)
+        row.update({
+            'SMA_20': sma,
+            'EMA_12': self.ema,
+            'RSI': rsi,
+            'MACD': macd,
+            'Signal': self.signal,
+            'BB_upper': sma + std * self.bb_std,
+            'BB_lower': sma - std * self.bb_std,
+            'hour': timestamp.hour,
+            'minute': timestamp.minute,
+            'day_of_week': timestamp.dayofweek
+        })
+        return pd.Series(row, name=timestamp)
+
+
+class LivePredictionEngine:
+    """
+    Re-forecasts every enabled model once per closed minute candle.
+
+    Candles arrive from DataAcquisition.start_live_data_stream (Binance klines,
+    or minute bars aggregated from Coinbase matches; whichever source delivers a
+    minute first wins). Features are updated incrementally and the models run
+    concurrently through MasterPredictor.predict with a hard deadline of
+    latency_budget seconds after the candle was received. Models that miss it
+    are published with their previous forecast, shifted onto the new minute,
+    and keep running: when one finishes before the next candle, the update is
+    republished with its forecast. A new candle cancels the previous update's
+    stragglers. Subscribers receive (master_prediction, individual_predictions,
+    timestamp).
+
+    With stateful_lstm, the LSTM runs as a StatefulLSTMPredictor: its state is
+    warmed up on the last lookback minutes, advanced by one step per candle, and
+    each forecast rolls out from a copy of it.
+    """
+
+    def __init__(self, master_predictor, data_acquisition, symbol: str, history: pd.DataFrame,
+                 forecast_length: Dict[str, int], enabled_models: Dict[str, bool],
+                 latency_budget: float = PREDICTION["live_latency_budget"],
+                 history_rows: int = PREDICTION["live_history_rows"],
+                 stateful_lstm: bool = PREDICTION["live_stateful_lstm"]):
+        self.logger = logging.getLogger(__name__)
+        self.master_predictor = master_predictor
+        self.data_acquisition = data_acquisition
+        self.symbol = symbol
+        self.history = history.tail(history_rows).copy()
+        self.history_rows = history_rows
+        self.forecast_length = forecast_length
+        self.total_minutes = forecast_length['hours'] * 60 + forecast_length['days'] * 24 * 60
+        self.enabled_models = [name for name, on in enabled_models.items() if on]
+        self.latency_budget = latency_budget
+
+        self.features = IncrementalFeatures(self.history)
+        self.predictions: Dict[str, pd.DataFrame] = {}
+        self.master_prediction: Optional[pd.DataFrame] = None
+        self._subscribers: List[Callable] = []
+        self._candles: "queue.Queue" = queue.Queue()
+        self._coinbase_bar: Optional[Dict] = None
+        self._last_timestamp = self.history.index[-1]
+        self._lock = threading.Lock()
+        self._running = False
+        self._worker: Optional[threading.Thread] = None
+        self._job: Optional[Job] = None
+        self._updating: Optional[pd.Timestamp] = None  # Minute whose update is being computed
+        self._published: Optional[pd.Timestamp] = None  # Minute of the forecasts in self.predictions
+        self._late: Dict[str, pd.DataFrame] = {}
+        self._stream_lock = threading.Lock()  # Guards the streaming LSTM state and self.features
+        self.stream_lstm = self._build_stream_lstm() if stateful_lstm and 'LSTM' in self.enabled_models else None
+
+        self.latencies = deque(maxlen=1000)
+        self.metrics = {
+            "updates": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "stale_models": 0,
+            "late_models": 0,
+            "errors": 0,
+            "last_latency": None,
+            "max_latency": 0.0
+        }
+
+    def _build_stream_lstm(self):
+        """Stream the trained LSTM, warmed up on the history; None (window rollouts) if it can't be streamed"""
+        try:
+            from Lstm_model import StatefulLSTMPredictor
+            from model_bundle import unwrap
+            stream = StatefulLSTMPredictor.from_predictor(unwrap(self.master_predictor.models['LSTM']))
+            lookback = stream.model.input_shape[1]
+            rows = self.history.iloc[-(lookback + 1):]
+            stream.warm_up(np.stack([stream_lstm_inputs(rows.iloc[i], rows.index[i + 1])
+                                     for i in range(len(rows) - 1)]))
+        except Exception as e:
+            self.logger.warning(f"Streaming LSTM unavailable, using window rollouts: {str(e)}")
+            return None
+        self.logger.info("Streaming LSTM warmed up")
+        return stream
+
+    def subscribe(self, callback: Callable) -> Callable[[], None]:
+        """Register a callback for forecast updates; returns a function that unsubscribes it"""
+        self._subscribers.append(callback)
+        return lambda: self._subscribers.remove(callback) if callback in self._subscribers else None
+
+    def start(self) -> None:
+        self._running = True
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+        self.data_acquisition.start_live_data_stream(self.symbol, self.on_message)
+
+    def stop(self) -> None:
+        self._running = False
+        if self._job is not None:
+            self._job.cancel()
+        self.data_acquisition.stop_live_data_stream(self.symbol)
+        if self._worker is not None:
+            self._worker.join(timeout=5)
+
+    def latency_percentiles(self) -> Dict[str, float]:
+        if not self.latencies:
+            return {}
+        values = np.fromiter(self.latencies, dtype=float)
+        return {"p50": float(np.percentile(values, 50)), "p99": float(np.percentile(values, 99))}
+
+    def on_message(self, data: Dict, source: str) -> None:
+        """Websocket callback: turn exchange messages into closed minute candles"""
+        received = time.time()
+        if source == 'binance' and data.get('e') == 'kline' and data['k'].get('x'):
+            k = data['k']
+            timestamp = pd.Timestamp(k['t'], unit='ms')
+            candle = {'open': float(k['o']), 'high': float(k['h']), 'low': float(k['l']),
+                      'close': float(k['c']), 'volume': float(k['v'])}
+            self._candles.put((timestamp, candle, received))
+        elif source == 'coinbase' and data.get('type') == 'match':
+            self._aggregate_match(data, received)
+
+    def _aggregate_match(self, data: Dict, received: float) -> None:
+        price = float(data['price'])
+        size = float(data['size'])
+        minute = pd.Timestamp(data['time']).tz_localize(None).floor('min')
+        bar = self._coinbase_bar
+        if bar is not None and minute > bar['timestamp']:
+            candle = {k: bar[k] for k in ('open', 'high', 'low', 'close', 'volume')}
+            self._candles.put((bar['timestamp'], candle, received))
+            bar = None
+        if bar is None:
+            self._coinbase_bar = {'timestamp': minute, 'open': price, 'high': price, 'low': price,
+                                  'close': price, 'volume': size}
+        else:
+            bar['high'] = max(bar['high'], price)
+            bar['low'] = min(bar['low'], price)
+            bar['close'] = price
+            bar['volume'] += size
+
+    def _run(self) -> None:
+        while self._running:
+            try:
+                item = self._candles.get(timeout=1)
+            except queue.Empty:
+                continue
+            # Apply every queued candle but forecast only from the newest one
+            items = [item]
+            while not self._candles.empty():
+                items.append(self._candles.get_nowait())
+            if self._job is not None:
+                self._job.cancel()  # Forecasts still running for an older minute are outdated
+            appended = [self._append_candle(timestamp, candle) for timestamp, candle, _ in items]
+            if not any(appended):
+                continue
+            if sum(appended) > 1:
+                self.metrics["coalesced"] += sum(appended) - 1
+                self.metrics["misses"] += sum(appended) - 1
+            try:
+                self._update(items[-1][2])
+            except Exception as e:
+                self.metrics["errors"] += 1
+                self.logger.error(f"Error updating live predictions: {str(e)}")
+
+    def _append_candle(self, timestamp: pd.Timestamp, candle: Dict[str, float]) -> bool:
+        if timestamp <= self._last_timestamp:
+            return False  # Already delivered by the other source
+        with self._stream_lock:
+            previous = self.history.iloc[-1]
+            row = self.features.update(timestamp, candle)
+            if self.stream_lstm is not None:
+                self.stream_lstm.step(stream_lstm_inputs(previous, timestamp))
+        self.history = pd.concat([self.history, match_dtypes(pd.DataFrame([row]), self.history)])
+        if len(self.history) > self.history_rows:
+            self.history = self.history.iloc[-self.history_rows:]
+        self._last_timestamp = timestamp
+        return True
+
+    def _shift(self, previous: pd.DataFrame, minutes: pd.DatetimeIndex) -> pd.DataFrame:
+        """Move a previous forecast onto the new horizon, holding its last value past the old end"""
+        return previous.reindex(previous.index.union(minutes)).ffill().reindex(minutes)
+
+    def _extend_time_only(self, model_name: str, previous: pd.DataFrame, timestamp: pd.Timestamp):
+        """Forecaster that keeps a time-only model's previous forecast and appends the missing minutes"""
+        def forecast(data: pd.DataFrame, total_minutes: int, job: Job) -> pd.DataFrame:
+            kept = previous[previous.index > timestamp]
+            missing = total_minutes - len(kept)
+            if missing > 0:
+                model = self.master_predictor.models[model_name]
+                kept = pd.concat([kept, model.forecast_minutes(missing, kept.index[-1] if len(kept) else timestamp)])
+            return kept
+        return forecast
+
+    def _forecast_stream_lstm(self, data: pd.DataFrame, total_minutes: int, job: Job) -> pd.DataFrame:
+        """Roll the streaming LSTM forward from a copy of its state, feeding back its own predictions"""
+        minutes = pd.date_range(start=data.index[-1], periods=total_minutes + 1, freq='min')[1:]
+        predictions = np.empty(total_minutes)
+        with self._stream_lock:
+            job.check()  # A newer candle may have advanced the state past data
+            features = copy.deepcopy(self.features)
+            state = self.stream_lstm.snapshot_state()
+            try:
+                previous = data.iloc[-1]
+                for i, minute in enumerate(minutes):
+                    job.check()
+                    price = self.stream_lstm.step(stream_lstm_inputs(previous, minute))
+                    predictions[i] = price
+                    previous = features.update(minute, {'open': price, 'high': price, 'low': price,
+                                                        'close': price, 'volume': previous['volume']})
+            finally:
+                self.stream_lstm.restore_state(state)
+        return pd.DataFrame({'Close': predictions}, index=minutes)
+
+    def _forecasters(self, timestamp: pd.Timestamp) -> Dict[str, Callable]:
+        forecasters = {}
+        if self.stream_lstm is not None:
+            forecasters['LSTM'] = self._forecast_stream_lstm
+        for model_name in TIME_ONLY_MODELS.intersection(self.enabled_models):
+            previous = self.predictions.get(model_name)
+            if previous is not None:
+                forecasters[model_name] = self._extend_time_only(model_name, previous, timestamp)
+        return forecasters
+
+    def _on_late_model(self, timestamp: pd.Timestamp, predictions: Dict[str, pd.DataFrame]) -> None:
+        """MasterPredictor.predict on_update: a model finished after the deadline"""
+        with self._lock:
+            if timestamp == self._updating:
+                self._late.update(predictions)  # Merged when the update is published
+                return
+            if timestamp != self._published:
+                return  # A newer minute has been published since
+            merged = {**self.predictions, **predictions}
+            master_prediction = self.master_predictor._generate_master_prediction(merged)
+            self.predictions = merged
+            self.master_prediction = master_prediction
+        self.metrics["late_models"] += 1
+        self._notify(master_prediction, merged, timestamp)
+
+    def _update(self, received: float) -> None:
+        timestamp = self._last_timestamp
+        minutes = pd.date_range(start=timestamp, periods=self.total_minutes + 1, freq='min')[1:]
+        self._job = job = Job()
+        with self._lock:
+            self._updating = timestamp
+            self._late = {}
+
+        _, fresh = self.master_predictor.predict(
+            self.history, self.forecast_length, {name: True for name in self.enabled_models},
+            deadline=max(0.0, received + self.latency_budget - time.time()),
+            on_update=lambda master, snapshot: self._on_late_model(timestamp, snapshot),
+            job=job, forecasters=self._forecasters(timestamp), wait_for_first=False)
+
+        with self._lock:
+            predictions = {**fresh, **self._late}
+            for model_name in self.enabled_models:
+                if model_name not in predictions and model_name in self.predictions:
+                    predictions[model_name] = self._shift(self.predictions[model_name], minutes)
+                    self.metrics["stale_models"] += 1
+            master_prediction = (self.master_predictor._generate_master_prediction(predictions)
+                                 if predictions else None)
+            self.predictions = predictions
+            self.master_prediction = master_prediction
+            self._published = timestamp  # Late models are merged into this update from here on
+            self._updating = None
+
+        latency = time.time() - received
+        self.latencies.append(latency)
+        self.metrics["updates"] += 1
+        self.metrics["last_latency"] = latency
+        self.metrics["max_latency"] = max(self.metrics["max_latency"], latency)
+        if latency > self.latency_budget:
+            self.metrics["misses"] += 1
+            self.logger.warning(f"Live update for {timestamp} took {latency:.2f}s, budget {self.latency_budget}s")
+        missed = set(self.enabled_models) - set(fresh)
+        if missed:
+            self.logger.info(f"Past the deadline for {timestamp}, still running: {sorted(missed)}")
+
+        if master_prediction is not None:
+            self._notify(master_prediction, predictions, timestamp)
+
+    def _notify(self, master_prediction: pd.DataFrame, predictions: Dict[str, pd.DataFrame],
+                timestamp: pd.Timestamp) -> None:
+        for callback in list(self._subscribers):
+            try:
+                callback(master_prediction, predictions, timestamp)
+            except Exception as e:
+                self.logger.error(f"Error in live prediction subscriber: {str(e)}")
@@ -1,18 +1,33 @@
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 import logging
 from datetime import datetime, timedelta
-import joblib
+import json
 import os
+import hashlib
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
 from ..utils.constants import MODEL_INFO
-from ..Lstm_model import LSTMPredictor
-from ..Catboost_Regressor import CatBoostPredictor
-from ..lgbm_model import LGBMRegressorModel
-from ..Prophet_model import MProphet
-from ..Random_Forest_Regressor import RandomForestPredictor
-from ..Xgboost_model import XGBoost_Predictor
+from ..utils.paths import add_project_root
+
+add_project_root()
+
+from Lstm_model import LSTMPredictor
+from Catboost_Regressor import CatBoostPredictor
+from lgbm_model import LGBMRegressorModel
+from Prophet_model import MProphet
+from Random_Forest_Regressor import RandomForestPredictor
+from Xgboost_model import XGBoost_Predictor
+from model_bundle import LazyBundle, is_trained, save_bundle, unwrap
+from ..utils.instrumentation import count, timer
+from ..utils.jobs import Job, JobCancelled
+from ..utils.resources import configure_tensorflow, governor
+from .forecast_cache import ForecastCache, data_fingerprint
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
 
 class MasterPredictor:
     """
@@ -20,11 +35,13 @@ class MasterPredictor:
     with dynamic weighting based on performance metrics
     """
     
-    def __init__(self):
+    def __init__(self, cache_dir: Optional[str] = None):
         self.logger = logging.getLogger(__name__)
         self.models = {}
         self.weights = {}
         self.performance_metrics = {}
+        self.model_version = "untrained"
+        self.forecast_cache = ForecastCache(directory=cache_dir)
         self.initialize_models()
     
     def initialize_models(self):
@@ -36,7 +53,7 @@ class MasterPredictor:
                 'LightGBM': LGBMRegressorModel(),
                 'Prophet': MProphet('configs/prophet_config.yaml'),
                 'RandomForest': RandomForestPredictor(),
-                'XGBoost': XGBoost_Predictor('configs/xgboost_config.yaml')
+                'XGBoost': XGBoost_Predictor('configs/Xgboost_config.yaml')
             }
             
             # Initialize equal weights
@@ -47,231 +64,345 @@ class MasterPredictor:
             self.logger.error(f"Error initializing models: {str(e)}")
             raise
     
-    def train_models(self, data: pd.DataFrame, enabled_models: Dict[str, bool]) -> None:
+    def train_models(self, data: pd.DataFrame, enabled_models: Dict[str, bool], job: Optional[Job] = None) -> None:
         """
         Train all enabled models and update their weights based on performance
+        
+        job receives progress (each model gets an equal slice) and is checked
+        inside every model's search and fit; cancelling it raises JobCancelled
+        and leaves the previously trained state and weights in place.
+        
+        Each model trains on the cores the resource governor grants it, so
+        training in several threads or processes at once does not oversubscribe
+        the CPU.
         """
+        job = job or Job()
         try:
             performance_scores = {}
             
-            for model_name, enabled in enabled_models.items():
-                if not enabled:
-                    continue
-                
+            model_names = [name for name, enabled in enabled_models.items() if enabled]
+            for i, model_name in enumerate(model_names):
                 self.logger.info(f"Training {model_name} model...")
+                model_job = job.child(i / len(model_names), (i + 1) / len(model_names))
+                model_job.progress(0.0, f"Training {model_name}")
                 
-                if model_name == 'LSTM':
-                    performance = self._train_lstm(data)
-                elif model_name == 'CatBoost':
-                    performance = self._train_catboost(data)
-                elif model_name == 'LightGBM':
-                    performance = self._train_lightgbm(data)
-                elif model_name == 'Prophet':
-                    performance = self._train_prophet(data)
-                elif model_name == 'RandomForest':
-                    performance = self._train_random_forest(data)
-                elif model_name == 'XGBoost':
-                    performance = self._train_xgboost(data)
+                saved = self.models[model_name]
+                if isinstance(saved, LazyBundle) and not saved.loaded:
+                    # Fit the wrapped predictor; any use through the bundle would first load the files the fit replaces
+                    self.models[model_name] = saved.predictor
+                try:
+                    with governor.allocate(model_name) as cores, timer("train", model=model_name):
+                        self._assign_cores(model_name, cores)
+                        if model_name == 'LSTM':
+                            performance = self._train_lstm(data, model_job)
+                        elif model_name == 'CatBoost':
+                            performance = self._train_catboost(data, model_job)
+                        elif model_name == 'LightGBM':
+                            performance = self._train_lightgbm(data, model_job)
+                        elif model_name == 'Prophet':
+                            performance = self._train_prophet(data, model_job)
+                        elif model_name == 'RandomForest':
+                            performance = self._train_random_forest(data, model_job)
+                        elif model_name == 'XGBoost':
+                            performance = self._train_xgboost(data, model_job)
+                except BaseException:
+                    # A partial fit is overwritten when the bundle loads on first use
+                    self.models[model_name] = saved
+                    raise
                 
                 performance_scores[model_name] = performance
             
+            self.performance_metrics.update(performance_scores)
+            self.model_version = f"trained-{time.time_ns()}"
+            
             # Update weights based on performance
             self._update_weights(performance_scores)
+            job.progress(1.0, "Training complete")
             
+        except JobCancelled:
+            self.logger.info("Training cancelled")
+            raise
         except Exception as e:
             self.logger.error(f"Error training models: {str(e)}")
             raise
     
     def predict(self, data: pd.DataFrame, forecast_length: Dict[str, int],
-                enabled_models: Dict[str, bool]) -> Tuple[pd.DataFrame, Dict[str, pd.DataFrame]]:
+                enabled_models: Dict[str, bool], deadline: Optional[float] = None,
+                on_update: Optional[Callable] = None,
+                job: Optional[Job] = None,
+                forecasters: Optional[Dict[str, Callable]] = None,
+                wait_for_first: bool = True) -> Tuple[Optional[pd.DataFrame], Dict[str, pd.DataFrame]]:
         """
         Generate predictions from all enabled models and combine them
+        
+        Enabled models run concurrently. With a deadline (seconds), the master
+        prediction is returned as soon as it expires, combining only the models
+        that finished with their weights re-normalized; models still running keep
+        going and on_update(master_prediction, predictions) is called with the
+        improved combination each time one of them finishes. If no model has
+        finished by then, the first one to finish is awaited, unless
+        wait_for_first is False, in which case (None, {}) is returned on time.
+        
+        job receives progress as models finish and is checked every rollout
+        step, including by models still running after the deadline.
+        
+        forecasters maps model names to callables (data, total_minutes, job)
+        used instead of the model's own rollout; their results are not cached.
         """
+        job = job or Job()
         try:
-            predictions = {}
             total_minutes = forecast_length['hours'] * 60 + forecast_length['days'] * 24 * 60
             
-            for model_name, enabled in enabled_models.items():
-                if not enabled:
-                    continue
-                
+            forecasters = forecasters or {}
+            cache_key = None
+            if not forecasters:
+                cache_key = ForecastCache.make_key(data_fingerprint(data), self.model_version,
+                                                   enabled_models, self.weights)
+                cached = self.forecast_cache.get(cache_key, total_minutes)
+                if cached is not None:
+                    self.logger.info("Returning cached forecast")
+                    count("forecast_cache.hits")
+                    return cached
+                count("forecast_cache.misses")
+            
+            model_names = [name for name, enabled in enabled_models.items() if enabled]
+            predictions = {}
+            lock = threading.Lock()
+            
+            def finish(model_name: str, future) -> Optional[Tuple[pd.DataFrame, Dict[str, pd.DataFrame]]]:
+                """Record a finished model and return the combination so far"""
+                try:
+                    pred = future.result()
+                except JobCancelled:
+                    return None
+                except Exception as e:
+                    self.logger.error(f"Error generating predictions with {model_name}: {str(e)}")
+                    return None
+                with lock:
+                    predictions[model_name] = pred
+                    snapshot = dict(predictions)
+                try:
+                    job.progress(len(snapshot) / len(model_names), f"{model_name} forecast ready")
+                except JobCancelled:
+                    return None
+                master = self._generate_master_prediction(snapshot)
+                if cache_key is not None and len(snapshot) == len(model_names):
+                    self.forecast_cache.put(cache_key, total_minutes, (master, snapshot))
+                return master, snapshot
+            
+            executor = ThreadPoolExecutor(max_workers=max(1, len(model_names)))
+            futures = {}
+            for model_name in model_names:
                 self.logger.info(f"Generating predictions with {model_name}...")
+                futures[executor.submit(self.predict_model, model_name, data, total_minutes, job,
+                                        forecasters.get(model_name))] = model_name
+            
+            done, pending = wait(futures, timeout=deadline)
+            if not done and pending and wait_for_first:
+                # Nothing met the deadline; return the first model to finish
+                self.logger.warning(f"No model finished within {deadline}s, waiting for the first one")
+                done, pending = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                finish(futures[future], future)
+            
+            if pending:
+                count("ensemble.deadline_misses", len(pending))
+                self.logger.warning(f"Returning master prediction from {sorted(predictions)}; "
+                                    f"still running: {sorted(futures[f] for f in pending)}")
                 
-                if model_name == 'LSTM':
-                    pred = self._predict_lstm(data, total_minutes)
-                elif model_name == 'CatBoost':
-                    pred = self._predict_catboost(data, total_minutes)
-                elif model_name == 'LightGBM':
-                    pred = self._predict_lightgbm(data, total_minutes)
-                elif model_name == 'Prophet':
-                    pred = self._predict_prophet(data, total_minutes)
-                elif model_name == 'RandomForest':
-                    pred = self._predict_random_forest(data, total_minutes)
-                elif model_name == 'XGBoost':
-                    pred = self._predict_xgboost(data, total_minutes)
+                def upgrade(future):
+                    result = finish(futures[future], future)
+                    if result is not None and on_update is not None:
+                        on_update(*result)
                 
-                predictions[model_name] = pred
+                for future in pending:
+                    future.add_done_callback(upgrade)
+            executor.shutdown(wait=False)
             
-            # Generate master prediction
-            master_prediction = self._generate_master_prediction(predictions)
-            
-            return master_prediction, predictions
+            if not predictions:
+                job.check()
+                if pending and not wait_for_first:
+                    return None, {}
+                raise RuntimeError("No model produced a prediction")
+            with lock:
+                snapshot = dict(predictions)
+            return self._generate_master_prediction(snapshot), snapshot
             
+        except JobCancelled:
+            self.logger.info("Prediction cancelled")
+            raise
         except Exception as e:
             self.logger.error(f"Error generating predictions: {str(e)}")
             raise
     
-    def _train_lstm(self, data: pd.DataFrame) -> float:
+    def predict_model(self, model_name: str, data: pd.DataFrame, total_minutes: int,
+                      job: Optional[Job] = None, forecaster: Optional[Callable] = None) -> pd.DataFrame:
+        """Generate a total_minutes forecast with a single model, or with forecaster when given"""
+        job = job or Job()
+        with timer("predict", model=model_name):
+            if forecaster is not None:
+                return forecaster(data, total_minutes, job)
+            if model_name == 'LSTM':
+                return self._predict_lstm(data, total_minutes, job)
+            elif model_name == 'CatBoost':
+                return self._predict_catboost(data, total_minutes, job)
+            elif model_name == 'LightGBM':
+                return self._predict_lightgbm(data, total_minutes, job)
+            elif model_name == 'Prophet':
+                return self._predict_prophet(data, total_minutes, job)
+            elif model_name == 'RandomForest':
+                return self._predict_random_forest(data, total_minutes, job)
+            elif model_name == 'XGBoost':
+                return self._predict_xgboost(data, total_minutes, job)
+        raise ValueError(f"Unknown model: {model_name}")
+    
+    def _assign_cores(self, model_name: str, cores: int) -> None:
+        """Size the model's library thread pools to its core grant"""
+        self.logger.info(f"Training {model_name} on {cores} cores")
+        if model_name == 'LSTM':
+            # TensorFlow's pools are process-wide and fixed once its runtime has started
+            configure_tensorflow(cores)
+        else:
+            self.models[model_name].n_jobs = cores
+    
+    def _train_lstm(self, data: pd.DataFrame, job: Job) -> float:
         """Train LSTM model and return performance metric"""
         model = self.models['LSTM']
-        X_train, X_test, y_train, y_test = model.prepare_data(data)
-        history = model.train_model(X_train, y_train, X_test, y_test)
-        y_pred = model.predict(X_test)
-        return model.evaluate_model(y_test, y_pred)
+        X_train, X_test, y_train, y_test = model.prepare_data(model.add_features(data))
+        history = model.train_model(X_train, y_train, X_test, y_test, job=job)
+        y_pred = model.predict(model.make_dataset(X_test))
+        y_true = model.scaler_y.inverse_transform(y_test[-len(y_pred):])
+        return model.evaluate_model(y_true, y_pred)
     
-    def _train_catboost(self, data: pd.DataFrame) -> float:
+    def _train_catboost(self, data: pd.DataFrame, job: Job) -> float:
         """Train CatBoost model and return performance metric"""
         model = self.models['CatBoost']
-        X_train, X_test, y_train, y_test = model.yfdown(data.index[0], data.index[-1])
-        best_params = model.search_catboost(X_train, y_train)
-        pred = model.train_model(X_train, y_train, X_test, y_test, best_params)
+        X_train, X_test, y_train, y_test = model.prepare_data(model.add_features(data))
+        best_params = model.search_catboost(X_train, y_train, job=job.child(0.0, 0.8))
+        pred = model.train_model(X_train, y_train, X_test, y_test, best_params, job=job.child(0.8, 1.0))
         return model.evaluate_model(y_test, pred)
     
-    def _train_lightgbm(self, data: pd.DataFrame) -> float:
+    def _train_lightgbm(self, data: pd.DataFrame, job: Job) -> float:
         """Train LightGBM model and return performance metric"""
         model = self.models['LightGBM']
-        X_train, X_test, y_train, y_test = model.yfdown(data.index[0], data.index[-1])
-        grid_search, best_params = model.grid(X_train, y_train, X_test, y_test)
-        trained_model = model.model(X_train, y_train, X_test, y_test, best_params)
+        X_train, X_test, y_train, y_test = model.prepare_data(model.add_features(data))
+        grid_search, best_params = model.grid(X_train, y_train, X_test, y_test, job=job.child(0.0, 0.8))
+        trained_model = model.model(X_train, y_train, X_test, y_test, best_params, job=job.child(0.8, 1.0))
+        model.booster = trained_model
         rmse = model.yhat(data.index[0], trained_model, X_test, y_test)
         return rmse
     
-    def _train_prophet(self, data: pd.DataFrame) -> float:
+    def _train_prophet(self, data: pd.DataFrame, job: Job) -> float:
         """Train Prophet model and return performance metric"""
         model = self.models['Prophet']
-        model.data = data
+        model.data = model.to_prophet_frame(data)
+        # Stan fits have no callbacks, so the job is only checked between them
         model.fit_predict()
+        job.progress(0.3, "Prophet: cross-validating")
         performance = model.cross_validate()
         return performance['rmse'].mean()
     
-    def _train_random_forest(self, data: pd.DataFrame) -> float:
+    def _train_random_forest(self, data: pd.DataFrame, job: Job) -> float:
         """Train Random Forest model and return performance metric"""
         model = self.models['RandomForest']
-        df = model.download_and_prepare_data(data.index[0], data.index[-1])
+        df = model.add_features(data)
         X, y = model.prepare_features_and_target(df)
-        X_test, y_test, predictions, mse, mae, r2 = model.train_and_evaluate_model(X, y)
+        X_test, y_test, predictions, mse, mae, r2 = model.train_and_evaluate_model(X, y, job=job)
         return np.sqrt(mse)
     
-    def _train_xgboost(self, data: pd.DataFrame) -> float:
+    def _train_xgboost(self, data: pd.DataFrame, job: Job) -> float:
         """Train XGBoost model and return performance metric"""
         model = self.models['XGBoost']
-        df = model.download_data()
+        df = model.add_features(data)
         X_train, X_test, y_train, y_test = model.prepare_data(df)
-        best_params = model.optimize_xgb(X_train, y_train)
-        model.train_model(X_train, y_train, best_params)
+        best_params = model.optimize_xgb(X_train, y_train, job=job.child(0.0, 0.9))
+        model.train_model(X_train, y_train, best_params, job=job.child(0.9, 1.0))
         y_pred = model.predict(X_test)
         rmse, _, _ = model.evaluate(y_test, y_pred)
         return rmse
     
-    def _predict_lstm(self, data: pd.DataFrame, total_minutes: int) -> pd.DataFrame:
+    def _rollout(self, model_name: str, data: pd.DataFrame, total_minutes: int, job: Job,
+                 predict_next: Callable[[pd.DataFrame], float]) -> pd.DataFrame:
+        """
+        Forecast total_minutes one minute at a time, feeding each prediction back as the next candle.
+
+        predict_next(candles) returns the forecast close of the last row of candles,
+        a lowercase OHLCV frame. That row is the minute being forecast and carries
+        the previous candle's close and volume until its prediction replaces them.
+        """
+        candles = data.rename(columns=str.lower)[OHLCV_COLUMNS].astype(np.float64)
+        minutes = pd.date_range(start=data.index[-1], periods=total_minutes + 1, freq='min')[1:]
+        frame = pd.concat([candles, pd.DataFrame(np.nan, index=minutes, columns=OHLCV_COLUMNS)])
+        predictions = np.empty(total_minutes)
+        n = len(candles)
+        
+        for i in range(total_minutes):
+            job.check()
+            previous = frame.iloc[n + i - 1]
+            frame.iloc[n + i] = [previous['close']] * 4 + [previous['volume']]
+            with timer("predict.step", model=model_name):
+                price = float(predict_next(frame.iloc[:n + i + 1]))
+            predictions[i] = price
+            frame.iloc[n + i, :4] = price
+        
+        return pd.DataFrame({'Close': predictions}, index=minutes)
+    
+    def _predict_lstm(self, data: pd.DataFrame, total_minutes: int, job: Job) -> pd.DataFrame:
         """Generate predictions using LSTM model"""
         model = self.models['LSTM']
-        predictions = []
-        current_data = data.copy()
+        lookback = model.model.input_shape[1]
         
-        for _ in range(total_minutes):
-            X = model.prepare_prediction_data(current_data)
-            pred = model.predict(X)
-            predictions.append(pred[-1][0])
-            
-            # Update data for next prediction
-            new_row = current_data.iloc[-1].copy()
-            new_row['Close'] = pred[-1][0]
-            current_data = current_data.append(new_row)
+        def predict_next(candles: pd.DataFrame) -> float:
+            return model.predict_fast(model.prepare_prediction_data(candles)[-lookback:])[-1][0]
         
-        # Create prediction DataFrame
-        dates = pd.date_range(start=data.index[-1], periods=total_minutes+1, freq='T')[1:]
-        return pd.DataFrame(predictions, index=dates, columns=['Close'])
+        return self._rollout('LSTM', data, total_minutes, job, predict_next)
     
-    def _predict_catboost(self, data: pd.DataFrame, total_minutes: int) -> pd.DataFrame:
+    def _predict_catboost(self, data: pd.DataFrame, total_minutes: int, job: Job) -> pd.DataFrame:
         """Generate predictions using CatBoost model"""
         model = self.models['CatBoost']
-        predictions = []
-        current_data = data.copy()
         
-        for _ in range(total_minutes):
-            X = model.prepare_prediction_data(current_data)
-            pred = model.predict(X)
-            predictions.append(pred[-1])
-            
-            # Update data for next prediction
-            new_row = current_data.iloc[-1].copy()
-            new_row['Close'] = pred[-1]
-            current_data = current_data.append(new_row)
+        def predict_next(candles: pd.DataFrame) -> float:
+            return self._tree_predict(model, model.prepare_prediction_data(candles).iloc[-1:].to_numpy())[-1]
         
-        dates = pd.date_range(start=data.index[-1], periods=total_minutes+1, freq='T')[1:]
-        return pd.DataFrame(predictions, index=dates, columns=['Close'])
+        return self._rollout('CatBoost', data, total_minutes, job, predict_next)
     
-    def _predict_lightgbm(self, data: pd.DataFrame, total_minutes: int) -> pd.DataFrame:
+    def _predict_lightgbm(self, data: pd.DataFrame, total_minutes: int, job: Job) -> pd.DataFrame:
         """Generate predictions using LightGBM model"""
-        model = self.models['LightGBM']
-        predictions = []
-        current_data = data.copy()
-        
-        for _ in range(total_minutes):
-            X = model.prepare_prediction_data(current_data)
-            pred = model.predict(X)
-            predictions.append(pred[-1])
-            
-            new_row = current_data.iloc[-1].copy()
-            new_row['Close'] = pred[-1]
-            current_data = current_data.append(new_row)
-        
-        dates = pd.date_range(start=data.index[-1], periods=total_minutes+1, freq='T')[1:]
-        return pd.DataFrame(predictions, index=dates, columns=['Close'])
+        return self._predict_scaled_tree('LightGBM', data, total_minutes, job)
     
-    def _predict_prophet(self, data: pd.DataFrame, total_minutes: int) -> pd.DataFrame:
+    def _predict_prophet(self, data: pd.DataFrame, total_minutes: int, job: Job) -> pd.DataFrame:
         """Generate predictions using Prophet model"""
         model = self.models['Prophet']
-        future = model.model.make_future_dataframe(periods=total_minutes, freq='T')
-        forecast = model.model.predict(future)
-        return forecast.set_index('ds')['yhat'].tail(total_minutes)
+        return model.forecast_minutes(total_minutes, data.index[-1])
     
-    def _predict_random_forest(self, data: pd.DataFrame, total_minutes: int) -> pd.DataFrame:
+    def _predict_random_forest(self, data: pd.DataFrame, total_minutes: int, job: Job) -> pd.DataFrame:
         """Generate predictions using Random Forest model"""
-        model = self.models['RandomForest']
-        predictions = []
-        current_data = data.copy()
-        
-        for _ in range(total_minutes):
-            X = model.prepare_prediction_data(current_data)
-            pred = model.predict(X)
-            predictions.append(pred[-1])
-            
-            new_row = current_data.iloc[-1].copy()
-            new_row['Close'] = pred[-1]
-            current_data = current_data.append(new_row)
-        
-        dates = pd.date_range(start=data.index[-1], periods=total_minutes+1, freq='T')[1:]
-        return pd.DataFrame(predictions, index=dates, columns=['Close'])
+        return self._predict_scaled_tree('RandomForest', data, total_minutes, job)
     
-    def _predict_xgboost(self, data: pd.DataFrame, total_minutes: int) -> pd.DataFrame:
+    def _predict_xgboost(self, data: pd.DataFrame, total_minutes: int, job: Job) -> pd.DataFrame:
         """Generate predictions using XGBoost model"""
-        model = self.models['XGBoost']
-        predictions = []
-        current_data = data.copy()
+        return self._predict_scaled_tree('XGBoost', data, total_minutes, job)
+    
+    def _predict_scaled_tree(self, model_name: str, data: pd.DataFrame, total_minutes: int,
+                             job: Job) -> pd.DataFrame:
+        """Roll out a tree model trained on scaled features and targets"""
+        model = self.models[model_name]
         
-        for _ in range(total_minutes):
-            X = model.prepare_prediction_data(current_data)
-            pred = model.predict(X)
-            predictions.append(pred[-1])
-            
-            new_row = current_data.iloc[-1].copy()
-            new_row['Close'] = pred[-1]
-            current_data = current_data.append(new_row)
+        def predict_next(candles: pd.DataFrame) -> float:
+            scaled = self._tree_predict(model, model.prepare_prediction_data(candles)[-1:])
+            return model.scaler_y.inverse_transform(np.reshape(scaled, (-1, 1)))[-1, 0]
         
-        dates = pd.date_range(start=data.index[-1], periods=total_minutes+1, freq='T')[1:]
-        return pd.DataFrame(predictions, index=dates, columns=['Close'])
+        return self._rollout(model_name, data, total_minutes, job, predict_next)
+    
+    @staticmethod
+    def _tree_predict(model, X) -> np.ndarray:
+        """Predict with the model's compiled inference path when one has been built"""
+        compiled = getattr(model, 'compiled', None)
+        if compiled is not None:
+            return compiled.predict_batch(X)
+        if hasattr(model, 'predict_scaled'):
+            return model.predict_scaled(X)  # RandomForest, whose model may be compacted away
+        return model.predict(X)
     
     def _update_weights(self, performance_scores: Dict[str, float]) -> None:
         """Update model weights based on performance metrics"""
@@ -294,10 +425,17 @@ class MasterPredictor:
     
     def _generate_master_prediction(self, predictions: Dict[str, pd.DataFrame]) -> pd.DataFrame:
         """Generate master prediction by combining individual predictions"""
+        with timer("ensemble.combine"):
+            return self._combine_predictions(predictions)
+    
+    def _combine_predictions(self, predictions: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        # Re-normalize the weights over the models that produced a prediction
+        total_weight = sum(self.weights[model_name] for model_name in predictions)
+        
         # Align all predictions to the same index
         aligned_predictions = []
         for model_name, pred in predictions.items():
-            weighted_pred = pred['Close'] * self.weights[model_name]
+            weighted_pred = pred['Close'] * (self.weights[model_name] / total_weight)
             aligned_predictions.append(weighted_pred)
         
         # Combine predictions using weighted average
@@ -306,23 +444,48 @@ class MasterPredictor:
         return pd.DataFrame(master_prediction, columns=['Close'])
     
     def save_models(self, directory: str) -> None:
-        """Save all trained models"""
+        """Save every trained model as a native bundle plus the ensemble weights"""
         os.makedirs(directory, exist_ok=True)
         
         for model_name, model in self.models.items():
-            model_path = os.path.join(directory, f"{model_name.lower()}_model.joblib")
-            joblib.dump(model, model_path)
+            bundle_dir = os.path.join(directory, model_name.lower())
+            if isinstance(model, LazyBundle) and not model.loaded and \
+                    os.path.abspath(model.directory) == os.path.abspath(bundle_dir):
+                continue  # Bundle on disk is already current
+            predictor = unwrap(model)
+            if not is_trained(model_name, predictor):
+                self.logger.warning(f"Skipping untrained {model_name} model")
+                continue
+            save_bundle(model_name, predictor, bundle_dir)
         
         # Save weights
-        weights_path = os.path.join(directory, "model_weights.joblib")
-        joblib.dump(self.weights, weights_path)
+        weights_path = os.path.join(directory, "model_weights.json")
+        with open(weights_path, "w") as f:
+            json.dump(self.weights, f, indent=2)
     
     def load_models(self, directory: str) -> None:
-        """Load all saved models"""
+        """
+        Open saved model bundles lazily.
+
+        Only each bundle's manifest is read here; the model files themselves are
+        loaded the first time a model is used.
+        """
         for model_name in self.models.keys():
-            model_path = os.path.join(directory, f"{model_name.lower()}_model.joblib")
-            self.models[model_name] = joblib.load(model_path)
+            bundle_dir = os.path.join(directory, model_name.lower())
+            if not os.path.isdir(bundle_dir):
+                self.logger.warning(f"No saved bundle for {model_name} in {directory}")
+                continue
+            predictor = self.models[model_name]
+            if isinstance(predictor, LazyBundle):
+                predictor = predictor.predictor
+            self.models[model_name] = LazyBundle(predictor, bundle_dir)
         
         # Load weights
-        weights_path = os.path.join(directory, "model_weights.joblib")
-        self.weights = joblib.load(weights_path)
+        weights_path = os.path.join(directory, "model_weights.json")
+        with open(weights_path, "r") as f:
+            self.weights = json.load(f)
+        
+        # Bundles written at the same time identify the same model version
+        created = sorted((name, model.manifest['created']) for name, model in self.models.items()
+                         if isinstance(model, LazyBundle))
+        self.model_version = hashlib.blake2b(repr(created).encode(), digest_size=8).hexdigest()
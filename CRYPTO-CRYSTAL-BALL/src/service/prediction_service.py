@@ -0,0 +1,331 @@
+"""Local HTTP prediction service that keeps MasterPredictor models warm and micro-batches row predictions"""
+import os
+import json
+import time
+import queue
+import logging
+import argparse
+import threading
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..utils.constants import MODEL_INFO, SERVICE
+from ..data.data_acquisition import DataAcquisition
+from ..models.master_predictor import MasterPredictor
+from model_bundle import LazyBundle, unwrap  # Importable once master_predictor has added the project root
+from ..utils import instrumentation
+
+
+class LatencyTracker:
+    """Rolling request latencies per endpoint with p50/p99 summaries"""
+
+    def __init__(self, window: int = SERVICE["latency_window"]):
+        self.window = window
+        self._latencies: Dict[str, deque] = {}
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        with self._lock:
+            self._latencies.setdefault(endpoint, deque(maxlen=self.window)).append(seconds)
+            self._counts[endpoint] = self._counts.get(endpoint, 0) + 1
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            summary = {}
+            for endpoint, latencies in self._latencies.items():
+                values = np.fromiter(latencies, dtype=float)
+                summary[endpoint] = {
+                    "count": self._counts[endpoint],
+                    "p50_ms": float(np.percentile(values, 50) * 1000),
+                    "p99_ms": float(np.percentile(values, 99) * 1000)
+                }
+            return summary
+
+
+class MicroBatcher:
+    """
+    Collects concurrent single-model requests into one vectorized call.
+
+    The worker waits up to max_wait_ms after the first queued request for more
+    to arrive (or until max_batch rows are queued), stacks all rows, calls
+    predict_fn once and hands each caller back its own slice of the result.
+    Rows are checked when submitted, so one malformed request is rejected on
+    its own instead of failing the batch it would have joined.
+    """
+
+    def __init__(self, predict_fn: Callable[[np.ndarray], np.ndarray], n_features: Optional[int] = None,
+                 max_batch: int = SERVICE["max_batch"], max_wait_ms: float = SERVICE["max_wait_ms"]):
+        self.predict_fn = predict_fn
+        self.n_features = n_features
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.batch_sizes = deque(maxlen=SERVICE["latency_window"])
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, rows: np.ndarray) -> Future:
+        rows = np.asarray(rows, dtype=np.float64)
+        if rows.ndim != 2 or not len(rows):
+            raise ValueError(f"Expected a non-empty 2-D array of rows, got shape {rows.shape}")
+        if self.n_features is not None and rows.shape[1] != self.n_features:
+            raise ValueError(f"Expected rows of {self.n_features} features, got {rows.shape[1]}")
+        future = Future()
+        self._queue.put((rows, future))
+        return future
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            n_rows = len(batch[0][0])
+            deadline = time.time() + self.max_wait
+            while n_rows < self.max_batch:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                n_rows += len(item[0])
+
+            self.batch_sizes.append(len(batch))
+            try:
+                predictions = np.asarray(self.predict_fn(np.concatenate([rows for rows, _ in batch])))
+                offset = 0
+                for rows, future in batch:
+                    future.set_result(predictions[offset:offset + len(rows)])
+                    offset += len(rows)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+
+
+class PredictionService:
+    """
+    Keeps one warm MasterPredictor per symbol and serves forecasts over HTTP.
+
+    Endpoints:
+        GET  /health                      -> loaded symbols
+        GET  /metrics                     -> p50/p99 latency per endpoint, mean batch sizes and stage timings
+        GET  /metrics/prometheus          -> stage timings in Prometheus text format
+        POST /forecast                    -> {"symbol", "hours", "days", "enabled_models"?}
+        POST /predict/<symbol>/<model>    -> {"rows": [[...], ...]} in the model's scaled feature space
+
+    Identical concurrent /forecast requests share one computation but are not
+    micro-batched: each distinct request runs its own ensemble prediction.
+    /predict requests for the same model are micro-batched into single
+    inference calls; rows of the wrong shape are rejected with 400.
+    """
+
+    def __init__(self, models_dir: str, symbols: List[str], history_days: int = SERVICE["history_days"],
+                 deadline: Optional[float] = None):
+        self.logger = logging.getLogger(__name__)
+        self.models_dir = models_dir
+        self.history_days = history_days
+        self.deadline = deadline
+        self.data_acquisition = DataAcquisition()
+        self.predictors: Dict[str, MasterPredictor] = {}
+        self.batchers: Dict[tuple, MicroBatcher] = {}
+        self.latency = LatencyTracker()
+        self._inflight: Dict[tuple, Future] = {}
+        self._lock = threading.Lock()
+        for symbol in symbols:
+            self.load_symbol(symbol)
+
+    def load_symbol(self, symbol: str) -> None:
+        """Load a symbol's bundles and warm them up so the first request pays no load cost"""
+        predictor = MasterPredictor()
+        predictor.load_models(os.path.join(self.models_dir, symbol))
+        for model_name, model in predictor.models.items():
+            if not isinstance(model, LazyBundle):
+                continue
+            real = unwrap(model)
+            try:
+                if hasattr(real, 'compile_inference'):
+                    real.compile_inference()
+            except Exception as e:
+                self.logger.warning(f"Could not compile {model_name} for {symbol}: {str(e)}")
+        self.predictors[symbol] = predictor
+        self.logger.info(f"Loaded warm models for {symbol}")
+
+    def _predict_fn(self, symbol: str, model_name: str) -> Callable[[np.ndarray], np.ndarray]:
+        model = unwrap(self.predictors[symbol].models[model_name])
+        compiled = getattr(model, 'compiled', None)
+        if compiled is not None:
+            return compiled.predict_batch
+        if model_name == 'LSTM':
+            return lambda rows: model.predict_fast(rows.reshape((-1,) + tuple(model.model.input_shape[1:])))
+        if model_name == 'LightGBM':
+            return lambda rows: model.booster.predict(rows)
+        return model.model.predict
+
+    def _n_features(self, model_name: str, model) -> Optional[int]:
+        """Width of the rows the model expects, or None if it does not say"""
+        if model_name == 'LSTM':
+            return int(np.prod(model.model.input_shape[1:]))
+        if model_name == 'LightGBM':
+            return model.booster.num_feature()
+        n_features = getattr(model.model, 'n_features_in_', None)
+        return int(n_features) if n_features is not None else None
+
+    def predict_rows(self, symbol: str, model_name: str, rows: np.ndarray) -> np.ndarray:
+        return self.submit_rows(symbol, model_name, rows).result()
+
+    def submit_rows(self, symbol: str, model_name: str, rows: np.ndarray) -> Future:
+        """Queue rows for the model's batcher; raises ValueError for rows of the wrong shape"""
+        key = (symbol, model_name)
+        with self._lock:
+            if key not in self.batchers:
+                model = unwrap(self.predictors[symbol].models[model_name])
+                self.batchers[key] = MicroBatcher(self._predict_fn(symbol, model_name),
+                                                  self._n_features(model_name, model))
+            batcher = self.batchers[key]
+        return batcher.submit(rows)
+
+    def forecast(self, symbol: str, hours: int, days: int,
+                 enabled_models: Optional[Dict[str, bool]] = None) -> Dict:
+        if symbol not in self.predictors:
+            raise KeyError(f"No models loaded for {symbol}")
+        enabled_models = enabled_models or {name: name in self.predictors[symbol].weights for name in MODEL_INFO
+                                            if name != "MASTER"}
+        key = (symbol, hours, days, tuple(sorted(name for name, on in enabled_models.items() if on)))
+
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+        if not owner:
+            return future.result()
+
+        try:
+            end = pd.Timestamp.now()
+            data = self.data_acquisition.get_historical_data(
+                symbol, (end - pd.Timedelta(days=self.history_days)).strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d"))
+            master, individual = self.predictors[symbol].predict(data, {"hours": hours, "days": days},
+                                                                 enabled_models, deadline=self.deadline)
+            result = {
+                "symbol": symbol,
+                "timestamps": [ts.isoformat() for ts in master.index],
+                "master": master["Close"].tolist(),
+                "models": {name: pred["Close"].tolist() for name, pred in individual.items()}
+            }
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def metrics(self) -> Dict:
+        return {
+            "latency": self.latency.snapshot(),
+            "mean_batch_size": {f"{symbol}/{model}": float(np.mean(batcher.batch_sizes))
+                                for (symbol, model), batcher in self.batchers.items() if batcher.batch_sizes},
+            "stages": instrumentation.registry.snapshot()
+        }
+
+    def make_handler(self):
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                service.logger.debug(format % args)
+
+            def _send(self, status: int, payload: Dict) -> None:
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _body(self) -> Dict:
+                length = int(self.headers.get("Content-Length", 0))
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def do_GET(self):
+                if self.path == "/health":
+                    self._send(200, {"status": "ok", "symbols": sorted(service.predictors)})
+                elif self.path == "/metrics":
+                    self._send(200, service.metrics())
+                elif self.path == "/metrics/prometheus":
+                    body = instrumentation.registry.to_prometheus().encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                else:
+                    self._send(404, {"error": f"Unknown path {self.path}"})
+
+            def do_POST(self):
+                started = time.time()
+                parts = self.path.strip("/").split("/")
+                try:
+                    if parts == ["forecast"]:
+                        request = self._body()
+                        result = service.forecast(request["symbol"], int(request.get("hours", 1)),
+                                                  int(request.get("days", 0)), request.get("enabled_models"))
+                        endpoint = "forecast"
+                    elif len(parts) == 3 and parts[0] == "predict":
+                        try:
+                            future = service.submit_rows(parts[1], parts[2], self._body()["rows"])
+                        except ValueError as e:
+                            self._send(400, {"error": str(e)})
+                            return
+                        result = {"predictions": future.result().tolist()}
+                        endpoint = f"predict/{parts[2]}"
+                    else:
+                        self._send(404, {"error": f"Unknown path {self.path}"})
+                        return
+                except KeyError as e:
+                    self._send(404, {"error": str(e)})
+                    return
+                except Exception as e:
+                    service.logger.error(f"Error handling {self.path}: {str(e)}")
+                    self._send(500, {"error": str(e)})
+                    return
+                service.latency.record(endpoint, time.time() - started)
+                self._send(200, result)
+
+        return Handler
+
+    def serve(self, host: str = SERVICE["host"], port: int = SERVICE["port"]) -> None:
+        server = ThreadingHTTPServer((host, port), self.make_handler())
+        self.logger.info(f"Prediction service listening on http://{host}:{port}")
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve warm CRYSTAL-CRYPTO-BALL forecasts over local HTTP")
+    parser.add_argument("symbols", nargs="+", help="Symbols whose saved bundles are loaded at startup")
+    parser.add_argument("--models-dir", default="models/batch", help="Directory holding <symbol>/ model bundles")
+    parser.add_argument("--host", default=SERVICE["host"])
+    parser.add_argument("--port", type=int, default=SERVICE["port"])
+    parser.add_argument("--deadline", type=float, help="Ensemble deadline in seconds")
+    parser.add_argument("--instrument", action="store_true", help="Record stage timings for /metrics")
+    args = parser.parse_args(argv)
+    if args.instrument:
+        instrumentation.enable()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    PredictionService(args.models_dir, args.symbols, deadline=args.deadline).serve(args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -89,14 +89,30 @@ DATA_ACQUISITION = {
     "rate_limit": {
         "requests": 10,
         "per_second": 1
-    }
+    },
+    # Exchange base URLs; each can be overridden with CCB_<KEY>_URL, e.g. CCB_BINANCE_REST_URL
+    "endpoints": {
+        "binance_rest": "https://api.binance.com",
+        "coinbase_rest": "https://api.pro.coinbase.com",
+        "binance_ws": "wss://stream.binance.com:9443/ws",
+        "coinbase_ws": "wss://ws-feed.pro.coinbase.com"
+    },
+    # float32 numerics, int8 calendar fields and no unused columns (also enabled by setting CCB_COMPACT_DTYPES=1)
+    "compact_dtypes": False,
+    # "pandas" or "polars" (optional dependency) for the features added by _process_data
+    "feature_backend": "pandas",
+    # Source columns dropped at ingestion in compact mode
+    "unused_columns": ["close_time", "ignore", "Dividends", "Stock Splits", "Capital Gains",
+                       "time", "conversionType", "conversionSymbol"]
 }
 
 # WebSocket settings
 WEBSOCKET = {
     "reconnect_delay": 5,  # seconds
     "max_reconnects": 5,
-    "heartbeat_interval": 30  # seconds
+    "heartbeat_interval": 30,  # seconds
+    "recording_dir": "data/recordings",
+    "recording_flush_interval": 5  # seconds between flushes of a WebsocketRecorder
 }
 
 # Cache settings
@@ -137,11 +153,114 @@ TRAINING = {
     "learning_rate": 0.001
 }
 
+# Batch training scheduler settings
+BATCH_TRAINING = {
+    "max_workers": None,  # cores to use; None = all
+    "memory_budget_mb": None,  # None = physical memory
+    # Per-job estimates used for budgeting; cost orders jobs longest-first. Cores come from
+    # RESOURCES["job_cores"], where None becomes an even share of the scheduler's cores
+    "job_resources": {
+        "LSTM": {"memory_mb": 4096, "cost": 10},
+        "Prophet": {"memory_mb": 1024, "cost": 6},
+        "RandomForest": {"memory_mb": 3072, "cost": 8},
+        "CatBoost": {"memory_mb": 1536, "cost": 5},
+        "XGBoost": {"memory_mb": 1024, "cost": 4},
+        "LightGBM": {"memory_mb": 1024, "cost": 3},
+        "default": {"memory_mb": 1024, "cost": 1}
+    }
+}
+
+# CPU core budgets for concurrent training (src/utils/resources.py)
+RESOURCES = {
+    "total_cores": None,  # cores this process may use; None = its CPUs (or CCB_CORES)
+    # "share": start jobs at once on the free cores (at least one each); "wait": queue until a job's cores are free
+    "policy": "share",
+    # Cores requested per training job, in process and by the batch scheduler; None = the whole
+    # budget (an even share of the scheduler's cores in batch training)
+    "job_cores": {
+        "LSTM": None,
+        "Prophet": 1,  # Stan fits are single-threaded
+        "RandomForest": None,
+        "CatBoost": None,
+        "XGBoost": None,
+        "LightGBM": None,
+        "default": None
+    }
+}
+
 # Prediction settings
 PREDICTION = {
     "confidence_threshold": 0.8,
     "update_interval": 60,  # seconds
-    "smoothing_window": 5
+    "smoothing_window": 5,
+    "live_latency_budget": 20,  # seconds from candle close to published forecast
+    "live_history_rows": 10080,  # minutes of candles kept by the live engine
+    # Advance the LSTM one candle at a time in live mode instead of re-running full windows;
+    # needs an LSTM trained with Config.BIDIRECTIONAL = False, the default (configs/LstmConfig.py)
+    "live_stateful_lstm": False,
+    "ensemble_deadline": 120  # seconds before the master forecast uses only finished models
+}
+
+# Local prediction service settings
+SERVICE = {
+    "host": "127.0.0.1",
+    "port": 8765,
+    "max_batch": 256,  # rows per micro-batched inference call
+    "max_wait_ms": 2,  # how long a batch waits for more requests
+    "latency_window": 10000,  # requests kept for p50/p99
+    "history_days": 7  # candles fetched per forecast request
+}
+
+# Local exchange stand-in (src/data/local_exchange.py)
+LOCAL_EXCHANGE = {
+    "host": "127.0.0.1",
+    "rest_port": 8766,
+    "ws_port": 8767,
+    "history_days": 30,  # candles served by the REST endpoints
+    "stream_days": 1,  # candles available to the websocket streams after the history
+    "stream_speed": 1.0,  # simulated minutes per real minute; 0 = as fast as possible
+    "latency_ms": 0,
+    "jitter_ms": 0,
+    "rate_limit_probability": 0.0,  # chance a REST request gets HTTP 429
+    "error_probability": 0.0,  # chance a REST request gets HTTP 500
+    "disconnect_probability": 0.0,  # chance per websocket message that the connection drops
+    "updates_per_candle": 1,  # Binance kline updates per candle, the last one closing it
+    "trades_per_candle": 4  # Coinbase matches per candle
+}
+
+# Synthetic market data (src/data/synthetic.py)
+SYNTHETIC_DATA = {
+    # Volatility regimes (per-minute log-return std) the market switches between
+    "regime_volatility": [0.0004, 0.0009, 0.0025],
+    "regime_switch_probability": 1 / 720,  # per minute; regimes last ~12 hours on average
+    "tail_df": 4,  # Student-t degrees of freedom of the shocks; lower = fatter tails
+    "correlation": 0.7,  # pairwise return correlation between symbols
+    "volume_persistence": 0.98,  # AR(1) coefficient of log volume
+    "gap_probability": 1 / 20000,  # per minute chance an outage starts
+    "gap_mean_minutes": 15,
+    "start_prices": {"BTCUSDT": 30000.0, "ETHUSDT": 2000.0, "BNBUSDT": 300.0, "SOLUSDT": 100.0}
+}
+
+# Stage timing instrumentation (also enabled by setting CCB_INSTRUMENT=1)
+INSTRUMENTATION = {
+    "enabled": False,
+    "buckets": [0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 1800],  # seconds
+    "export_path": "logs/metrics.prom"  # .json for a JSON snapshot
+}
+
+# Per-stage memory profiling (also enabled by setting CCB_MEMORY_PROFILE=1)
+MEMORY_PROFILING = {
+    "enabled": False,
+    # Instrumented stages to profile; per-step rollout timers are too fine-grained for snapshots
+    "stages": ["acquisition.fetch", "features.process_data", "train", "predict", "ensemble.combine"],
+    "traceback_frames": 1,  # frames kept per allocation; more gives call paths at a higher cost
+    "top_sites": 10,
+    "rss_interval": 0.05,  # seconds between RSS samples
+    "serialize": True,  # run profiled stages one at a time so allocations are attributed correctly
+    # Never serialized: the deadline ensemble combines while models that missed it are still in
+    # "predict", so waiting for them would turn the deadline into waiting for every model
+    "concurrent_stages": ["ensemble.combine"],
+    "report_path": "logs/memory_report.json"
 }
 
 # GUI settings
@@ -0,0 +1,185 @@
+"""Lightweight stage timers, counters and histograms with JSON / Prometheus-text export"""
+import os
+import json
+import atexit
+import time
+import bisect
+import threading
+from contextlib import nullcontext
+from typing import Dict, Optional, Tuple
+
+from .constants import INSTRUMENTATION, MEMORY_PROFILING
+
+_NULL_TIMER = nullcontext()
+_enabled = INSTRUMENTATION["enabled"] or os.environ.get("CCB_INSTRUMENT", "") not in ("", "0")
+
+_memory_profiler = None
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict[str, str]) -> LabelKey:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Histogram:
+    """Cumulative-bucket histogram of durations in seconds, as in Prometheus"""
+
+    def __init__(self, buckets=INSTRUMENTATION["buckets"]):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def to_dict(self) -> Dict:
+        cumulative, running = {}, 0
+        for bound, count in zip(self.buckets + [float("inf")], self.counts):
+            running += count
+            cumulative["+Inf" if bound == float("inf") else repr(bound)] = running
+        return {"count": self.count, "sum": self.sum, "max": self.max,
+                "mean": self.sum / self.count if self.count else 0.0, "buckets": cumulative}
+
+
+class _Timer:
+    __slots__ = ("registry", "key", "start")
+
+    def __init__(self, registry: "Registry", key: LabelKey):
+        self.registry = registry
+        self.key = key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe_key(self.key, time.perf_counter() - self.start)
+        return False
+
+
+class Registry:
+    """Thread-safe store of histograms and counters keyed by metric name and labels"""
+
+    def __init__(self):
+        self.histograms: Dict[LabelKey, Histogram] = {}
+        self.counters: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def observe_key(self, key: LabelKey, seconds: float) -> None:
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def increment_key(self, key: LabelKey, value: float) -> None:
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "timers": [{"name": name, "labels": dict(labels), **histogram.to_dict()}
+                           for (name, labels), histogram in sorted(self.histograms.items())],
+                "counters": [{"name": name, "labels": dict(labels), "value": value}
+                             for (name, labels), value in sorted(self.counters.items())]
+            }
+
+    def to_prometheus(self, prefix: str = "ccb") -> str:
+        lines = []
+        snapshot = self.snapshot()
+        for timer in snapshot["timers"]:
+            metric = f"{prefix}_{timer['name'].replace('.', '_')}_seconds"
+            for bound, count in timer["buckets"].items():
+                lines.append(f"{metric}_bucket{_format_labels(timer['labels'], le=bound)} {count}")
+            lines.append(f"{metric}_sum{_format_labels(timer['labels'])} {timer['sum']}")
+            lines.append(f"{metric}_count{_format_labels(timer['labels'])} {timer['count']}")
+        for counter in snapshot["counters"]:
+            metric = f"{prefix}_{counter['name'].replace('.', '_')}_total"
+            lines.append(f"{metric}{_format_labels(counter['labels'])} {counter['value']}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: Dict[str, str], **extra) -> str:
+    pairs = [f'{k}="{v}"' for k, v in {**labels, **extra}.items()]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+registry = Registry()
+
+
+def enable(flag: bool = True) -> None:
+    global _enabled
+    _enabled = flag
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def enable_memory_profiling(report_path: Optional[str] = None):
+    """
+    Start a MemoryProfiler around the stages in MEMORY_PROFILING["stages"] and
+    write its report to report_path when the process exits. Returns the profiler.
+    """
+    global _memory_profiler
+    from .memory_profiler import MemoryProfiler
+    if _memory_profiler is None:
+        _memory_profiler = MemoryProfiler()
+        _memory_profiler.start()
+        atexit.register(_memory_profiler.export, report_path)
+    return _memory_profiler
+
+
+def timer(name: str, **labels):
+    """
+    Context manager timing a stage, e.g. ``with timer("train", model="LSTM"):``.
+
+    When instrumentation is disabled this returns a shared no-op context, so the
+    cost is two global lookups per call. With memory profiling on, profiled
+    stages are also measured by the MemoryProfiler.
+    """
+    if _memory_profiler is not None and name in _memory_profiler.stages:
+        return _memory_profiler.stage(name, labels, _Timer(registry, _key(name, labels)) if _enabled else None)
+    if not _enabled:
+        return _NULL_TIMER
+    return _Timer(registry, _key(name, labels))
+
+
+def observe(name: str, seconds: float, **labels) -> None:
+    """Record an already measured duration"""
+    if _enabled:
+        registry.observe_key(_key(name, labels), seconds)
+
+
+def count(name: str, value: float = 1, **labels) -> None:
+    if _enabled:
+        registry.increment_key(_key(name, labels), value)
+
+
+def export(path: Optional[str] = None) -> str:
+    """Write a snapshot as JSON (.json) or Prometheus text (anything else) and return the path"""
+    path = path or INSTRUMENTATION["export_path"]
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        if path.endswith(".json"):
+            json.dump(registry.snapshot(), f, indent=2)
+        else:
+            f.write(registry.to_prometheus())
+    os.replace(tmp_path, path)
+    return path
+
+
+if MEMORY_PROFILING["enabled"] or os.environ.get("CCB_MEMORY_PROFILE", "") not in ("", "0"):
+    enable_memory_profiling()
@@ -0,0 +1,66 @@
+"""Cooperative cancellation and progress reporting for long-running work"""
+import time
+import threading
+from typing import Callable, Optional
+
+
+class JobCancelled(Exception):
+    """Raised from a cancelled job's check() or progress() at the next safe point"""
+
+
+class Job:
+    """
+    Cancellation token and progress sink for one unit of work.
+
+    Long-running code calls job.check() (or job.progress(), which checks too)
+    at safe points and unwinds with JobCancelled once cancel() has been called
+    from another thread. Work is split with job.child(start, end): the child
+    shares the cancellation flag and maps its own 0-1 progress into that
+    slice of the parent's, so nested stages report one overall fraction.
+
+    on_progress(fraction, message) is throttled to one call per min_interval
+    seconds (plus the final 100%), because boosting rounds and Keras batches
+    report far more often than a progress bar can redraw.
+    """
+
+    def __init__(self, on_progress: Optional[Callable[[float, str], None]] = None, min_interval: float = 0.1):
+        self._cancelled = threading.Event()
+        self._on_progress = on_progress
+        self._min_interval = min_interval
+        self._last_report = [0.0]  # Shared with children so they throttle together
+        self._start = 0.0
+        self._span = 1.0
+        self.fraction = 0.0
+
+    def child(self, start: float, end: float) -> "Job":
+        child = Job.__new__(Job)
+        child._cancelled = self._cancelled
+        child._on_progress = self._on_progress
+        child._min_interval = self._min_interval
+        child._last_report = self._last_report
+        child._start = self._start + self._span * start
+        child._span = self._span * (end - start)
+        child.fraction = child._start
+        return child
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def check(self) -> None:
+        if self._cancelled.is_set():
+            raise JobCancelled()
+
+    def progress(self, fraction: float, message: str = "") -> None:
+        """Report progress through this job (0-1) and check for cancellation"""
+        self.check()
+        self.fraction = self._start + self._span * min(max(fraction, 0.0), 1.0)
+        if self._on_progress is None:
+            return
+        now = time.monotonic()
+        if now - self._last_report[0] >= self._min_interval or self.fraction >= 1.0:
+            self._last_report[0] = now
+            self._on_progress(self.fraction, message)
@@ -0,0 +1,180 @@
+"""Opt-in per-stage memory profiling with tracemalloc snapshots and RSS sampling"""
+import os
+import json
+import time
+import resource
+import threading
+import tracemalloc
+from typing import Dict, List, Optional
+
+from .constants import MEMORY_PROFILING
+
+_MB = 2**20
+
+
+def current_rss() -> int:
+    """Resident set size in bytes (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if os.uname().sysname == "Darwin" else maxrss * 1024
+
+
+def _take_snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+
+
+class _Stage:
+    __slots__ = ("profiler", "key", "timer", "serial", "start_traced", "child_peak", "start_rss", "peak_rss",
+                 "snapshot")
+
+    def __init__(self, profiler: "MemoryProfiler", key: tuple, timer=None):
+        self.profiler = profiler
+        self.key = key
+        self.timer = timer
+        self.serial = profiler.serialize and key[0] not in profiler.concurrent_stages
+
+    def __enter__(self):
+        if self.serial:
+            self.profiler._serial.acquire()
+        self.profiler._enter(self)
+        if self.timer is not None:
+            self.timer.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        if self.timer is not None:
+            self.timer.__exit__(*exc)
+        self.profiler._exit(self)
+        if self.serial:
+            self.profiler._serial.release()
+        return False
+
+
+class MemoryProfiler:
+    """
+    Records peak and retained Python allocations and peak RSS for each stage.
+
+    Stages nest: a stage's peak includes the peaks of the stages inside it.
+    Retained memory is what the stage still holds on exit, and the top
+    allocation sites are taken from a snapshot diff across the stage, keeping
+    the occurrence with the highest peak.
+
+    tracemalloc counters are process-wide, so with serialize set (the default)
+    profiled stages running on different threads, such as the ensemble's
+    parallel model predictions, take turns instead of sharing each other's memory.
+    concurrent_stages are exempt: the ensemble's combine step must not wait
+    for models still predicting after the deadline, so its figures may
+    include their allocations.
+    """
+
+    def __init__(self, stages=MEMORY_PROFILING["stages"], frames: int = MEMORY_PROFILING["traceback_frames"],
+                 top_sites: int = MEMORY_PROFILING["top_sites"], rss_interval: float = MEMORY_PROFILING["rss_interval"],
+                 serialize: bool = MEMORY_PROFILING["serialize"],
+                 concurrent_stages=MEMORY_PROFILING["concurrent_stages"]):
+        self.stages = set(stages)
+        self.serialize = serialize
+        self.concurrent_stages = set(concurrent_stages)
+        self._serial = threading.RLock()
+        self.frames = frames
+        self.top_sites = top_sites
+        self.rss_interval = rss_interval
+        self.results: Dict[tuple, Dict] = {}
+        self._stack: List[_Stage] = []
+        self._lock = threading.RLock()
+        self._sampler: Optional[threading.Thread] = None
+        self._running = False
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        self._running = True
+        self._sampler = threading.Thread(target=self._sample_rss, daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> None:
+        self._running = False
+        if self._sampler is not None:
+            self._sampler.join(timeout=1)
+        tracemalloc.stop()
+
+    def _sample_rss(self) -> None:
+        while self._running:
+            rss = current_rss()
+            with self._lock:
+                for stage in self._stack:
+                    stage.peak_rss = max(stage.peak_rss, rss)
+            time.sleep(self.rss_interval)
+
+    def stage(self, name: str, labels: Optional[Dict] = None, timer=None) -> _Stage:
+        return _Stage(self, (name, tuple(sorted((k, str(v)) for k, v in (labels or {}).items()))), timer)
+
+    def _enter(self, stage: _Stage) -> None:
+        with self._lock:
+            traced, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                # Keep the parent's peak so far before resetting the shared peak counter
+                self._stack[-1].child_peak = max(self._stack[-1].child_peak, peak)
+            tracemalloc.reset_peak()
+            stage.start_traced = traced
+            stage.child_peak = traced
+            stage.start_rss = stage.peak_rss = current_rss()
+            stage.snapshot = _take_snapshot()
+            self._stack.append(stage)
+
+    def _exit(self, stage: _Stage) -> None:
+        snapshot = _take_snapshot()
+        with self._lock:
+            traced, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, stage.child_peak)
+            stage.peak_rss = max(stage.peak_rss, current_rss())
+            if stage in self._stack:
+                self._stack.remove(stage)
+            if self._stack:
+                self._stack[-1].child_peak = max(self._stack[-1].child_peak, peak)
+                self._stack[-1].peak_rss = max(self._stack[-1].peak_rss, stage.peak_rss)
+
+            result = self.results.setdefault(stage.key, {
+                "name": stage.key[0], "labels": dict(stage.key[1]), "count": 0, "peak_mb": 0.0,
+                "retained_mb": 0.0, "peak_rss_mb": 0.0, "rss_growth_mb": 0.0, "top_sites": []
+            })
+            result["count"] += 1
+            result["retained_mb"] += (traced - stage.start_traced) / _MB
+            result["peak_rss_mb"] = max(result["peak_rss_mb"], stage.peak_rss / _MB)
+            result["rss_growth_mb"] = max(result["rss_growth_mb"], (stage.peak_rss - stage.start_rss) / _MB)
+            if (peak - stage.start_traced) / _MB >= result["peak_mb"]:
+                result["peak_mb"] = (peak - stage.start_traced) / _MB
+                result["top_sites"] = [
+                    {"site": str(diff.traceback), "size_mb": diff.size_diff / _MB, "count": diff.count_diff}
+                    for diff in snapshot.compare_to(stage.snapshot, "traceback")[:self.top_sites]
+                ]
+        stage.snapshot = None
+
+    def reset(self) -> None:
+        """Drop the results recorded so far"""
+        with self._lock:
+            self.results.clear()
+
+    def report(self) -> List[Dict]:
+        with self._lock:
+            return sorted((dict(r) for r in self.results.values()), key=lambda r: -r["peak_mb"])
+
+    def format_report(self) -> str:
+        lines = [f"{'stage':<40} {'runs':>5} {'peak MB':>10} {'retained MB':>12} {'peak RSS MB':>12}"]
+        for r in self.report():
+            labels = ",".join(f"{k}={v}" for k, v in r["labels"].items())
+            name = f"{r['name']}[{labels}]" if labels else r["name"]
+            lines.append(f"{name:<40} {r['count']:>5} {r['peak_mb']:>10.1f} {r['retained_mb']:>12.1f} "
+                         f"{r['peak_rss_mb']:>12.1f}")
+            for site in r["top_sites"][:3]:
+                lines.append(f"    {site['size_mb']:>9.1f} MB  {site['site']}")
+        return "\n".join(lines)
+
+    def export(self, path: Optional[str] = None) -> str:
+        path = path or MEMORY_PROFILING["report_path"]
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"stages": self.report(), "final_rss_mb": current_rss() / _MB}, f, indent=2)
+        return path
@@ -0,0 +1,15 @@
+"""Locations inside the project checkout"""
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def add_project_root() -> None:
+    """
+    Make the model modules at the project root (Lstm_model, model_bundle, ...)
+    importable. They live outside the src package, so relative imports from
+    src cannot reach them.
+    """
+    if PROJECT_ROOT not in sys.path:
+        sys.path.append(PROJECT_ROOT)
@@ -0,0 +1,154 @@
+"""
+CPU core budgets for concurrently running training jobs.
+
+Left alone, every library sizes its thread pool to the whole machine:
+TensorFlow's intra-op pool, the OpenMP pools behind LightGBM, XGBoost and
+NumPy, CatBoost's thread_count, scikit-learn's n_jobs=-1 and Prophet's tuning
+processes. Two such jobs running at once each start a full set of threads and
+spend their time context switching. The governor hands each job a share of
+the process's core budget and the job sizes its libraries to that share, so
+concurrent jobs add throughput instead of contending.
+
+The budget is RESOURCES["total_cores"], the CCB_CORES environment variable
+(set by configure_process, so worker processes inherit their grant) or the
+CPUs this process may run on.
+"""
+import os
+import sys
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from .constants import RESOURCES
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:
+    threadpool_limits = None
+
+CORES_ENV_VAR = "CCB_CORES"
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS', 'NUMEXPR_NUM_THREADS',
+                   'VECLIB_MAXIMUM_THREADS')
+
+logger = logging.getLogger(__name__)
+
+
+def process_cores() -> int:
+    """The core budget of this process"""
+    if os.environ.get(CORES_ENV_VAR):
+        return max(1, int(os.environ[CORES_ENV_VAR]))
+    if RESOURCES["total_cores"]:
+        return max(1, int(RESOURCES["total_cores"]))
+    try:
+        return len(os.sched_getaffinity(0))  # Respects taskset and container CPU sets
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class CoreGovernor:
+    """
+    Grants core budgets to the jobs running in this process.
+
+    With the "share" policy a job gets the cores it asks for, or whatever is
+    free if less, so it may run narrower than requested; it only waits while
+    no core at all is free. With "wait" it blocks until its full request is
+    free. Requests default to RESOURCES["job_cores"] for the job's name, where
+    None asks for the whole budget.
+
+    Shrinking the budget below what running jobs hold leaves no core free
+    until enough of them release theirs; new jobs wait until then.
+    """
+
+    def __init__(self, total_cores: Optional[int] = None, policy: Optional[str] = None):
+        self.total_cores = total_cores or process_cores()
+        self.policy = policy or RESOURCES["policy"]
+        if self.policy not in ("share", "wait"):
+            raise ValueError(f"Unknown resource policy: {self.policy}")
+        self.allocations: Dict[str, int] = {}
+        self._free = self.total_cores
+        self._condition = threading.Condition()
+
+    def resize(self, total_cores: int) -> None:
+        """Change the budget; running jobs keep their grants"""
+        with self._condition:
+            self.total_cores = max(1, int(total_cores))
+            self._free = self.total_cores - sum(self.allocations.values())
+            self._condition.notify_all()
+
+    def requested_cores(self, name: str, cores: Optional[int] = None) -> int:
+        job_cores = RESOURCES["job_cores"]
+        cores = cores or job_cores.get(name, job_cores["default"]) or self.total_cores
+        return max(1, min(int(cores), self.total_cores))
+
+    def acquire(self, name: str, cores: Optional[int] = None) -> int:
+        requested = self.requested_cores(name, cores)
+        with self._condition:
+            if self.policy == "wait":
+                # The budget may shrink below the request while waiting
+                self._condition.wait_for(lambda: self._free >= min(requested, self.total_cores))
+                granted = min(requested, self.total_cores)
+            else:
+                self._condition.wait_for(lambda: self._free >= 1)
+                granted = min(requested, self._free)
+            self._free -= granted
+            self.allocations[name] = self.allocations.get(name, 0) + granted
+        logger.debug(f"Granted {granted}/{requested} cores to {name}")
+        return granted
+
+    def release(self, name: str, cores: int) -> None:
+        with self._condition:
+            self._free += cores
+            self.allocations[name] -= cores
+            if not self.allocations[name]:
+                del self.allocations[name]
+            self._condition.notify_all()
+
+    @contextmanager
+    def allocate(self, name: str, cores: Optional[int] = None) -> Iterator[int]:
+        """Hold a grant of cores for the duration of the block"""
+        granted = self.acquire(name, cores)
+        try:
+            yield granted
+        finally:
+            self.release(name, granted)
+
+
+def configure_tensorflow(cores: int) -> bool:
+    """
+    Size TensorFlow's thread pools to cores.
+
+    TensorFlow reads its pool sizes once, when its runtime starts; afterwards
+    this returns False and the pools keep their size.
+    """
+    inter_op = max(1, min(2, cores // 2))
+    os.environ['TF_NUM_INTRAOP_THREADS'] = str(cores)
+    os.environ['TF_NUM_INTEROP_THREADS'] = str(inter_op)
+    tf = sys.modules.get('tensorflow')
+    if tf is None:
+        return True  # Picked up from the environment when TensorFlow is imported
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(cores)
+        tf.config.threading.set_inter_op_parallelism_threads(inter_op)
+    except RuntimeError:
+        logger.debug("TensorFlow runtime already initialized; keeping its thread pools")
+        return False
+    return True
+
+
+def configure_process(cores: int) -> None:
+    """
+    Give this whole process a budget of cores: OpenMP/BLAS pools, TensorFlow
+    and the governor. Call it first thing in a worker process, before the
+    native libraries start their pools.
+    """
+    os.environ[CORES_ENV_VAR] = str(cores)
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(cores)
+    if threadpool_limits is not None:
+        threadpool_limits(cores)  # Pools already started, e.g. in a reused or forked worker
+    configure_tensorflow(cores)
+    governor.resize(cores)
+
+
+governor = CoreGovernor()
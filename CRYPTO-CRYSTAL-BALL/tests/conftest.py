@@ -0,0 +1,64 @@
+"""Shared fixtures"""
+import ast
+import os
+import shutil
+import sys
+
+import pytest
+import yaml
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """A scratch working directory with the model configs, which the models open by relative path"""
+    shutil.copytree(os.path.join(PROJECT_ROOT, 'configs'), tmp_path / 'configs',
+                    ignore=shutil.ignore_patterns('__pycache__'))
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+# Search spaces small enough to train every model in seconds
+SMALL_CONFIGS = {
+    'catboostconfig.yaml': {'grid_search_params': {'iterations': [20], 'learning_rate': [0.1], 'depth': [2, 3]}},
+    'LGBM_Config.yaml': {'num_boost_round': 10, 'cv_folds': 2,
+                         'param_grid': {'num_leaves': [4, 8], 'learning_rate': [0.1], 'max_depth': [-1]}},
+    'prophet_config.yaml': {'cv_initial': '1 days', 'cv_period': '12 hours', 'cv_horizon': '6 hours'},
+    'random_forest_config.yaml': {'hyperparameter_tuning': {'n_estimators': [5], 'max_features': ['sqrt'],
+                                                            'max_depth': [4, None], 'min_samples_split': [2],
+                                                            'min_samples_leaf': [1], 'bootstrap': [True]}},
+    'Xgboost_config.yaml': {'hyperparameter_tuning': {'n_iter': 1, 'n_estimators': {'min': 5, 'max': 10},
+                                                      'max_depth': {'min': 2, 'max': 3},
+                                                      'learning_rate': {'min': 0.1, 'max': 0.3},
+                                                      'subsample': {'min': 0.8, 'max': 1.0},
+                                                      'colsample_bytree': {'min': 0.8, 'max': 1.0}}},
+}
+
+
+SMALL_LSTM = {'LSTM_UNITS = [128, 64]': 'LSTM_UNITS = [8]', 'DENSE_UNITS = [32]': 'DENSE_UNITS = [4]',
+              'LOOKBACK = 60': 'LOOKBACK = 10', 'EPOCHS = 100': 'EPOCHS = 1'}
+
+
+@pytest.fixture
+def small_models(workdir, monkeypatch):
+    """workdir with every model's search space and the LSTM shrunk to train in seconds"""
+    for name, overrides in SMALL_CONFIGS.items():
+        path = workdir / 'configs' / name
+        config = yaml.safe_load(path.read_text())
+        config.update(overrides)
+        path.write_text(yaml.safe_dump(config))
+    # Spawned workers inherit sys.path, so they import this copy of configs.LstmConfig
+    path = workdir / 'configs' / 'LstmConfig.py'
+    source = path.read_text()
+    for old, new in SMALL_LSTM.items():
+        assert old in source
+        source = source.replace(old, new)
+    path.write_text(source)
+    monkeypatch.syspath_prepend(str(workdir))
+    loaded = sys.modules.get('configs.LstmConfig')
+    if loaded is not None:  # Already imported in this process from the project
+        for line in SMALL_LSTM.values():
+            name, value = line.split(' = ')
+            monkeypatch.setattr(loaded.Config, name, ast.literal_eval(value))
+    return workdir
@@ -0,0 +1,38 @@
+"""Every model type must train through the batch scheduler on the candles it is given"""
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+for module in ('tensorflow', 'catboost', 'lightgbm', 'xgboost', 'prophet'):
+    pytest.importorskip(module)
+
+from model_bundle import read_manifest
+from src.data.data_acquisition import DataAcquisition
+from src.data.synthetic import generate_ohlcv
+from src.models.batch_scheduler import BatchTrainingScheduler
+
+MODELS = ['LSTM', 'CatBoost', 'LightGBM', 'Prophet', 'RandomForest', 'XGBoost']
+
+
+def test_one_job_per_model_type(small_models):
+    output_dir = small_models / 'batch'
+    symbol_dir = output_dir / 'ETHUSDT'
+    symbol_dir.mkdir(parents=True)
+    # Seed the scheduler's per-symbol candle cache so no exchange is contacted
+    candles = DataAcquisition()._process_data(generate_ohlcv(3 * 1440, start='2024-01-01', seed=7))
+    candles.to_pickle(symbol_dir / 'candles_2024-01-01_2024-01-04.pkl')
+
+    scheduler = BatchTrainingScheduler(['ETHUSDT'], MODELS, '2024-01-01', '2024-01-04',
+                                       output_dir=str(output_dir), max_workers=2)
+    results = scheduler.run()
+
+    assert {model: result['status'] for (_, model), result in results.items()} == \
+        {model: 'completed' for model in MODELS}, results
+    for model in MODELS:
+        assert read_manifest(str(symbol_dir / model.lower()))['name'] == model
+    with open(output_dir / 'checkpoint.jsonl') as f:
+        assert {json.loads(line)['model'] for line in f} == set(MODELS)
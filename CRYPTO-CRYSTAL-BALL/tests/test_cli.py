@@ -0,0 +1,42 @@
+"""The headless CLI must train and forecast with every model end to end"""
+import importlib.util
+import json
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+import pytest
+
+for module in ('tensorflow', 'catboost', 'lightgbm', 'xgboost', 'prophet'):
+    pytest.importorskip(module)
+
+from src.data.data_acquisition import DataAcquisition
+from src.data.synthetic import generate_ohlcv
+
+MODELS = ['LSTM', 'CatBoost', 'LightGBM', 'Prophet', 'RandomForest', 'XGBoost']
+
+
+def load_cli():
+    # The script name is not a valid module name
+    spec = importlib.util.spec_from_file_location('crypto_crystal_ball_cli',
+                                                  os.path.join(PROJECT_ROOT, 'crypto-crystal-ball-cli.py'))
+    cli = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(cli)
+    return cli
+
+
+def test_every_model_forecasts(small_models, monkeypatch):
+    candles = DataAcquisition()._process_data(generate_ohlcv(3 * 1440, start='2024-01-01', seed=3))
+    monkeypatch.setattr(DataAcquisition, 'get_historical_data', lambda self, *args, **kwargs: candles)
+    output_dir = small_models / 'forecasts'
+
+    assert load_cli().main(['BTCUSDT', '--hours', '1', '--output-dir', str(output_dir)]) == 0
+
+    with open(output_dir / 'BTCUSDT_forecast.json') as f:
+        rows = json.load(f)
+    assert len(rows) == 60
+    for row in rows:
+        for column in ['MASTER'] + MODELS:
+            assert row[column] is not None, (column, row)
@@ -0,0 +1,42 @@
+"""The prediction entry points must import and construct outside the GUI"""
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+for module in ('tensorflow', 'catboost', 'lightgbm', 'xgboost', 'prophet'):
+    pytest.importorskip(module)
+
+from src.data.data_acquisition import DataAcquisition
+from src.data.synthetic import generate_ohlcv
+from src.models.batch_scheduler import BatchTrainingScheduler
+from src.models.live_engine import LivePredictionEngine
+from src.models.master_predictor import MasterPredictor
+from src.service.prediction_service import PredictionService
+
+
+def test_master_predictor(workdir):
+    predictor = MasterPredictor()
+    assert sorted(predictor.models) == ['CatBoost', 'LSTM', 'LightGBM', 'Prophet', 'RandomForest', 'XGBoost']
+    assert sum(predictor.weights.values()) == pytest.approx(1.0)
+
+
+def test_batch_training_scheduler(workdir):
+    scheduler = BatchTrainingScheduler(['BTCUSDT', 'ETHUSDT'], ['XGBoost', 'LSTM'], '2024-01-01', '2024-01-02',
+                                       output_dir=str(workdir / 'batch'))
+    assert sorted(scheduler.plan()) == [('BTCUSDT', 'LSTM'), ('BTCUSDT', 'XGBoost'),
+                                        ('ETHUSDT', 'LSTM'), ('ETHUSDT', 'XGBoost')]
+
+
+def test_live_engine(workdir):
+    history = DataAcquisition()._process_data(generate_ohlcv(120, seed=0))
+    engine = LivePredictionEngine(MasterPredictor(), None, 'BTCUSDT', history, {'hours': 1, 'days': 0},
+                                  {'RandomForest': True}, stateful_lstm=False)
+    assert engine.total_minutes == 60 and engine.enabled_models == ['RandomForest']
+
+
+def test_prediction_service(workdir):
+    service = PredictionService(str(workdir / 'models'), [])
+    assert service.predictors == {}
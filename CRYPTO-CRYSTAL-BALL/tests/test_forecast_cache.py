@@ -0,0 +1,100 @@
+"""Tests for the LRU forecast cache"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from src.models.forecast_cache import ForecastCache, _frame_bytes, data_fingerprint
+
+
+def _forecast(minutes: int, level: float = 100.0):
+    index = pd.date_range("2024-01-01", periods=minutes, freq="min")
+    frame = pd.DataFrame({"Close": np.linspace(level, level + 1, minutes)}, index=index)
+    return frame, {"LSTM": frame * 1.01, "XGBoost": frame * 0.99}
+
+
+def _size(forecast) -> int:
+    master, individual = forecast
+    return _frame_bytes(master) + sum(_frame_bytes(pred) for pred in individual.values())
+
+
+def test_get_serves_shorter_horizons_from_longer_entries():
+    cache = ForecastCache()
+    cache.put("key", 60, _forecast(60))
+    master, individual = cache.get("key", 30)
+    assert len(master) == 30 and all(len(pred) == 30 for pred in individual.values())
+    assert cache.get("key", 90) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_put_keeps_the_longest_horizon():
+    cache = ForecastCache()
+    cache.put("key", 60, _forecast(60))
+    cache.put("key", 30, _forecast(30))
+    assert len(cache.get("key", 60)[0]) == 60
+
+
+def test_least_recently_used_entries_are_evicted_first():
+    entry_size = _size(_forecast(60))
+    cache = ForecastCache(max_size_mb=2.5 * entry_size / 2**20)
+    cache.put("a", 60, _forecast(60))
+    cache.put("b", 60, _forecast(60))
+    cache.get("a", 60)  # b is now the least recently used
+    cache.put("c", 60, _forecast(60))
+    assert cache.get("b", 60) is None
+    assert cache.get("a", 60) is not None
+    assert cache.get("c", 60) is not None
+    assert cache._bytes <= cache.max_bytes
+
+
+def test_entries_larger_than_the_cache_are_not_stored():
+    cache = ForecastCache(max_size_mb=_size(_forecast(10)) / 2**20)
+    cache.put("big", 1000, _forecast(1000))
+    assert cache.get("big", 1000) is None
+    assert cache._bytes == 0
+
+
+def test_entries_expire():
+    cache = ForecastCache(expiry=0.05)
+    cache.put("key", 60, _forecast(60))
+    time.sleep(0.1)
+    assert cache.get("key", 60) is None
+    assert cache._bytes == 0
+
+
+def test_cached_forecasts_are_isolated_from_callers():
+    cache = ForecastCache()
+    master, individual = _forecast(60)
+    cache.put("key", 60, (master, individual))
+    master.iloc[0, 0] = -1.0
+    individual["LSTM"].iloc[0, 0] = -1.0
+    cached_master, cached_individual = cache.get("key", 60)
+    assert cached_master.iloc[0, 0] == 100.0
+    cached_master.iloc[1, 0] = -1.0
+    cached_individual["LSTM"].iloc[1, 0] = -1.0
+    again_master, again_individual = cache.get("key", 60)
+    assert again_master.iloc[1, 0] != -1.0
+    assert again_individual["LSTM"].iloc[1, 0] != -1.0
+
+
+def test_entries_survive_restarts_on_disk(tmp_path):
+    ForecastCache(directory=str(tmp_path)).put("key", 60, _forecast(60))
+    master, _ = ForecastCache(directory=str(tmp_path)).get("key", 60)
+    pd.testing.assert_frame_equal(master, _forecast(60)[0])
+
+
+def test_make_key_and_fingerprint():
+    weights = {"LSTM": 0.5, "XGBoost": 0.5, "Prophet": 0.2}
+    key = ForecastCache.make_key("fp", "v1", {"LSTM": True, "XGBoost": True, "Prophet": False}, weights)
+    assert key == ForecastCache.make_key("fp", "v1", {"XGBoost": True, "LSTM": True}, weights)
+    assert key != ForecastCache.make_key("fp", "v2", {"LSTM": True, "XGBoost": True}, weights)
+
+    candles = _forecast(100)[0]
+    revised = candles.copy()
+    revised.iloc[-1, 0] += 1
+    assert data_fingerprint(candles) == data_fingerprint(candles.copy())
+    assert data_fingerprint(candles) != data_fingerprint(revised)
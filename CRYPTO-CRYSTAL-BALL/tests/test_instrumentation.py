@@ -0,0 +1,80 @@
+"""Tests for the stage timing registry and its exports"""
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.utils import instrumentation
+from src.utils.instrumentation import Registry, _key
+
+
+@pytest.fixture
+def enabled():
+    was_enabled = instrumentation.is_enabled()
+    instrumentation.registry.reset()
+    instrumentation.enable()
+    yield instrumentation.registry
+    instrumentation.enable(was_enabled)
+    instrumentation.registry.reset()
+
+
+def test_registry_snapshot_and_reset():
+    registry = Registry()
+    registry.observe_key(_key("train", {"model": "LSTM"}), 0.002)
+    registry.observe_key(_key("train", {"model": "LSTM"}), 2.0)
+    registry.increment_key(_key("requests", {}), 3)
+
+    snapshot = registry.snapshot()
+    timer, = snapshot["timers"]
+    assert timer["name"] == "train" and timer["labels"] == {"model": "LSTM"}
+    assert timer["count"] == 2 and timer["sum"] == pytest.approx(2.002) and timer["max"] == 2.0
+    assert timer["buckets"]["0.001"] == 0
+    assert timer["buckets"]["0.005"] == 1
+    assert timer["buckets"]["5"] == 2 and timer["buckets"]["+Inf"] == 2
+    assert snapshot["counters"] == [{"name": "requests", "labels": {}, "value": 3}]
+
+    registry.reset()
+    assert registry.snapshot() == {"timers": [], "counters": []}
+
+
+def test_prometheus_text():
+    registry = Registry()
+    registry.observe_key(_key("ensemble.combine", {"model": "LSTM"}), 0.02)
+    registry.increment_key(_key("cache.hit", {}), 1)
+    lines = registry.to_prometheus().splitlines()
+    assert 'ccb_ensemble_combine_seconds_bucket{model="LSTM",le="0.01"} 0' in lines
+    assert 'ccb_ensemble_combine_seconds_bucket{model="LSTM",le="0.05"} 1' in lines
+    assert 'ccb_ensemble_combine_seconds_bucket{model="LSTM",le="+Inf"} 1' in lines
+    assert 'ccb_ensemble_combine_seconds_sum{model="LSTM"} 0.02' in lines
+    assert 'ccb_ensemble_combine_seconds_count{model="LSTM"} 1' in lines
+    assert "ccb_cache_hit_total 1" in lines
+
+
+def test_timer_records_only_when_enabled(enabled):
+    instrumentation.enable(False)
+    with instrumentation.timer("predict", model="LSTM"):
+        pass
+    instrumentation.count("requests")
+    assert enabled.snapshot() == {"timers": [], "counters": []}
+
+    instrumentation.enable()
+    with instrumentation.timer("predict", model="LSTM"):
+        pass
+    instrumentation.observe("predict", 0.5, model="LSTM")
+    instrumentation.count("requests", 2)
+    timer, = enabled.snapshot()["timers"]
+    assert timer["count"] == 2 and timer["max"] >= 0.5
+    assert enabled.snapshot()["counters"][0]["value"] == 2
+
+
+def test_export_json_and_prometheus(enabled, tmp_path):
+    instrumentation.observe("train", 1.5, model="XGBoost")
+    json_path = instrumentation.export(str(tmp_path / "metrics.json"))
+    with open(json_path) as f:
+        assert json.load(f)["timers"][0]["labels"] == {"model": "XGBoost"}
+    prom_path = instrumentation.export(str(tmp_path / "nested" / "metrics.prom"))
+    with open(prom_path) as f:
+        assert 'ccb_train_seconds_count{model="XGBoost"} 1' in f.read().splitlines()
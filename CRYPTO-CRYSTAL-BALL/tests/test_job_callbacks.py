@@ -0,0 +1,79 @@
+"""Tests for the cancellable search and native-call hooks"""
+import math
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+from scipy.stats import uniform
+from sklearn.linear_model import Ridge
+from sklearn.model_selection import GridSearchCV, RandomizedSearchCV
+
+from job_callbacks import fit_search, run_cancellable
+from src.utils.jobs import Job, JobCancelled
+
+
+def _data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(120, 4))
+    return X, X @ rng.normal(size=4) + rng.normal(size=120)
+
+
+@pytest.mark.parametrize("make_search", [
+    lambda: GridSearchCV(Ridge(), [{"alpha": [0.1, 1, 10]}, {"alpha": [100], "fit_intercept": [False]}],
+                         scoring="neg_mean_squared_error", cv=4),
+    lambda: RandomizedSearchCV(Ridge(), {"alpha": uniform(0, 10)}, n_iter=7, cv=3, random_state=1),
+])
+def test_fit_search_matches_fit(make_search):
+    X, y = _data()
+    expected = make_search().fit(X, y)
+    searched = fit_search(make_search(), Job(), X, y)
+    assert searched.best_params_ == expected.best_params_
+    assert searched.best_score_ == pytest.approx(expected.best_score_)
+    assert searched.cv_results_["params"] == expected.cv_results_["params"]
+    np.testing.assert_allclose(searched.cv_results_["mean_test_score"], expected.cv_results_["mean_test_score"])
+    np.testing.assert_array_equal(searched.cv_results_["rank_test_score"], expected.cv_results_["rank_test_score"])
+    np.testing.assert_allclose(searched.best_estimator_.predict(X), expected.best_estimator_.predict(X))
+
+
+def test_fit_search_stops_when_cancelled():
+    X, y = _data()
+    job = Job()
+    job.cancel()
+    with pytest.raises(JobCancelled):
+        fit_search(GridSearchCV(Ridge(), {"alpha": [0.1, 1]}, cv=3), job, X, y)
+
+
+class SlowRidge(Ridge):
+    def fit(self, X, y, sample_weight=None):
+        time.sleep(1)
+        return super().fit(X, y, sample_weight)
+
+
+def test_fit_search_stops_mid_search():
+    X, y = _data()
+    job = Job()
+    threading.Timer(0.5, job.cancel).start()
+    started = time.time()
+    with pytest.raises(JobCancelled):
+        fit_search(GridSearchCV(SlowRidge(), {"alpha": list(range(1, 31))}, cv=3), job, X, y)
+    assert time.time() - started < 30
+
+
+def test_run_cancellable_returns_and_raises():
+    assert run_cancellable(Job(), math.sqrt, 4.0) == 2.0
+    with pytest.raises(ValueError):
+        run_cancellable(Job(), math.sqrt, -1.0)
+
+
+def test_run_cancellable_terminates_when_cancelled():
+    job = Job()
+    threading.Timer(0.5, job.cancel).start()
+    started = time.time()
+    with pytest.raises(JobCancelled):
+        run_cancellable(job, time.sleep, 60)
+    assert time.time() - started < 30
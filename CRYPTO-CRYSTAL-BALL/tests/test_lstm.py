@@ -0,0 +1,57 @@
+"""Tests for the LSTM's window datasets and streaming inference"""
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+
+pytest.importorskip('tensorflow')
+
+from Lstm_model import LSTMPredictor
+
+
+def _windows(dataset):
+    windows, targets = zip(*((x.numpy(), y.numpy()) for x, y in dataset))
+    return np.concatenate(windows), np.concatenate(targets)
+
+
+def test_training_windows_are_shuffled_reproducibly():
+    x = np.arange(200, dtype=np.float64).reshape(-1, 1)
+    y = np.arange(200, dtype=np.float64).reshape(-1, 1)
+
+    ordered, ordered_targets = _windows(LSTMPredictor.make_dataset(x, y, lookback=5, batch_size=8))
+    np.testing.assert_array_equal(ordered[:, -1, 0], np.arange(4, 200))
+
+    shuffled, targets = _windows(LSTMPredictor.make_dataset(x, y, lookback=5, batch_size=8, shuffle=True))
+    again, _ = _windows(LSTMPredictor.make_dataset(x, y, lookback=5, batch_size=8, shuffle=True))
+    # Each window keeps its own target and the windows are a reordering of the unshuffled ones
+    np.testing.assert_array_equal(shuffled[:, -1, 0], targets[:, 0])
+    assert sorted(targets[:, 0]) == list(ordered_targets[:, 0])
+    assert not np.array_equal(targets, ordered_targets)
+    np.testing.assert_array_equal(shuffled, again)
+
+
+def test_streaming_matches_window_prediction(monkeypatch):
+    from sklearn.preprocessing import MinMaxScaler
+    from configs.LstmConfig import Config
+    from Lstm_model import StatefulLSTMPredictor
+
+    monkeypatch.setattr(Config, 'LSTM_UNITS', [8])
+    monkeypatch.setattr(Config, 'DENSE_UNITS', [4])
+    monkeypatch.setattr(Config, 'BIDIRECTIONAL', False)
+    rng = np.random.default_rng(0)
+    rows = rng.normal(size=(200, 5)) * 10 + 100
+    predictor = LSTMPredictor()
+    predictor.scaler_x.fit(rows)
+    predictor.scaler_y.fit(rows[:, :1])
+    predictor.model = predictor.build_model((10, 5))
+
+    window = rows[-10:]
+    expected = predictor.predict_fast(predictor.scaler_x.transform(window))[-1][0]
+    stream = StatefulLSTMPredictor.from_predictor(predictor)
+    assert stream.warm_up(window) == pytest.approx(expected, rel=1e-4)
+    # Streaming the same rows in two calls ends in the same state
+    stream.warm_up(window[:4])
+    assert stream.step(window[4:]) == pytest.approx(expected, rel=1e-4)
@@ -0,0 +1,38 @@
+"""Tests for stage serialization in the memory profiler"""
+import os
+import sys
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.memory_profiler import MemoryProfiler
+
+
+def test_combine_does_not_wait_for_late_predictions():
+    profiler = MemoryProfiler(stages=["predict", "ensemble.combine"], serialize=True)
+    profiler.start()
+    try:
+        predicting, release = threading.Event(), threading.Event()
+
+        def late_model():
+            with profiler.stage("predict", {"model": "LSTM"}):
+                predicting.set()
+                release.wait(10)
+
+        thread = threading.Thread(target=late_model)
+        thread.start()
+        predicting.wait(10)
+
+        combined = threading.Event()
+
+        def combine():
+            with profiler.stage("ensemble.combine"):
+                combined.set()
+
+        threading.Thread(target=combine, daemon=True).start()
+        assert combined.wait(5), "ensemble.combine blocked on a running prediction"
+        release.set()
+        thread.join()
+    finally:
+        profiler.stop()
+    assert {r["name"] for r in profiler.report()} == {"predict", "ensemble.combine"}
@@ -0,0 +1,137 @@
+"""Model bundles must load back into predictors that predict like the saved ones"""
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import MinMaxScaler
+
+from model_bundle import LazyBundle, load_bundle, load_scaler, read_manifest, save_bundle, save_scaler, unwrap
+
+
+def _random_forest_predictor():
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(300, 5))
+    y = X @ rng.normal(size=5)
+    scaler_x = MinMaxScaler().fit(X)
+    scaler_y = MinMaxScaler().fit(y.reshape(-1, 1))
+    model = RandomForestRegressor(n_estimators=10, random_state=0).fit(scaler_x.transform(X), y)
+    predictor = SimpleNamespace(model=model, forest=None, compiled=None, scaler_x=scaler_x, scaler_y=scaler_y)
+    return predictor, X
+
+
+def _empty_predictor():
+    return SimpleNamespace(model=None, forest=None, compiled=None, scaler_x=None, scaler_y=None)
+
+
+def test_scaler_round_trip(tmp_path):
+    X = np.random.default_rng(0).normal(size=(50, 3))
+    scaler = MinMaxScaler(feature_range=(-1, 1)).fit(X)
+    save_scaler(scaler, str(tmp_path))
+    loaded = load_scaler(str(tmp_path))
+    assert loaded.feature_range == (-1, 1)
+    np.testing.assert_array_equal(loaded.transform(X), scaler.transform(X))
+    np.testing.assert_array_equal(loaded.inverse_transform(X), scaler.inverse_transform(X))
+
+
+def test_random_forest_bundle_round_trip(tmp_path):
+    predictor, X = _random_forest_predictor()
+    directory = str(tmp_path / "RandomForest")
+    manifest = save_bundle('RandomForest', predictor, directory)
+    assert manifest['name'] == 'RandomForest'
+    assert read_manifest(directory)['files'] == manifest['files']
+
+    loaded = load_bundle(_empty_predictor(), directory)
+    assert loaded.model is None
+    expected = predictor.model.predict(predictor.scaler_x.transform(X))
+    np.testing.assert_allclose(loaded.compiled.predict_batch(loaded.scaler_x.transform(X)), expected, rtol=1e-12)
+    np.testing.assert_array_equal(loaded.scaler_y.scale_, predictor.scaler_y.scale_)
+
+
+def test_lazy_bundle_loads_on_first_use(tmp_path):
+    predictor, X = _random_forest_predictor()
+    directory = str(tmp_path / "RandomForest")
+    save_bundle('RandomForest', predictor, directory)
+
+    lazy = LazyBundle(_empty_predictor(), directory)
+    assert not lazy.loaded
+    assert lazy.predictor.forest is None
+    assert lazy.forest is not None
+    assert lazy.loaded
+    assert unwrap(lazy) is lazy.predictor
+
+
+def test_save_bundle_requires_trained_model(tmp_path):
+    with pytest.raises(ValueError):
+        save_bundle('RandomForest', _empty_predictor(), str(tmp_path / "RandomForest"))
+    with pytest.raises(ValueError):
+        save_bundle('Unknown', _random_forest_predictor()[0], str(tmp_path / "Unknown"))
+
+
+def test_read_manifest_rejects_other_format_versions(tmp_path):
+    predictor, _ = _random_forest_predictor()
+    directory = str(tmp_path / "RandomForest")
+    save_bundle('RandomForest', predictor, directory)
+    path = os.path.join(directory, 'manifest.json')
+    with open(path) as f:
+        manifest = json.load(f)
+    manifest['format_version'] += 1
+    with open(path, 'w') as f:
+        json.dump(manifest, f)
+    with pytest.raises(ValueError):
+        read_manifest(directory)
+    with pytest.raises(FileNotFoundError):
+        read_manifest(str(tmp_path / "missing"))
+
+
+def test_xgboost_bundle_round_trip(tmp_path):
+    xgb = pytest.importorskip("xgboost")
+    rng = np.random.default_rng(2)
+    X, y = rng.normal(size=(200, 4)), rng.normal(size=200)
+    predictor = SimpleNamespace(model=xgb.XGBRegressor(n_estimators=20).fit(X, y), compiled=None,
+                                scaler_x=None, scaler_y=None)
+    directory = str(tmp_path / "XGBoost")
+    save_bundle('XGBoost', predictor, directory)
+    loaded = load_bundle(SimpleNamespace(model=None, compiled=None, scaler_x=None, scaler_y=None), directory)
+    np.testing.assert_allclose(loaded.model.predict(X), predictor.model.predict(X), rtol=1e-6)
+
+
+def test_lightgbm_bundle_round_trip(tmp_path):
+    lgb = pytest.importorskip("lightgbm")
+    rng = np.random.default_rng(3)
+    X, y = rng.normal(size=(200, 4)), rng.normal(size=200)
+    booster = lgb.train({'verbose': -1}, lgb.Dataset(X, y), num_boost_round=20)
+    predictor = SimpleNamespace(booster=booster, compiled=None, scaler_x=None, scaler_y=None)
+    directory = str(tmp_path / "LightGBM")
+    save_bundle('LightGBM', predictor, directory)
+    loaded = load_bundle(SimpleNamespace(booster=None, compiled=None, scaler_x=None, scaler_y=None), directory)
+    np.testing.assert_allclose(loaded.booster.predict(X), booster.predict(X), rtol=1e-9)
+
+
+def test_training_replaces_an_unloaded_bundle_without_loading_it(tmp_path, workdir):
+    for module in ('tensorflow', 'catboost', 'lightgbm', 'xgboost', 'prophet'):
+        pytest.importorskip(module)
+    from src.models.master_predictor import MasterPredictor
+
+    directory = str(tmp_path / "RandomForest")
+    save_bundle('RandomForest', _random_forest_predictor()[0], directory)
+    master = MasterPredictor()
+    wrapped = master.models['RandomForest']
+    lazy = master.models['RandomForest'] = LazyBundle(wrapped, directory)
+
+    def fail(data, job):
+        raise RuntimeError("fit failed")
+    master._train_random_forest = fail
+    with pytest.raises(RuntimeError):
+        master.train_models(None, {'RandomForest': True})
+    assert master.models['RandomForest'] is lazy  # A failed fit keeps the saved bundle
+
+    master._train_random_forest = lambda data, job: 1.0
+    master.train_models(None, {'RandomForest': True})
+    assert not lazy.loaded
+    assert master.models['RandomForest'] is wrapped and wrapped.n_jobs >= 1
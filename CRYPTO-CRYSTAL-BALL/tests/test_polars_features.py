@@ -0,0 +1,39 @@
+"""The Polars feature backend must produce the same frame as the pandas one"""
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("polars")
+data_acquisition = pytest.importorskip("src.data.data_acquisition")
+
+from src.data.synthetic import generate_ohlcv
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_polars_matches_pandas(compact):
+    raw = generate_ohlcv(5000, start="2023-03-25 22:00", seed=7)
+    expected = data_acquisition.DataAcquisition(backend="pandas", compact=compact)._process_data(raw.copy())
+    result = data_acquisition.DataAcquisition(backend="polars", compact=compact)._process_data(raw.copy())
+
+    assert list(result.columns) == list(expected.columns)
+    assert result.index.equals(expected.index)
+    pd.testing.assert_series_equal(result.dtypes, expected.dtypes)
+    # atol covers MACD values near zero, where the two backends' rounding differs relatively the most
+    rtol, atol = (1e-5, 1e-4) if compact else (1e-9, 1e-8)
+    for column in expected.columns:
+        np.testing.assert_allclose(result[column].to_numpy(np.float64), expected[column].to_numpy(np.float64),
+                                   rtol=rtol, atol=atol, equal_nan=True, err_msg=column)
+
+
+def test_polars_matches_pandas_on_tz_aware_index():
+    raw = generate_ohlcv(2000, seed=3)
+    raw.index = raw.index.tz_localize("UTC").tz_convert("America/New_York")
+    expected = data_acquisition.DataAcquisition(backend="pandas", compact=False)._process_data(raw.copy())
+    result = data_acquisition.DataAcquisition(backend="polars", compact=False)._process_data(raw.copy())
+    for column in ["hour", "minute", "day_of_week"]:
+        np.testing.assert_array_equal(result[column].to_numpy(), expected[column].to_numpy(), err_msg=column)
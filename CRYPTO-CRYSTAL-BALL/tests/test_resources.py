@@ -0,0 +1,110 @@
+"""Tests for the CPU core governor"""
+import os
+import sys
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.utils.resources import CoreGovernor
+
+
+def test_share_grants_request_or_free_cores():
+    governor = CoreGovernor(total_cores=4, policy="share")
+    assert governor.acquire("a", 3) == 3
+    assert governor.acquire("b", 3) == 1
+    assert governor.allocations == {"a": 3, "b": 1}
+    governor.release("a", 3)
+    governor.release("b", 1)
+    assert governor.allocations == {}
+    assert governor.acquire("c", 8) == 4  # Requests are capped at the budget
+
+
+def test_share_waits_while_no_core_is_free():
+    governor = CoreGovernor(total_cores=2, policy="share")
+    governor.acquire("a", 2)
+    granted = []
+    waiter = threading.Thread(target=lambda: granted.append(governor.acquire("b", 2)))
+    waiter.start()
+    waiter.join(timeout=0.2)
+    assert waiter.is_alive() and not granted
+    governor.release("a", 2)
+    waiter.join(timeout=5)
+    assert granted == [2]
+    assert governor._free == 0
+
+
+def test_wait_blocks_until_full_request_is_free():
+    governor = CoreGovernor(total_cores=4, policy="wait")
+    governor.acquire("a", 3)
+    granted = []
+    waiter = threading.Thread(target=lambda: granted.append(governor.acquire("b", 2)))
+    waiter.start()
+    waiter.join(timeout=0.2)
+    assert waiter.is_alive()
+    governor.release("a", 3)
+    waiter.join(timeout=5)
+    assert granted == [2]
+
+
+def test_allocate_releases_on_error():
+    governor = CoreGovernor(total_cores=2, policy="share")
+    with pytest.raises(RuntimeError):
+        with governor.allocate("a", 2):
+            raise RuntimeError("failed")
+    assert governor.allocations == {}
+    assert governor._free == 2
+
+
+def test_shrinking_resize_keeps_grants_and_blocks_new_jobs():
+    governor = CoreGovernor(total_cores=4, policy="share")
+    governor.acquire("a", 3)
+    governor.resize(2)
+    assert governor.total_cores == 2
+    assert governor.allocations == {"a": 3}
+    granted = []
+    waiter = threading.Thread(target=lambda: granted.append(governor.acquire("b")))
+    waiter.start()
+    waiter.join(timeout=0.2)
+    assert waiter.is_alive()  # 3 of 2 cores are still held
+    governor.release("a", 3)
+    waiter.join(timeout=5)
+    assert granted and 1 <= granted[0] <= 2
+    assert governor._free == 2 - granted[0]
+
+
+def test_wait_request_follows_shrinking_budget():
+    governor = CoreGovernor(total_cores=4, policy="wait")
+    governor.acquire("a", 4)
+    granted = []
+    waiter = threading.Thread(target=lambda: granted.append(governor.acquire("b", 4)))
+    waiter.start()
+    governor.resize(2)
+    governor.release("a", 4)
+    waiter.join(timeout=5)
+    assert granted == [2]
+
+
+def test_growing_resize_frees_cores():
+    governor = CoreGovernor(total_cores=2, policy="share")
+    governor.acquire("a", 2)
+    governor.resize(4)
+    assert governor.acquire("b", 4) == 2
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        CoreGovernor(total_cores=2, policy="greedy")
+
+
+def test_batch_scheduler_reads_job_cores(monkeypatch):
+    from src.models.batch_scheduler import BatchTrainingScheduler
+    from src.utils.constants import RESOURCES
+
+    monkeypatch.setitem(RESOURCES, "job_cores", {"Prophet": 1, "XGBoost": 16, "default": None})
+    scheduler = BatchTrainingScheduler(["BTCUSDT"], ["LSTM", "Prophet", "XGBoost", "LightGBM"],
+                                       "2024-01-01", "2024-01-02", max_workers=8)
+    assert scheduler._resources("Prophet")["cores"] == 1
+    assert scheduler._resources("XGBoost")["cores"] == 8  # Capped at the scheduler's cores
+    assert scheduler._resources("LSTM")["cores"] == 2  # None: an even share between the four models
@@ -0,0 +1,70 @@
+"""Tests for the synthetic market-data generator"""
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from src.data.synthetic import (binance_kline_messages, coinbase_match_messages, generate_market, generate_ohlcv,
+                                to_binance_klines, to_coinbase_candles, to_yfinance)
+
+COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'quote_volume', 'trades']
+
+
+def test_generate_market_shapes():
+    market = generate_market(["BTCUSDT", "ETHUSDT"], 5000, start="2024-01-01", gap_probability=1 / 500, seed=1)
+    assert set(market) == {"BTCUSDT", "ETHUSDT"}
+    btc, eth = market["BTCUSDT"], market["ETHUSDT"]
+    assert list(btc.columns) == COLUMNS
+    assert btc.index.equals(eth.index)  # Outages hit every symbol
+    assert 0 < len(btc) < 5000
+    assert btc.index.is_monotonic_increasing and btc.index[0] == pd.Timestamp("2024-01-01")
+    assert (btc.index.to_series().diff().dropna() >= pd.Timedelta(minutes=1)).all()
+    assert not btc.isna().any().any()
+
+
+def test_candles_are_consistent():
+    frame = generate_market(["BTCUSDT"], 3000, seed=2)["BTCUSDT"]
+    assert (frame['high'] >= frame[['open', 'close']].max(axis=1)).all()
+    assert (frame['low'] <= frame[['open', 'close']].min(axis=1)).all()
+    assert (frame['low'] > 0).all() and (frame['volume'] > 0).all()
+    np.testing.assert_allclose(frame['quote_volume'], frame['volume'] * frame['close'])
+    gap_free = generate_market(["BTCUSDT"], 3000, gap_probability=0.0, seed=2)["BTCUSDT"]
+    np.testing.assert_allclose(gap_free['open'].iloc[1:].to_numpy(), gap_free['close'].iloc[:-1].to_numpy())
+
+
+def test_symbols_are_correlated_and_seeded():
+    market = generate_market(["BTCUSDT", "ETHUSDT"], 20000, correlation=0.8, gap_probability=0.0, seed=3)
+    returns = pd.DataFrame({symbol: np.log(frame['close']).diff() for symbol, frame in market.items()}).dropna()
+    assert 0.6 < returns.corr().iloc[0, 1] < 0.95
+    again = generate_market(["BTCUSDT", "ETHUSDT"], 20000, correlation=0.8, gap_probability=0.0, seed=3)
+    pd.testing.assert_frame_equal(market["BTCUSDT"], again["BTCUSDT"])
+    other = generate_market(["BTCUSDT", "ETHUSDT"], 20000, correlation=0.8, gap_probability=0.0, seed=4)
+    assert not market["BTCUSDT"]['close'].equals(other["BTCUSDT"]['close'])
+
+
+def test_generate_ohlcv_is_gap_free():
+    frame = generate_ohlcv(1440, start="2024-02-01", seed=5)
+    assert frame.shape == (1440, 5)
+    assert list(frame.columns) == ['open', 'high', 'low', 'close', 'volume']
+    assert frame.index.equals(pd.date_range("2024-02-01", periods=1440, freq="min", name="timestamp"))
+
+
+def test_payload_shapes():
+    frame = generate_market(["BTCUSDT"], 10, gap_probability=0.0, seed=6)["BTCUSDT"]
+    klines = to_binance_klines(frame)
+    assert len(klines) == 10 and all(len(row) == 12 for row in klines)
+    assert klines[0][0] == frame.index[0].value // 10**6 and float(klines[0][4]) == round(frame['close'].iloc[0], 8)
+    candles = to_coinbase_candles(frame)
+    assert len(candles) == 10 and candles[0][0] == frame.index[-1].value // 10**9  # Newest first
+    yf_frame = to_yfinance(frame)
+    assert list(yf_frame.columns) == ['Open', 'High', 'Low', 'Close', 'Volume'] and str(yf_frame.index.tz) == "UTC"
+
+    messages = list(binance_kline_messages(frame, "BTCUSDT", updates_per_candle=3))
+    assert len(messages) == 30 and [m["k"]["x"] for m in messages[:3]] == [False, False, True]
+    matches = list(coinbase_match_messages(frame, "BTCUSDT", trades_per_candle=4))
+    assert len(matches) == 40 and matches[0]["product_id"] == "BTC-USD"
+    sizes = np.array([float(m["size"]) for m in matches]).reshape(10, 4).sum(axis=1)
+    np.testing.assert_allclose(sizes, frame['volume'], rtol=1e-6)
@@ -0,0 +1,86 @@
+"""Flattened forests and compiled tree predictors must predict like the models they wrap"""
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from tree_inference import CompiledTreePredictor, ForestArrays
+
+
+@pytest.fixture(scope="module")
+def forest_data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 6))
+    y = X[:, 0] * 3 - X[:, 1] ** 2 + rng.normal(scale=0.1, size=400)
+    forest = RandomForestRegressor(n_estimators=25, max_depth=8, random_state=0).fit(X, y)
+    return forest, rng.normal(size=(200, 6))
+
+
+def test_forest_arrays_match_sklearn(forest_data):
+    forest, X = forest_data
+    arrays = ForestArrays.from_sklearn(forest)
+    assert arrays.n_trees == 25
+    np.testing.assert_allclose(arrays.predict(X), forest.predict(X), rtol=1e-12)
+
+
+def test_forest_arrays_subset_averages_chosen_trees(forest_data):
+    forest, X = forest_data
+    trees = [0, 3, 7, 11]
+    expected = np.mean([forest.estimators_[i].predict(X) for i in trees], axis=0)
+    np.testing.assert_allclose(ForestArrays.from_sklearn(forest, trees=trees).predict(X), expected, rtol=1e-12)
+
+
+def test_float32_forest_arrays(forest_data):
+    forest, X = forest_data
+    full = ForestArrays.from_sklearn(forest)
+    compact = ForestArrays.from_sklearn(forest, dtype=np.float32)
+    assert compact.nbytes < full.nbytes
+    np.testing.assert_allclose(compact.predict(X), forest.predict(X), rtol=1e-5, atol=1e-5)
+
+
+def test_forest_arrays_save_load_mmap(forest_data, tmp_path):
+    forest, X = forest_data
+    ForestArrays.from_sklearn(forest).save(str(tmp_path))
+    loaded = ForestArrays.load(str(tmp_path))
+    assert isinstance(loaded.left, np.memmap)
+    np.testing.assert_allclose(loaded.predict(X), forest.predict(X), rtol=1e-12)
+
+
+def test_compiled_predictor_native(forest_data):
+    forest, X = forest_data
+    compiled = CompiledTreePredictor(forest, backend='native')
+    assert compiled.kind == 'sklearn'
+    np.testing.assert_allclose(compiled.predict_batch(X), forest.predict(X), rtol=1e-12)
+    assert compiled.predict_one(X[5]) == pytest.approx(forest.predict(X[5:6])[0])
+
+
+def test_compiled_predictor_from_forest_arrays(forest_data):
+    forest, X = forest_data
+    compiled = CompiledTreePredictor.from_forest_arrays(ForestArrays.from_sklearn(forest))
+    np.testing.assert_allclose(compiled.predict_batch(X), forest.predict(X), rtol=1e-12)
+
+
+def test_compiled_predictor_rejects_unknown_backend(forest_data):
+    with pytest.raises(ValueError):
+        CompiledTreePredictor(forest_data[0], backend='gpu')
+
+
+def test_lightgbm_compiles_its_own_booster(workdir):
+    lgb = pytest.importorskip('lightgbm')
+    from lgbm_model import LGBMRegressorModel
+
+    model = LGBMRegressorModel()
+    assert model.compiled is None
+    with pytest.raises(ValueError):
+        model.compile_inference()
+
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(300, 4))
+    model.booster = lgb.train({'verbose': -1}, lgb.Dataset(X, X[:, 0] * 2), num_boost_round=10)
+    compiled = model.compile_inference(backend='native')
+    assert model.compiled is compiled
+    np.testing.assert_allclose(compiled.predict_batch(X), model.booster.predict(X), rtol=1e-6)
@@ -0,0 +1,210 @@
+import numpy as np
+import logging
+import os
+import tempfile
+from typing import Any, Optional, Sequence
+
+try:
+    import treelite
+    import tl2cgen
+except ImportError:
+    treelite = None
+    tl2cgen = None
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class ForestArrays:
+    """
+    A fitted sklearn forest flattened into contiguous node arrays.
+
+    All trees share one set of arrays with per-tree root offsets. Leaves point to
+    themselves, so traversal runs a fixed number of vectorized steps over every
+    (row, tree) pair with no Python-level loop over trees.
+    """
+
+    FIELDS = ('left', 'right', 'feature', 'threshold', 'value', 'roots')
+
+    def __init__(self, left: np.ndarray, right: np.ndarray, feature: np.ndarray, threshold: np.ndarray,
+                 value: np.ndarray, roots: np.ndarray, depth: int):
+        self.left = left
+        self.right = right
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
+        self.roots = roots
+        self.depth = depth
+
+    @classmethod
+    def from_sklearn(cls, forest, trees: Optional[Sequence[int]] = None,
+                     dtype: np.dtype = np.float64) -> 'ForestArrays':
+        """
+        Flatten the estimators_ of a fitted sklearn forest regressor.
+
+        trees selects a subset of estimator indices to keep, and dtype sets the
+        storage type of thresholds and leaf values (np.float32 halves their size).
+        """
+        estimators = forest.estimators_ if trees is None else [forest.estimators_[i] for i in trees]
+        left, right, feature, threshold, value, roots = [], [], [], [], [], []
+        offset = 0
+        depth = 0
+        for estimator in estimators:
+            tree = estimator.tree_
+            nodes = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+            left.append(np.where(is_leaf, nodes, tree.children_left) + offset)
+            right.append(np.where(is_leaf, nodes, tree.children_right) + offset)
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(tree.threshold)
+            value.append(tree.value[:, 0, 0])
+            roots.append(offset)
+            offset += tree.node_count
+            depth = max(depth, tree.max_depth)
+
+        return cls(np.concatenate(left).astype(np.int32), np.concatenate(right).astype(np.int32),
+                   np.concatenate(feature).astype(np.int32), np.concatenate(threshold).astype(dtype),
+                   np.concatenate(value).astype(dtype), np.asarray(roots, dtype=np.int32), depth)
+
+    @property
+    def n_trees(self) -> int:
+        return self.roots.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of the node arrays in bytes."""
+        return sum(getattr(self, name).nbytes for name in self.FIELDS)
+
+    def save(self, directory: str) -> None:
+        """Write each node array to its own .npy file so it can be memory-mapped on load."""
+        os.makedirs(directory, exist_ok=True)
+        for name in self.FIELDS:
+            np.save(os.path.join(directory, f'{name}.npy'), getattr(self, name))
+        np.save(os.path.join(directory, 'depth.npy'), np.asarray(self.depth))
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: Optional[str] = 'r') -> 'ForestArrays':
+        """
+        Open arrays written by save().
+
+        With the default read-only mmap_mode nothing is read up front and every
+        process that loads the same files shares one copy in the page cache.
+        """
+        arrays = {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode=mmap_mode)
+                  for name in cls.FIELDS}
+        depth = int(np.load(os.path.join(directory, 'depth.npy')))
+        return cls(depth=depth, **arrays)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Average the leaf values reached by every row in every tree."""
+        # sklearn compares float32 features against the stored thresholds
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(X.shape[0])[:, np.newaxis]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], self.roots.shape[0]))
+        for _ in range(self.depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return self.value[nodes].mean(axis=1)
+
+
+class CompiledTreePredictor:
+    """
+    Uniform low-latency predict_one / predict_batch wrapper for the tree models.
+
+    Supports sklearn RandomForestRegressor, xgboost.XGBRegressor or Booster,
+    lightgbm.Booster or LGBMRegressor, and CatBoostRegressor. Backends:
+
+    * 'treelite' - compile the ensemble to a native shared library with
+      Treelite/TL2cgen (RandomForest, XGBoost and LightGBM only).
+    * 'native' - the lowest-overhead call each library offers: flattened node
+      arrays for RandomForest, inplace_predict for XGBoost and single-threaded
+      predict for LightGBM and CatBoost.
+    * 'auto' - 'treelite' when installed and supported, else 'native'.
+
+    Inputs and outputs are in the same (scaled) space as the wrapped model's
+    own predict().
+    """
+
+    BACKENDS = ('auto', 'native', 'treelite')
+
+    def __init__(self, model: Any, backend: str = 'auto', libpath: Optional[str] = None):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}'. Choose from {self.BACKENDS}")
+
+        self.model = model
+        self.kind = self._detect_kind(model)
+
+        if backend == 'auto':
+            backend = 'treelite' if tl2cgen is not None and self.kind != 'catboost' else 'native'
+        if backend == 'treelite':
+            if tl2cgen is None:
+                raise ImportError("The treelite backend requires the 'treelite' and 'tl2cgen' packages.")
+            if self.kind == 'catboost':
+                raise ValueError("Treelite cannot compile CatBoost models; use the native backend.")
+            self._predict = self._compile_treelite(libpath)
+        else:
+            self._predict = self._native_predictor()
+
+        self.backend = backend
+        logger.info(f"Compiled {self.kind} model for inference with the {backend} backend")
+
+    @classmethod
+    def from_forest_arrays(cls, arrays: ForestArrays) -> 'CompiledTreePredictor':
+        """Wrap already flattened forest arrays, e.g. memory-mapped from a model bundle."""
+        predictor = cls.__new__(cls)
+        predictor.model = None
+        predictor.kind = 'sklearn'
+        predictor.backend = 'native'
+        predictor._predict = arrays.predict
+        return predictor
+
+    @staticmethod
+    def _detect_kind(model: Any) -> str:
+        module = type(model).__module__
+        if module.startswith('sklearn'):
+            return 'sklearn'
+        if module.startswith('xgboost'):
+            return 'xgboost'
+        if module.startswith('lightgbm'):
+            return 'lightgbm'
+        if module.startswith('catboost'):
+            return 'catboost'
+        raise TypeError(f"Unsupported model type: {type(model).__name__}")
+
+    def _native_predictor(self):
+        if self.kind == 'sklearn':
+            arrays = ForestArrays.from_sklearn(self.model)
+            return arrays.predict
+        if self.kind == 'xgboost':
+            booster = self.model.get_booster() if hasattr(self.model, 'get_booster') else self.model
+            return lambda X: booster.inplace_predict(X)
+        if self.kind == 'lightgbm':
+            booster = getattr(self.model, 'booster_', self.model)
+            return lambda X: booster.predict(X, num_threads=1)
+        return lambda X: self.model.predict(X, thread_count=1)
+
+    def _compile_treelite(self, libpath: Optional[str]):
+        if self.kind == 'sklearn':
+            tl_model = treelite.sklearn.import_model(self.model)
+        elif self.kind == 'xgboost':
+            booster = self.model.get_booster() if hasattr(self.model, 'get_booster') else self.model
+            tl_model = treelite.frontend.from_xgboost(booster)
+        else:
+            booster = getattr(self.model, 'booster_', self.model)
+            tl_model = treelite.frontend.from_lightgbm(booster)
+
+        if libpath is None:
+            libpath = os.path.join(tempfile.mkdtemp(prefix='treelite_'), f'{self.kind}_model.so')
+        tl2cgen.export_lib(tl_model, toolchain='gcc', libpath=libpath,
+                           params={'parallel_comp': os.cpu_count() or 1}, nthread=1)
+        predictor = tl2cgen.Predictor(libpath, nthread=1)
+        return lambda X: predictor.predict(tl2cgen.DMatrix(X, dtype='float64')).reshape(X.shape[0], -1)[:, 0]
+
+    def predict_batch(self, X: np.ndarray) -> np.ndarray:
+        """Predict a 2-D batch of feature rows."""
+        X = np.asarray(X, dtype=np.float64)
+        return np.asarray(self._predict(X), dtype=np.float64).reshape(-1)
+
+    def predict_one(self, row: np.ndarray) -> float:
+        """Predict a single feature row."""
+        return float(self.predict_batch(np.asarray(row, dtype=np.float64).reshape(1, -1))[0])